@@ -1,448 +1,639 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import sys
-from pathlib import Path
-import os
-import getpass
-from datetime import datetime
-
-# --- CONFIGURACIÓN ---
-# Define las rutas a los archivos CSV
-# (Esto asume que el script de análisis está en la misma carpeta que el log)
-SCRIPT_DIR = Path(__file__).parent
-ADMIN_LOG_PATH = SCRIPT_DIR / "admin_log.csv"
-APP_DATA_ROOT = Path(os.environ.get('APPDATA', Path.home()))
-
-# --- Nombres de columna SINCRONIZADOS ---
-COLUMNAS_LOG = [
-    'log_timestamp', 'id_perfil', 'username', 'file_original_path', 
-    'subject_assigned', 'status', 'file_new_path', 'file_hash', 'file_size_bytes'
-]
-COLUMNAS_PERFILES = [
-    'id_perfil', 'nombre_visible', 'lista_materias_pipe', 'manejo_otros', 
-    'ultimo_uso_timestamp', 'creado_en_timestamp', 'contador_archivos_movidos'
-]
-# --- FIN DE CONFIGURACIÓN ---
-
-# --- Funciones de Carga de Datos ---
-
-def cargar_admin_log():
-    """Carga el log de administrador (público)."""
-    print(f"Cargando log de administrador desde: {ADMIN_LOG_PATH}")
-    if not ADMIN_LOG_PATH.exists():
-        print_error(f"Error: No se encontró '{ADMIN_LOG_PATH}'.")
-        print_error("Asegúrate de que 'admin_log.csv' esté en la misma carpeta que este script.")
-        print_error("Usa la app 'Desshufle.bat' primero para generar un log.")
-        return None
-    
-    try:
-        df_log = pd.read_csv(
-            ADMIN_LOG_PATH, 
-            header=0,      # Usar la primera fila como cabecera
-            dtype=str, # Cargar todo como string primero
-            on_bad_lines='skip' # Ignorar líneas rotas
-        )
-        
-        # --- Validación de Columnas ---
-        columnas_faltantes = [col for col in COLUMNAS_LOG if col not in df_log.columns]
-        if columnas_faltantes:
-            print_error(f"Error: El admin_log.csv no tiene las columnas esperadas: {columnas_faltantes}")
-            return None
-        # --- Fin Validación ---
-        
-        if df_log.empty:
-            print_error("Error: El archivo admin_log.csv está vacío (no tiene filas de datos).")
-            return None
-
-        # --- Conversión manual y explícita de fechas ---
-        df_log['log_timestamp'] = pd.to_datetime(
-            df_log['log_timestamp'], 
-            errors='coerce' # Dejar que Pandas autodetecte el formato
-        )
-        
-        # Si 'coerce' falló (creó NaT - Not a Time), eliminamos esas filas
-        df_log = df_log.dropna(subset=['log_timestamp'])
-
-        if df_log.empty:
-            print_error("Error: No se pudieron leer fechas válidas ('log_timestamp') del CSV.")
-            print_error("Revisa que la columna 'log_timestamp' no esté vacía o corrupta.")
-            return None
-        
-        # Convertir columnas numéricas
-        df_log['file_size_bytes'] = pd.to_numeric(df_log['file_size_bytes'], errors='coerce').fillna(0)
-        
-        print_success("Log de administrador cargado.")
-        return df_log
-        
-    except FileNotFoundError:
-        print_error(f"Error: El archivo '{ADMIN_LOG_PATH}' no existe.")
-    except KeyError as e:
-        print_error(f"Error crítico al leer admin_log.csv: Falta la columna {e}.")
-        print_error("El admin_log.csv no coincide con la estructura esperada por el script.")
-    except Exception as e:
-        print_error(f"Error inesperado al leer admin_log.csv: {e}")
-    
-    return None
-
-def cargar_perfiles_locales():
-    """Carga los perfiles del usuario actual (privado)."""
-    username = getpass.getuser()
-    perfil_csv_path = APP_DATA_ROOT / "OrganizadorMaterias" / "perfiles.csv"
-    
-    print(f"Cargando perfiles locales para '{username}' desde: {perfil_csv_path}")
-
-    if not perfil_csv_path.exists():
-        print_warning(f"No se encontró '{perfil_csv_path}'.")
-        print_warning("El análisis se ejecutará sin nombres de perfiles (solo IDs).")
-        return pd.DataFrame(columns=COLUMNAS_PERFILES) # Devolver DF vacío
-
-    try:
-        df_perfil = pd.read_csv(perfil_csv_path, dtype=str)
-        
-        columnas_existentes = [col for col in COLUMNAS_PERFILES if col in df_perfil.columns]
-        df_perfil_filtrado = df_perfil[columnas_existentes]
-
-        # Convertir columnas numéricas
-        if 'contador_archivos_movidos' in df_perfil_filtrado.columns:
-            df_perfil_filtrado['contador_archivos_movidos'] = pd.to_numeric(df_perfil_filtrado['contador_archivos_movidos'], errors='coerce').fillna(0)
-        
-        # Convertir fechas
-        if 'ultimo_uso_timestamp' in df_perfil_filtrado.columns:
-            df_perfil_filtrado['ultimo_uso_timestamp'] = pd.to_datetime(df_perfil_filtrado['ultimo_uso_timestamp'], errors='coerce')
-        if 'creado_en_timestamp' in df_perfil_filtrado.columns:
-            df_perfil_filtrado['creado_en_timestamp'] = pd.to_datetime(df_perfil_filtrado['creado_en_timestamp'], errors='coerce')
-
-        print_success("Perfiles locales cargados.")
-        return df_perfil_filtrado
-        
-    except Exception as e:
-        print_error(f"Error al leer perfiles.csv: {e}")
-        return pd.DataFrame(columns=COLUMNAS_PERFILES) # Devolver DF vacío
-
-# --- Funciones de Filtros Interactivos ---
-
-def obtener_filtros_interactivos(df_log):
-    """Pregunta al usuario por filtros de fecha y usuario."""
-    print_header("Filtros Interactivos")
-    
-    # --- Filtro de Fecha ---
-    print("\n--- Filtro de Fecha ---")
-    min_date = df_log['log_timestamp'].min().date()
-    max_date = df_log['log_timestamp'].max().date()
-    print(f"Rango de datos disponible: {min_date} a {max_date}")
-
-    fecha_inicio_str = input(f"Fecha de inicio (YYYY-MM-DD) [Enter para {min_date}]: ")
-    fecha_fin_str = input(f"Fecha de fin (YYYY-MM-DD) [Enter para {max_date}]: ")
-
-    try:
-        fecha_inicio = pd.to_datetime(fecha_inicio_str).date() if fecha_inicio_str else min_date
-        fecha_fin = pd.to_datetime(fecha_fin_str).date() if fecha_fin_str else max_date
-    except ValueError:
-        print_warning("Fecha inválida. Usando el rango completo.")
-        fecha_inicio, fecha_fin = min_date, max_date
-    
-    # Convertir a datetime para filtrar
-    # ¡YA NO NECESITAMOS ESTAS LÍNEAS! Las variables ya son 'date'
-    # fecha_inicio = datetime(fecha_inicio.year, fecha_inicio.month, fecha_inicio.day)
-    # fecha_fin = datetime(fecha_fin.year, fecha_fin.month, fecha_fin.day, 23, 59, 59)
-
-    # --- ¡CORRECCIÓN! Comparamos .dt.date (solo la fecha) con nuestras variables de fecha ---
-    df_filtrado = df_log[
-        (df_log['log_timestamp'].dt.date >= fecha_inicio) & 
-        (df_log['log_timestamp'].dt.date <= fecha_fin)
-    ]
-    
-    # --- Filtro de Usuario ---
-    print("\n--- Filtro de Usuario ---")
-    usuarios_disponibles = df_filtrado['username'].unique()
-    # Manejar el caso de que no haya usuarios en el rango
-    if usuarios_disponibles.size == 0:
-        print("No hay usuarios disponibles en este rango de fechas.")
-        return df_filtrado # Devolver DF vacío
-        
-    print(f"Usuarios disponibles: {', '.join(usuarios_disponibles)}")
-    usuario_str = input("Nombre de usuario [Enter para TODOS]: ")
-
-    if usuario_str and usuario_str in usuarios_disponibles:
-        df_filtrado = df_filtrado[df_filtrado['username'] == usuario_str]
-        print_success(f"Filtrando por usuario: {usuario_str}")
-    else:
-        print_success("Mostrando datos de TODOS los usuarios.")
-    
-    return df_filtrado
-
-# --- Funciones de Análisis y Gráficos ---
-
-def analizar_datos(df_log_filtrado, df_perfiles_locales):
-    """Imprime los 10 análisis estadísticos en la consola."""
-    
-    if df_log_filtrado.empty:
-        print_warning("\nNo hay datos para analizar con los filtros seleccionados.")
-        return
-
-    print_header("Análisis Estadístico (10 Puntos)")
-
-    df_merged = df_log_filtrado.merge(
-        df_perfiles_locales[['id_perfil', 'nombre_visible']], 
-        on='id_perfil', 
-        how='left'
-    )
-    df_merged['nombre_visible'] = df_merged['nombre_visible'].fillna('Perfil Desconocido (Otro Usuario)')
-
-    # --- 1. KPIs Generales ---
-    print_subheader("1. KPIs Generales")
-    total_acciones = len(df_log_filtrado)
-    total_bytes = df_log_filtrado['file_size_bytes'].sum()
-    total_mb = total_bytes / (1024 * 1024)
-    usuarios_activos = df_log_filtrado['username'].nunique()
-    print(f"  - Total de acciones registradas: {total_acciones}")
-    print(f"  - Total de GB organizados: {total_mb / 1024:.2f} GB")
-    print(f"  - Usuarios activos en el periodo: {usuarios_activos}")
-
-    # --- 2. Tasas y Promedios Clave ---
-    print_subheader("2. Tasas y Promedios Clave")
-    acciones_movidas = (df_log_filtrado['status'] == 'MOVIDO').sum()
-    acciones_renombradas = (df_log_filtrado['status'] == 'RENOMBRADO').sum()
-    acciones_omitidas = (df_log_filtrado['status'] == 'OMITIDO').sum()
-    acciones_error = (df_log_filtrado['status'] == 'ERROR').sum()
-    
-    if total_acciones > 0:
-        print(f"  - Tasa de éxito (Movido/Renombrado): {((acciones_movidas + acciones_renombradas) / total_acciones) * 100:.1f}%")
-        print(f"  - Tasa de renombrado (Duplicados): {(acciones_renombradas / total_acciones) * 100:.1f}%")
-        print(f"  - Tasa de error: {(acciones_error / total_acciones) * 100:.1f}%")
-    
-    if (acciones_movidas + acciones_renombradas) > 0:
-        bytes_movidos = df_log_filtrado[df_log_filtrado['status'].isin(['MOVIDO', 'RENOMBRADO'])]['file_size_bytes'].sum()
-        mb_movidos = bytes_movidos / (1024 * 1024)
-        mb_promedio_movido = mb_movidos / (acciones_movidas + acciones_renombradas)
-        print(f"  - Tamaño promedio de archivo movido: {mb_promedio_movido:.2f} MB")
-    else:
-        print("  - No se movieron archivos en este periodo.")
-
-    # --- 3. Análisis de Estado (Resultados de Acciones) ---
-    print_subheader("3. Desglose de Acciones (Status)")
-    print(df_log_filtrado['status'].value_counts().to_string(header=False))
-
-    # --- 4. Análisis de Materias (Subject Assigned) ---
-    print_subheader("4. Materias (Palabras Clave) Más Populares")
-    materias_reales = df_log_filtrado[
-        ~df_log_filtrado['subject_assigned'].isin(['N/A', 'Otros', None, ''])
-    ]['subject_assigned']
-    
-    if materias_reales.empty:
-        print("  - No se asignó ninguna materia (palabra clave) en este periodo.")
-    else:
-        print(materias_reales.value_counts().head(10).to_string(header=False))
-    
-    otros_conteo = (df_log_filtrado['subject_assigned'] == 'Otros').sum()
-    print(f"  - Archivos movidos a 'Otros': {otros_conteo}")
-
-    # --- 5. Análisis de Usuarios (Username) ---
-    print_subheader("5. Top 5 Usuarios por Actividad (Acciones)")
-    print(df_log_filtrado['username'].value_counts().head(5).to_string(header=False))
-
-    # --- 6. Análisis de Perfiles (Profile ID) ---
-    print_subheader("6. Perfiles Más Usados (por Nombre)")
-    uso_de_perfiles = df_merged['nombre_visible'].value_counts().to_frame(name='conteo_acciones')
-    print(uso_de_perfiles.to_string())
-
-    # --- 7. Actividad por Hora del Día (Horas Pico) ---
-    print_subheader("7. Actividad por Hora del Día (0-23)")
-    horas_pico = df_log_filtrado['log_timestamp'].dt.hour.value_counts().sort_index()
-    print(horas_pico.to_string())
-    if not horas_pico.empty:
-        print(f"  - Hora Pico de Uso: {horas_pico.idxmax()} hrs (con {horas_pico.max()} acciones)")
-
-    # --- 8. Tipos de Archivo Más Comunes (Extensión) ---
-    print_subheader("8. Tipos de Archivo Más Comunes (Extensión)")
-    
-    def get_extension(path_str):
-        try:
-            if not isinstance(path_str, str):
-                return "N/A (No es path)"
-            ext = Path(path_str).suffix.lower()
-            return ext if ext else "Sin Extensión"
-        except Exception:
-            return "N/A (Error)"
-            
-    df_log_filtrado_copy = df_log_filtrado.copy()
-    df_log_filtrado_copy['extension'] = df_log_filtrado_copy['file_original_path'].apply(get_extension)
-    
-    extensiones = df_log_filtrado_copy[~df_log_filtrado_copy['extension'].isin(["Sin Extensión", "N/A (No es path)", "N/A (Error)"])]
-    if extensiones.empty:
-        print("  - No se encontraron extensiones de archivo para analizar.")
-    else:
-        print(extensiones['extension'].value_counts().head(10).to_string(header=False))
-
-    # --- 9. Errores y Omisiones (Análisis de Fallos) ---
-    print_subheader("9. Análisis de Errores y Omisiones")
-    if acciones_error > 0:
-        print(f"  - {acciones_error} archivos generaron un error.")
-    else:
-        print("  - ¡Cero errores en este periodo!")
-        
-    if acciones_omitidas > 0:
-        print(f"  - {acciones_omitidas} archivos fueron omitidos (probablemente 'Ignorar' estaba activo).")
-
-    # --- 10. Actividad por Día (Series de Tiempo) ---
-    print_subheader("10. Acciones por Día (Series de Tiempo)")
-    actividad_diaria = df_log_filtrado.set_index('log_timestamp').resample('D').size()
-    print(actividad_diaria.to_string())
-
-# --- Función de Gráficos ---
-
-def generar_graficos(df_log_filtrado, df_perfiles_locales):
-    """Genera y guarda 5 gráficos PNG usando Matplotlib."""
-    
-    if df_log_filtrado.empty:
-        print_warning("\nNo hay datos para graficar (DataFrame vacío después de filtros).")
-        return
-
-    print_header("Generando Gráficos (PNG)")
-    
-    df_merged = df_log_filtrado.merge(
-        df_perfiles_locales[['id_perfil', 'nombre_visible']], 
-        on='id_perfil', 
-        how='left'
-    )
-    df_merged['nombre_visible'] = df_merged['nombre_visible'].fillna('Perfil Desconocido')
-
-    # --- Gráfico 1: Pie de Estados (Resultados) ---
-    try:
-        plt.figure(figsize=(8, 8))
-        status_counts = df_log_filtrado['status'].value_counts()
-        if status_counts.empty:
-             print_warning("  - Gráfico 1 (Pie de Status) omitido: No hay datos de 'status'.")
-        else:
-            plt.pie(status_counts, labels=status_counts.index, autopct='%1.1f%%', startangle=90, colors=['#4A5C36', '#D4E289', '#E57373', '#F8F3D8'])
-            plt.title('Gráfico 1: Desglose de Acciones (Status)')
-            plt.savefig(SCRIPT_DIR / '1_grafico_acciones_status.png')
-            plt.close()
-            print_success("  - Gráfico 1 (Pie de Status) guardado.")
-    except Exception as e:
-        print_error(f"  - Error al generar Gráfico 1: {e}")
-
-    # --- Gráfico 2: Barras de Top 5 Usuarios ---
-    try:
-        plt.figure(figsize=(10, 6))
-        user_counts = df_log_filtrado['username'].value_counts().head(5)
-        if user_counts.empty:
-             print_warning("  - Gráfico 2 (Top Usuarios) omitido: No hay datos de 'username'.")
-        else:
-            user_counts.plot(kind='bar', color='#4A5C36')
-            plt.title('Gráfico 2: Top 5 Usuarios por Actividad')
-            plt.xlabel('Usuario')
-            plt.ylabel('Cantidad de Acciones')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.savefig(SCRIPT_DIR / '2_grafico_top_usuarios.png')
-            plt.close()
-            print_success("  - Gráfico 2 (Top Usuarios) guardado.")
-    except Exception as e:
-        print_error(f"  - Error al generar Gráfico 2: {e}")
-
-    # --- Gráfico 3: Barras de Top 10 Materias ---
-    try:
-        materias_reales = df_log_filtrado[~df_log_filtrado['subject_assigned'].isin(['N/A', 'Otros', None, ''])].loc[:,'subject_assigned']
-        if not materias_reales.empty:
-            plt.figure(figsize=(10, 6))
-            materia_counts = materias_reales.value_counts().head(10)
-            materia_counts.plot(kind='barh', color='#D4E289')
-            plt.title('Gráfico 3: Top 10 Materias (Palabras Clave) Usadas')
-            plt.xlabel('Cantidad de Archivos')
-            plt.ylabel('Materia')
-            plt.gca().invert_yaxis() # La más popular arriba
-            plt.tight_layout()
-            plt.savefig(SCRIPT_DIR / '3_grafico_top_materias.png')
-            plt.close()
-            print_success("  - Gráfico 3 (Top Materias) guardado.")
-        else:
-            print_warning("  - Gráfico 3 (Top Materias) omitido: no hay datos de materias.")
-    except Exception as e:
-        print_error(f"  - Error al generar Gráfico 3: {e}")
-
-    # --- Gráfico 4: Línea de Actividad por Día ---
-    try:
-        plt.figure(figsize=(12, 6))
-        actividad_diaria = df_log_filtrado.set_index('log_timestamp').resample('D').size()
-        if actividad_diaria.empty:
-             print_warning("  - Gráfico 4 (Actividad por Día) omitido: No hay datos para la serie de tiempo.")
-        else:
-            actividad_diaria.plot(kind='line', marker='o', color='#4A5C36')
-            plt.title('Gráfico 4: Actividad por Día (Series de Tiempo)')
-            plt.xlabel('Fecha')
-            plt.ylabel('Cantidad de Acciones')
-            plt.grid(True, linestyle='--', alpha=0.6)
-            plt.tight_layout()
-            plt.savefig(SCRIPT_DIR / '4_grafico_actividad_diaria.png')
-            plt.close()
-            print_success("  - Gráfico 4 (Actividad por Día) guardado.")
-    except Exception as e:
-        print_error(f"  - Error al generar Gráfico 4: {e}")
-
-    # --- Gráfico 5: Barras de Hora del Día ---
-    try:
-        plt.figure(figsize=(10, 6))
-        horas_pico = df_log_filtrado['log_timestamp'].dt.hour.value_counts().sort_index()
-        if horas_pico.empty:
-             print_warning("  - Gráfico 5 (Horas Pico) omitido: No hay datos de horas.")
-        else:
-            horas_pico.plot(kind='bar', color='#4A5C36')
-            plt.title('Gráfico 5: Actividad por Hora del Día (Picos de Uso)')
-            plt.xlabel('Hora del Día (0-23)')
-            plt.ylabel('Cantidad de Acciones')
-            plt.xticks(rotation=0)
-            plt.tight_layout()
-            plt.savefig(SCRIPT_DIR / '5_grafico_horas_pico.png')
-            plt.close()
-            print_success("  - Gráfico 5 (Horas Pico) guardado.")
-    except Exception as e:
-        print_error(f"  - Error al generar Gráfico 5: {e}")
-
-
-# --- Funciones de Utilidad (Impresión) ---
-def print_header(title):
-    print("\n" + "="*70)
-    print(f" {title.upper()} ".center(70, "="))
-    print("="*70)
-
-def print_subheader(title):
-    print(f"\n--- {title} ---")
-
-def print_success(message):
-    # Verde
-    print(f"\033[92m[ÉXITO] {message}\033[0m")
-
-def print_error(message):
-    # Rojo
-    print(f"\033[91m[ERROR] {message}\033[0m")
-
-def print_warning(message):
-    # Amarillo
-    print(f"\033[93m[AVISO] {message}\033[0m")
-
-# --- Función Principal ---
-def main():
-    # 1. Cargar Datos
-    print_header("Fase 1: Carga de Datos")
-    df_log_completo = cargar_admin_log()
-    if df_log_completo is None:
-        print_error("Fallo crítico al cargar 'admin_log.csv'. El script no puede continuar.")
-        sys.exit(1)
-        
-    df_perfiles = cargar_perfiles_locales()
-
-    # 2. Obtener Filtros
-    df_log_filtrado = obtener_filtros_interactivos(df_log_completo)
-
-    # 3. Realizar Análisis
-    analizar_datos(df_log_filtrado, df_perfiles)
-    
-    # 4. Generar Gráficos
-    generar_graficos(df_log_filtrado, df_perfiles)
-    
-    print_header("Análisis Completado")
-    print_success(f"Reporte impreso en consola y gráficos (si se generaron) guardados en:\n{SCRIPT_DIR}")
-
-if __name__ == "__main__":
-    main()
+import time
+_INICIO = time.perf_counter() # Para medir cuánto tarda el arranque
+
+import argparse
+import sys
+from pathlib import Path
+import os
+import getpass
+import json
+import sqlite3
+
+from live_stats import LiveStats, STATUS_MOVIDOS
+from normalizer import merge_variants
+
+# pandas, matplotlib y los módulos que los usan tardan segundos en importarse:
+# se cargan solo para el análisis completo (ver importar_analisis_completo)
+pd = None
+
+# --- CONFIGURACIÓN ---
+# Define las rutas a los archivos CSV
+# (Esto asume que el script de análisis está en la misma carpeta que el log)
+SCRIPT_DIR = Path(__file__).parent
+ADMIN_LOG_PATH = SCRIPT_DIR / "admin_log.csv"
+LOG_CACHE_DIR = SCRIPT_DIR / ".cache_admin_log" # Copia tipada del log (ver log_cache.py)
+GRAFICOS_CACHE_PATH = SCRIPT_DIR / ".cache_graficos.json" # Huellas de los PNG ya dibujados (ver charts.py)
+STATS_SNAPSHOT_PATH = SCRIPT_DIR / ".stats_admin_log.json" # Foto de contadores compartida con la app (ver live_stats.py)
+APP_DATA_ROOT = Path(os.environ.get('APPDATA', Path.home()))
+# Mismo almacén de perfiles que la app: "csv" (por defecto) o "sqlite" (ver app.py)
+PERFILES_BACKEND = os.environ.get('ORGANIZADOR_PERFILES', 'csv').strip().lower()
+
+# --- Nombres de columna SINCRONIZADOS ---
+COLUMNAS_LOG = [
+    'log_timestamp', 'id_perfil', 'username', 'file_original_path', 
+    'subject_assigned', 'status', 'file_new_path', 'file_hash', 'file_size_bytes'
+]
+COLUMNAS_PERFILES = [
+    'id_perfil', 'nombre_visible', 'lista_materias_pipe', 'manejo_otros', 
+    'ultimo_uso_timestamp', 'creado_en_timestamp', 'contador_archivos_movidos'
+]
+# --- FIN DE CONFIGURACIÓN ---
+
+def importar_analisis_completo():
+    """Importa pandas y los módulos de análisis/gráficos (solo en el modo completo)."""
+    global pd, ChartSpec, render_charts, LogIngestCache, LogColumnsError
+    global FILAS_POR_BLOQUE, LogAggregates, aggregate_log, scan_log_range
+    import pandas as pd
+    from charts import ChartSpec, render_charts
+    from log_cache import LogIngestCache, LogColumnsError
+    from log_stats import FILAS_POR_BLOQUE, LogAggregates, aggregate_log, scan_log_range
+
+# --- Funciones de Carga de Datos ---
+
+def cargar_admin_log():
+    """Carga el log de administrador (público)."""
+    print(f"Cargando log de administrador desde: {ADMIN_LOG_PATH}")
+    if not ADMIN_LOG_PATH.exists():
+        print_error(f"Error: No se encontró '{ADMIN_LOG_PATH}'.")
+        print_error("Asegúrate de que 'admin_log.csv' esté en la misma carpeta que este script.")
+        print_error("Usa la app 'Desshufle.bat' primero para generar un log.")
+        return None
+    
+    try:
+        # Caché tipado: solo se leen las líneas agregadas desde la última vez
+        df_log, info = LogIngestCache(ADMIN_LOG_PATH, LOG_CACHE_DIR, COLUMNAS_LOG).load()
+        if info['rebuilt']:
+            print(f"  - Caché del log (re)construido: {info['rows_new']} filas.")
+        else:
+            print(f"  - Filas desde el caché: {info['rows_cached']} | filas nuevas leídas: {info['rows_new']}")
+        if not info['saved']:
+            print_warning(f"No se pudo guardar el caché en '{LOG_CACHE_DIR}'. El próximo arranque leerá todo el log.")
+
+        if info['rows_raw'] == 0:
+            print_error("Error: El archivo admin_log.csv está vacío (no tiene filas de datos).")
+            return None
+
+        # Las filas sin fecha válida (NaT) ya se descartaron al tipar
+        if df_log.empty:
+            print_error("Error: No se pudieron leer fechas válidas ('log_timestamp') del CSV.")
+            print_error("Revisa que la columna 'log_timestamp' no esté vacía o corrupta.")
+            return None
+        
+        print_success("Log de administrador cargado.")
+        return df_log
+        
+    except LogColumnsError as e:
+        print_error(f"Error: El admin_log.csv no tiene las columnas esperadas: {e.missing}")
+        return None
+    except FileNotFoundError:
+        print_error(f"Error: El archivo '{ADMIN_LOG_PATH}' no existe.")
+    except KeyError as e:
+        print_error(f"Error crítico al leer admin_log.csv: Falta la columna {e}.")
+        print_error("El admin_log.csv no coincide con la estructura esperada por el script.")
+    except Exception as e:
+        print_error(f"Error inesperado al leer admin_log.csv: {e}")
+    
+    return None
+
+def cargar_perfiles_locales():
+    """Carga los perfiles del usuario actual (privado)."""
+    username = getpass.getuser()
+    perfil_csv_path = APP_DATA_ROOT / "OrganizadorMaterias" / "perfiles.csv"
+    perfil_db_path = APP_DATA_ROOT / "OrganizadorMaterias" / "perfiles.db"
+
+    # Si la app usa el almacén SQLite (ORGANIZADOR_PERFILES=sqlite), leer de ahí;
+    # un perfiles.db que quedó de antes no cuenta si la app volvió al CSV
+    if PERFILES_BACKEND == "sqlite" and perfil_db_path.exists():
+        print(f"Cargando perfiles locales para '{username}' desde: {perfil_db_path}")
+        try:
+            with sqlite3.connect(perfil_db_path) as conn:
+                filas = conn.execute("SELECT datos FROM perfiles ORDER BY rowid").fetchall()
+            df_perfil = pd.DataFrame([json.loads(datos) for (datos,) in filas], dtype=str)
+            return _preparar_perfiles(df_perfil)
+        except Exception as e:
+            print_warning(f"No se pudo leer perfiles.db ({e}). Se intentará con perfiles.csv.")
+
+    print(f"Cargando perfiles locales para '{username}' desde: {perfil_csv_path}")
+
+    if not perfil_csv_path.exists():
+        print_warning(f"No se encontró '{perfil_csv_path}'.")
+        print_warning("El análisis se ejecutará sin nombres de perfiles (solo IDs).")
+        return pd.DataFrame(columns=COLUMNAS_PERFILES) # Devolver DF vacío
+
+    try:
+        df_perfil = pd.read_csv(perfil_csv_path, dtype=str)
+        return _preparar_perfiles(df_perfil)
+
+    except Exception as e:
+        print_error(f"Error al leer perfiles.csv: {e}")
+        return pd.DataFrame(columns=COLUMNAS_PERFILES) # Devolver DF vacío
+
+def _preparar_perfiles(df_perfil):
+    """Deja solo las columnas conocidas y convierte números y fechas."""
+    columnas_existentes = [col for col in COLUMNAS_PERFILES if col in df_perfil.columns]
+    df_perfil_filtrado = df_perfil[columnas_existentes]
+
+    # Convertir columnas numéricas
+    if 'contador_archivos_movidos' in df_perfil_filtrado.columns:
+        df_perfil_filtrado['contador_archivos_movidos'] = pd.to_numeric(df_perfil_filtrado['contador_archivos_movidos'], errors='coerce').fillna(0)
+    
+    # Convertir fechas
+    if 'ultimo_uso_timestamp' in df_perfil_filtrado.columns:
+        df_perfil_filtrado['ultimo_uso_timestamp'] = pd.to_datetime(df_perfil_filtrado['ultimo_uso_timestamp'], errors='coerce')
+    if 'creado_en_timestamp' in df_perfil_filtrado.columns:
+        df_perfil_filtrado['creado_en_timestamp'] = pd.to_datetime(df_perfil_filtrado['creado_en_timestamp'], errors='coerce')
+
+    print_success("Perfiles locales cargados.")
+    return df_perfil_filtrado
+
+# --- Funciones de Filtros Interactivos ---
+
+def pedir_filtros(min_date, max_date, usuarios_en_rango):
+    """
+    Pregunta al usuario por filtros de fecha y usuario.
+    usuarios_en_rango(fecha_inicio, fecha_fin) devuelve los usuarios con actividad en ese rango.
+    """
+    print_header("Filtros Interactivos")
+    
+    # --- Filtro de Fecha ---
+    print("\n--- Filtro de Fecha ---")
+    print(f"Rango de datos disponible: {min_date} a {max_date}")
+
+    fecha_inicio_str = input(f"Fecha de inicio (YYYY-MM-DD) [Enter para {min_date}]: ")
+    fecha_fin_str = input(f"Fecha de fin (YYYY-MM-DD) [Enter para {max_date}]: ")
+
+    try:
+        fecha_inicio = pd.to_datetime(fecha_inicio_str).date() if fecha_inicio_str else min_date
+        fecha_fin = pd.to_datetime(fecha_fin_str).date() if fecha_fin_str else max_date
+    except ValueError:
+        print_warning("Fecha inválida. Usando el rango completo.")
+        fecha_inicio, fecha_fin = min_date, max_date
+
+    filtros = {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin, 'usuario': None}
+    
+    # --- Filtro de Usuario ---
+    print("\n--- Filtro de Usuario ---")
+    usuarios_disponibles = usuarios_en_rango(fecha_inicio, fecha_fin)
+    # Manejar el caso de que no haya usuarios en el rango
+    if len(usuarios_disponibles) == 0:
+        print("No hay usuarios disponibles en este rango de fechas.")
+        return filtros
+        
+    print(f"Usuarios disponibles: {', '.join(usuarios_disponibles)}")
+    usuario_str = input("Nombre de usuario [Enter para TODOS]: ")
+
+    if usuario_str and usuario_str in usuarios_disponibles:
+        filtros['usuario'] = usuario_str
+        print_success(f"Filtrando por usuario: {usuario_str}")
+    else:
+        print_success("Mostrando datos de TODOS los usuarios.")
+    
+    return filtros
+
+def aplicar_filtros(df_log, filtros):
+    """Aplica los filtros de fecha/usuario a un DataFrame (el log completo o un bloque)."""
+    # Rango de timestamps [inicio 00:00, día siguiente al fin 00:00) en la zona del log:
+    # compara enteros en vez de crear un objeto 'date' por fila
+    timestamps = df_log['log_timestamp']
+    zona = timestamps.dt.tz
+    inicio = pd.Timestamp(filtros['fecha_inicio']).tz_localize(zona)
+    fin = (pd.Timestamp(filtros['fecha_fin']) + pd.Timedelta(days=1)).tz_localize(zona)
+    mascara = (timestamps >= inicio) & (timestamps < fin)
+    if filtros['usuario'] is not None:
+        mascara &= df_log['username'] == filtros['usuario']
+    return df_log[mascara]
+
+def obtener_filtros_interactivos(df_log):
+    """Pregunta por los filtros y devuelve el log ya filtrado (modo en memoria)."""
+    min_date = df_log['log_timestamp'].min().date()
+    max_date = df_log['log_timestamp'].max().date()
+
+    def usuarios_en_rango(fecha_inicio, fecha_fin):
+        en_rango = aplicar_filtros(df_log, {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin, 'usuario': None})
+        return list(en_rango['username'].dropna().unique()) # Filas sin usuario no se listan
+
+    filtros = pedir_filtros(min_date, max_date, usuarios_en_rango)
+    return aplicar_filtros(df_log, filtros)
+
+def recorrer_log_por_bloques(filas_por_bloque):
+    """
+    Modo por bloques, primera pasada: solo fechas y usuarios (para los filtros),
+    leyendo el CSV en bloques de tamaño fijo. Devuelve None si falla.
+    """
+    print(f"Leyendo '{ADMIN_LOG_PATH}' por bloques de {filas_por_bloque} filas...")
+    if not ADMIN_LOG_PATH.exists():
+        print_error(f"Error: No se encontró '{ADMIN_LOG_PATH}'.")
+        print_error("Usa la app 'Desshufle.bat' primero para generar un log.")
+        return None
+    try:
+        rango = scan_log_range(ADMIN_LOG_PATH, COLUMNAS_LOG, filas_por_bloque)
+    except LogColumnsError as e:
+        print_error(f"Error: El admin_log.csv no tiene las columnas esperadas: {e.missing}")
+        return None
+    except Exception as e:
+        print_error(f"Error inesperado al leer admin_log.csv por bloques: {e}")
+        return None
+
+    if rango.rows == 0:
+        print_error("Error: No se pudieron leer fechas válidas ('log_timestamp') del CSV.")
+        return None
+    print_success(f"Log recorrido por bloques: {rango.rows} filas con fecha válida.")
+    return rango
+
+def resumir_por_bloques(filtros, filas_por_bloque):
+    """
+    Modo por bloques, segunda pasada: filtra cada bloque y suma los resúmenes
+    parciales. La memoria no crece con el tamaño del log. Devuelve None si falla.
+    """
+    try:
+        return aggregate_log(
+            ADMIN_LOG_PATH, COLUMNAS_LOG,
+            filter_chunk=lambda bloque: aplicar_filtros(bloque, filtros),
+            chunk_rows=filas_por_bloque
+        )
+    except Exception as e:
+        print_error(f"Error inesperado al leer admin_log.csv por bloques: {e}")
+        return None
+
+# --- Modo Resumen (solo biblioteca estándar) ---
+
+def _mas_frecuentes(conteos, limite=None):
+    """Pares (valor, conteo) de mayor a menor, como value_counts()."""
+    pares = sorted(conteos.items(), key=lambda par: par[1], reverse=True)
+    return pares[:limite] if limite is not None else pares
+
+def _imprimir_conteos(pares):
+    ancho = max((len(str(valor)) for valor, _ in pares), default=0)
+    for valor, conteo in pares:
+        print(f"{str(valor):<{ancho}}    {conteo}")
+
+def resumen_rapido():
+    """
+    Imprime los KPIs principales del log completo sin pandas ni matplotlib,
+    con los contadores de live_stats.py (la misma foto que usa la app: solo
+    se leen las filas nuevas). Sin filtros, perfiles ni extensiones.
+    """
+    print(f"Leyendo contadores de: {ADMIN_LOG_PATH}")
+    if not ADMIN_LOG_PATH.exists():
+        print_error(f"Error: No se encontró '{ADMIN_LOG_PATH}'.")
+        print_error("Usa la app 'Desshufle.bat' primero para generar un log.")
+        return False
+
+    stats_log = LiveStats(ADMIN_LOG_PATH, STATS_SNAPSHOT_PATH)
+    info = stats_log.load()
+    if info['from_snapshot']:
+        print(f"  - Contadores desde la foto | filas nuevas leídas: {info['rows_new']}")
+    else:
+        print(f"  - Contadores recalculados desde el log: {info['rows_new']} filas.")
+    stats = stats_log.snapshot()
+    if stats['total'] == 0:
+        print_warning("\nEl log no tiene filas para resumir.")
+        return True
+
+    print_header("Resumen Rápido (Log Completo)")
+
+    # --- 1. KPIs Generales ---
+    print_subheader("1. KPIs Generales")
+    print(f"  - Total de acciones registradas: {stats['total']}")
+    print(f"  - Total de GB organizados: {stats['bytes'] / (1024 ** 3):.2f} GB")
+    print(f"  - Usuarios activos: {stats['users']}")
+    if stats['first_timestamp'] is not None:
+        print(f"  - Periodo: {stats['first_timestamp'][:10]} a {stats['last_timestamp'][:10]}")
+    if stats['bad_timestamp']:
+        print_warning(f"  - {stats['bad_timestamp']} filas con fecha ilegible no se cuentan (igual que en el análisis completo).")
+
+    # --- 2. Tasas y Promedios Clave ---
+    print_subheader("2. Tasas y Promedios Clave")
+    por_status = stats['by_status']
+    renombradas = por_status.get('RENOMBRADO', 0)
+    print(f"  - Tasa de éxito (Movido/Renombrado): {stats['moved'] / stats['total'] * 100:.1f}%")
+    print(f"  - Tasa de renombrado (Duplicados): {renombradas / stats['total'] * 100:.1f}%")
+    print(f"  - Tasa de error: {stats['errors'] / stats['total'] * 100:.1f}%")
+    if stats['moved'] > 0:
+        print(f"  - Tamaño promedio de archivo movido: {stats['bytes_moved'] / (1024 * 1024) / stats['moved']:.2f} MB")
+    else:
+        print("  - No se movieron archivos.")
+
+    # --- 3. Desglose de Acciones ---
+    print_subheader("3. Desglose de Acciones (Status)")
+    _imprimir_conteos(_mas_frecuentes(por_status))
+
+    # --- 4. Materias ---
+    print_subheader("4. Materias (Palabras Clave) Más Populares")
+    materias = {materia: conteo for materia, conteo in stats['by_subject'].items() if materia not in ('N/A', 'Otros', '')}
+    materias = merge_variants(materias) # Mismo plegado que la app: "Cálculo II" = "calculo_ii"
+    if materias:
+        _imprimir_conteos(_mas_frecuentes(materias, 10))
+    else:
+        print("  - No se asignó ninguna materia (palabra clave).")
+    print(f"  - Archivos movidos a 'Otros': {stats['by_subject'].get('Otros', 0)}")
+
+    # --- 5. Usuarios ---
+    print_subheader("5. Top 5 Usuarios por Actividad (Acciones)")
+    _imprimir_conteos(_mas_frecuentes(stats['by_user'], 5))
+
+    # --- 6. Horas Pico ---
+    print_subheader("6. Actividad por Hora del Día (0-23)")
+    horas = sorted((int(hora), conteo) for hora, conteo in stats['by_hour'].items() if hora.isdigit())
+    _imprimir_conteos(horas)
+    if horas:
+        hora_pico, conteo_pico = max(horas, key=lambda par: par[1])
+        print(f"  - Hora Pico de Uso: {hora_pico} hrs (con {conteo_pico} acciones)")
+
+    # --- 7. Últimos Días ---
+    print_subheader("7. Acciones por Día (últimos 10 días con actividad)")
+    _imprimir_conteos(sorted(stats['by_day'].items())[-10:])
+
+    estados_ok = ', '.join(STATUS_MOVIDOS)
+    print(f"\n(Movidos = {estados_ok}. Filtros, perfiles, extensiones y gráficos: ejecutar sin --resumen.)")
+    return True
+
+# --- Funciones de Análisis y Gráficos ---
+
+def _nombres_de_perfiles(df_perfiles_locales):
+    """Diccionario id_perfil -> nombre_visible."""
+    if not {'id_perfil', 'nombre_visible'} <= set(df_perfiles_locales.columns):
+        return {}
+    return dict(zip(df_perfiles_locales['id_perfil'], df_perfiles_locales['nombre_visible']))
+
+def analizar_datos(resumen, df_perfiles_locales):
+    """Imprime los 10 análisis estadísticos en la consola (a partir del resumen del log filtrado)."""
+    
+    if resumen.rows == 0:
+        print_warning("\nNo hay datos para analizar con los filtros seleccionados.")
+        return
+
+    print_header("Análisis Estadístico (10 Puntos)")
+
+    # --- 1. KPIs Generales ---
+    print_subheader("1. KPIs Generales")
+    total_acciones = resumen.rows
+    total_bytes = resumen.total_bytes
+    total_mb = total_bytes / (1024 * 1024)
+    usuarios_activos = len(resumen.users)
+    print(f"  - Total de acciones registradas: {total_acciones}")
+    print(f"  - Total de GB organizados: {total_mb / 1024:.2f} GB")
+    print(f"  - Usuarios activos en el periodo: {usuarios_activos}")
+
+    # --- 2. Tasas y Promedios Clave ---
+    print_subheader("2. Tasas y Promedios Clave")
+    acciones_movidas = resumen.count_status('MOVIDO')
+    acciones_renombradas = resumen.count_status('RENOMBRADO')
+    acciones_omitidas = resumen.count_status('OMITIDO')
+    acciones_error = resumen.count_status('ERROR')
+    
+    if total_acciones > 0:
+        print(f"  - Tasa de éxito (Movido/Renombrado): {((acciones_movidas + acciones_renombradas) / total_acciones) * 100:.1f}%")
+        print(f"  - Tasa de renombrado (Duplicados): {(acciones_renombradas / total_acciones) * 100:.1f}%")
+        print(f"  - Tasa de error: {(acciones_error / total_acciones) * 100:.1f}%")
+    
+    if (acciones_movidas + acciones_renombradas) > 0:
+        bytes_movidos = resumen.bytes_for(['MOVIDO', 'RENOMBRADO'])
+        mb_movidos = bytes_movidos / (1024 * 1024)
+        mb_promedio_movido = mb_movidos / (acciones_movidas + acciones_renombradas)
+        print(f"  - Tamaño promedio de archivo movido: {mb_promedio_movido:.2f} MB")
+    else:
+        print("  - No se movieron archivos en este periodo.")
+
+    # --- 3. Análisis de Estado (Resultados de Acciones) ---
+    print_subheader("3. Desglose de Acciones (Status)")
+    print(resumen.status_series().to_string(header=False))
+
+    # --- 4. Análisis de Materias (Subject Assigned) ---
+    print_subheader("4. Materias (Palabras Clave) Más Populares")
+    materias_reales = resumen.subject_series()
+    
+    if materias_reales.empty:
+        print("  - No se asignó ninguna materia (palabra clave) en este periodo.")
+    else:
+        print(materias_reales.head(10).to_string(header=False))
+    
+    otros_conteo = resumen.subject_counts.get('Otros', 0)
+    print(f"  - Archivos movidos a 'Otros': {otros_conteo}")
+
+    # --- 5. Análisis de Usuarios (Username) ---
+    print_subheader("5. Top 5 Usuarios por Actividad (Acciones)")
+    print(resumen.user_series().head(5).to_string(header=False))
+
+    # --- 6. Análisis de Perfiles (Profile ID) ---
+    print_subheader("6. Perfiles Más Usados (por Nombre)")
+    uso_de_perfiles = resumen.profile_name_series(
+        _nombres_de_perfiles(df_perfiles_locales), 'Perfil Desconocido (Otro Usuario)'
+    ).to_frame(name='conteo_acciones')
+    print(uso_de_perfiles.to_string())
+
+    # --- 7. Actividad por Hora del Día (Horas Pico) ---
+    print_subheader("7. Actividad por Hora del Día (0-23)")
+    horas_pico = resumen.hour_series()
+    print(horas_pico.to_string())
+    if not horas_pico.empty:
+        print(f"  - Hora Pico de Uso: {horas_pico.idxmax()} hrs (con {horas_pico.max()} acciones)")
+
+    # --- 8. Tipos de Archivo Más Comunes (Extensión) ---
+    print_subheader("8. Tipos de Archivo Más Comunes (Extensión)")
+    extensiones = resumen.extension_series()
+    if extensiones.empty:
+        print("  - No se encontraron extensiones de archivo para analizar.")
+    else:
+        print(extensiones.head(10).to_string(header=False))
+
+    # --- 9. Errores y Omisiones (Análisis de Fallos) ---
+    print_subheader("9. Análisis de Errores y Omisiones")
+    if acciones_error > 0:
+        print(f"  - {acciones_error} archivos generaron un error.")
+    else:
+        print("  - ¡Cero errores en este periodo!")
+        
+    if acciones_omitidas > 0:
+        print(f"  - {acciones_omitidas} archivos fueron omitidos (probablemente 'Ignorar' estaba activo).")
+
+    # --- 10. Actividad por Día (Series de Tiempo) ---
+    print_subheader("10. Acciones por Día (Series de Tiempo)")
+    actividad_diaria = resumen.day_series()
+    print(actividad_diaria.to_string())
+
+# --- Función de Gráficos ---
+
+def generar_graficos(resumen, df_perfiles_locales):
+    """
+    Genera y guarda 5 gráficos PNG usando Matplotlib (a partir del mismo resumen del reporte).
+    Se dibujan en paralelo y sin ventana; los que no cambiaron se reutilizan.
+    """
+    
+    if resumen.rows == 0:
+        print_warning("\nNo hay datos para graficar (DataFrame vacío después de filtros).")
+        return
+
+    print_header("Generando Gráficos (PNG)")
+
+    graficos = []
+    omitidos = {}
+
+    # --- Gráfico 1: Pie de Estados (Resultados) ---
+    status_counts = resumen.status_series()
+    if status_counts.empty:
+        omitidos[1] = "  - Gráfico 1 (Pie de Status) omitido: No hay datos de 'status'."
+    else:
+        graficos.append(ChartSpec(
+            1, "Pie de Status", '1_grafico_acciones_status.png', 'pie', status_counts,
+            'Gráfico 1: Desglose de Acciones (Status)', figsize=(8, 8), tight_layout=False,
+            plot_kwargs={'autopct': '%1.1f%%', 'startangle': 90, 'colors': ['#4A5C36', '#D4E289', '#E57373', '#F8F3D8']}
+        ))
+
+    # --- Gráfico 2: Barras de Top 5 Usuarios ---
+    user_counts = resumen.user_series().head(5)
+    if user_counts.empty:
+        omitidos[2] = "  - Gráfico 2 (Top Usuarios) omitido: No hay datos de 'username'."
+    else:
+        graficos.append(ChartSpec(
+            2, "Top Usuarios", '2_grafico_top_usuarios.png', 'bar', user_counts,
+            'Gráfico 2: Top 5 Usuarios por Actividad', 'Usuario', 'Cantidad de Acciones',
+            plot_kwargs={'color': '#4A5C36'}, xticks_rotation=45
+        ))
+
+    # --- Gráfico 3: Barras de Top 10 Materias ---
+    materias_reales = resumen.subject_series()
+    if materias_reales.empty:
+        omitidos[3] = "  - Gráfico 3 (Top Materias) omitido: no hay datos de materias."
+    else:
+        graficos.append(ChartSpec(
+            3, "Top Materias", '3_grafico_top_materias.png', 'barh', materias_reales.head(10),
+            'Gráfico 3: Top 10 Materias (Palabras Clave) Usadas', 'Cantidad de Archivos', 'Materia',
+            plot_kwargs={'color': '#D4E289'}, invert_y=True
+        ))
+
+    # --- Gráfico 4: Línea de Actividad por Día ---
+    actividad_diaria = resumen.day_series()
+    if actividad_diaria.empty:
+        omitidos[4] = "  - Gráfico 4 (Actividad por Día) omitido: No hay datos para la serie de tiempo."
+    else:
+        graficos.append(ChartSpec(
+            4, "Actividad por Día", '4_grafico_actividad_diaria.png', 'line', actividad_diaria,
+            'Gráfico 4: Actividad por Día (Series de Tiempo)', 'Fecha', 'Cantidad de Acciones',
+            figsize=(12, 6), plot_kwargs={'marker': 'o', 'color': '#4A5C36'},
+            grid={'linestyle': '--', 'alpha': 0.6}
+        ))
+
+    # --- Gráfico 5: Barras de Hora del Día ---
+    horas_pico = resumen.hour_series()
+    if horas_pico.empty:
+        omitidos[5] = "  - Gráfico 5 (Horas Pico) omitido: No hay datos de horas."
+    else:
+        graficos.append(ChartSpec(
+            5, "Horas Pico", '5_grafico_horas_pico.png', 'bar', horas_pico,
+            'Gráfico 5: Actividad por Hora del Día (Picos de Uso)', 'Hora del Día (0-23)', 'Cantidad de Acciones',
+            plot_kwargs={'color': '#4A5C36'}, xticks_rotation=0
+        ))
+
+    inicio = time.perf_counter()
+    try:
+        resultados = render_charts(graficos, SCRIPT_DIR, GRAFICOS_CACHE_PATH)
+    except Exception as e:
+        print_error(f"  - Error al iniciar el dibujo de gráficos: {e}")
+        return
+
+    nombres = {grafico.number: grafico.name for grafico in graficos}
+    for numero in range(1, 6):
+        if numero in omitidos:
+            print_warning(omitidos[numero])
+            continue
+        estado, valor = resultados[numero]
+        if estado == 'error':
+            print_error(f"  - Error al generar Gráfico {numero}: {valor}")
+        elif estado == 'reutilizado':
+            print_success(f"  - Gráfico {numero} ({nombres[numero]}) sin cambios: se reutiliza el PNG.")
+        else:
+            print_success(f"  - Gráfico {numero} ({nombres[numero]}) guardado. ({valor:.2f} s)")
+    print(f"  - Tiempo total de gráficos: {time.perf_counter() - inicio:.2f} s")
+
+
+# --- Funciones de Utilidad (Impresión) ---
+def print_header(title):
+    print("\n" + "="*70)
+    print(f" {title.upper()} ".center(70, "="))
+    print("="*70)
+
+def print_subheader(title):
+    print(f"\n--- {title} ---")
+
+def print_success(message):
+    # Verde
+    print(f"\033[92m[ÉXITO] {message}\033[0m")
+
+def print_error(message):
+    # Rojo
+    print(f"\033[91m[ERROR] {message}\033[0m")
+
+def print_warning(message):
+    # Amarillo
+    print(f"\033[93m[AVISO] {message}\033[0m")
+
+# --- Función Principal ---
+def leer_argumentos():
+    parser = argparse.ArgumentParser(description="Analizador del admin_log.csv")
+    parser.add_argument(
+        '--resumen', action='store_true',
+        help="Resumen rápido de los KPIs sin pandas ni matplotlib (log completo, sin filtros ni gráficos)"
+    )
+    parser.add_argument(
+        '--por-bloques', action='store_true',
+        help="Lee el log por bloques con memoria acotada (para logs que no caben en memoria)"
+    )
+    parser.add_argument(
+        '--filas-por-bloque', type=int, default=None,
+        help="Filas por bloque en el modo --por-bloques (por defecto FILAS_POR_BLOQUE de log_stats.py)"
+    )
+    return parser.parse_args()
+
+def main():
+    args = leer_argumentos()
+
+    if args.resumen:
+        if not resumen_rapido():
+            sys.exit(1)
+        print(f"\nResumen listo en {time.perf_counter() - _INICIO:.2f} s desde el arranque.")
+        return
+
+    importar_analisis_completo()
+    print(f"Módulos de análisis cargados en {time.perf_counter() - _INICIO:.2f} s desde el arranque.")
+
+    # 1. Cargar Datos
+    print_header("Fase 1: Carga de Datos")
+    if args.por_bloques:
+        filas_por_bloque = FILAS_POR_BLOQUE if args.filas_por_bloque is None else max(1, args.filas_por_bloque)
+        rango = recorrer_log_por_bloques(filas_por_bloque)
+        if rango is None:
+            print_error("Fallo crítico al leer 'admin_log.csv'. El script no puede continuar.")
+            sys.exit(1)
+
+        df_perfiles = cargar_perfiles_locales()
+
+        # 2. Obtener Filtros (y contar, bloque por bloque)
+        filtros = pedir_filtros(rango.min_ts.date(), rango.max_ts.date(), rango.users_between)
+        resumen = resumir_por_bloques(filtros, filas_por_bloque)
+        if resumen is None:
+            print_error("Fallo crítico al leer 'admin_log.csv'. El script no puede continuar.")
+            sys.exit(1)
+    else:
+        df_log_completo = cargar_admin_log()
+        if df_log_completo is None:
+            print_error("Fallo crítico al cargar 'admin_log.csv'. El script no puede continuar.")
+            sys.exit(1)
+            
+        df_perfiles = cargar_perfiles_locales()
+
+        # 2. Obtener Filtros
+        df_log_filtrado = obtener_filtros_interactivos(df_log_completo)
+        resumen = LogAggregates.from_frame(df_log_filtrado)
+
+    # 3. Realizar Análisis
+    analizar_datos(resumen, df_perfiles)
+    
+    # 4. Generar Gráficos
+    generar_graficos(resumen, df_perfiles)
+    
+    print_header("Análisis Completado")
+    print_success(f"Reporte impreso en consola y gráficos (si se generaron) guardados en:\n{SCRIPT_DIR}")
+
+if __name__ == "__main__":
+    main()
@@ -1,479 +1,1589 @@
-# --- app.py (El "Motor" y "Cocina") ---
-# Esta versión INCLUYE la corrección para el bug
-# de espacios en la lista de materias.
-
-import os
-import shutil
-from pathlib import Path
-import time
-import unicodedata
-import re
-import csv
-from datetime import datetime
-import getpass
-import json # Necesario para enviar datos al HTML
-import webbrowser # Para abrir el navegador
-import threading # Para abrir el navegador después de que inicie Flask
-
-# --- Importaciones de Flask ---
-from flask import Flask, render_template, jsonify, request
-from flask_cors import CORS
-
-# --- Configuración de Flask ---
-app = Flask(__name__)
-# Permitir que nuestro HTML hable con nuestro servidor Python
-CORS(app) 
-
-# --- Constantes Globales ---
-# Carpeta privada del USUARIO (para perfiles)
-APP_DATA_DIR = Path(os.environ.get('APPDATA', Path.home())) / "OrganizadorMaterias"
-PERFILES_CSV = APP_DATA_DIR / "perfiles.csv"
-# Carpeta pública del SCRIPT (para el log)
-SCRIPT_DIR = Path(__file__).parent
-ADMIN_LOG_CSV = SCRIPT_DIR / "admin_log.csv"
-MATERIAS_SEPARATOR = "|"
-
-# --- Funciones de Ayuda (Impresión y Rutas) ---
-
-def print_success(message):
-    print(f"\033[92m[ÉXITO] {message}\033[0m")
-
-def print_error(message):
-    print(f"\033[91m[ERROR] {message}\033[0m")
-
-def print_warning(message):
-    print(f"\033[93m[AVISO] {message}\033[0m")
-
-def get_default_directories():
-    """
-    Encuentra las carpetas comunes del usuario (Descargas, etc.)
-    Probando rutas en Español e Inglés, con y sin OneDrive.
-    """
-    home = Path.home()
-    carpetas = {
-        'Descargas': [
-            home / "OneDrive" / "Descargas", home / "Descargas",
-            home / "OneDrive" / "Downloads", home / "Downloads"
-        ],
-        'Documentos': [
-            home / "OneDrive" / "Documentos", home / "Documentos",
-            home / "OneDrive" / "Documents", home / "Documents"
-        ],
-        'Escritorio': [
-            home / "OneDrive" / "Escritorio", home / "Escritorio",
-            home / "OneDrive" / "Desktop", home / "Desktop"
-        ],
-        'Imágenes': [
-            home / "OneDrive" / "Imágenes", home / "Imágenes",
-            home / "OneDrive" / "Pictures", home / "Pictures"
-        ],
-        'Música': [
-            home / "OneDrive" / "Música", home / "Música",
-            home / "OneDrive" / "Music", home / "Music"
-        ],
-        'Videos': [
-            home / "OneDrive" / "Videos", home / "Videos",
-            home / "OneDrive" / "Videos", home / "Videos"
-        ]
-    }
-
-    rutas_encontradas = {}
-    for nombre, candidatas in carpetas.items():
-        for ruta in candidatas:
-            if ruta.is_dir():
-                rutas_encontradas[nombre] = str(ruta)
-                break # Encontramos una, pasar a la siguiente
-    return rutas_encontradas
-
-# --- Lógica Principal (El Organizador) ---
-
-def normalize_text(text):
-    if not text:
-        return ""
-    text = str(text)
-    text = text.lower()
-    text = ''.join(
-        c for c in unicodedata.normalize('NFD', text) 
-        if unicodedata.category(c) != 'Mn'
-    )
-    return text
-
-def sanitize_folder_name(name):
-    name = re.sub(r'[\\/:*?"<>|]', '_', name)
-    name = name.strip().replace(" ", "_")
-    return name if name else "Sin_Nombre"
-
-def get_unique_path(destination):
-    if not destination.exists():
-        return destination
-    
-    base = destination.parent / destination.stem
-    ext = destination.suffix
-    i = 1
-    while True:
-        new_name = f"{base} ({i}){ext}"
-        new_path = Path(new_name)
-        if not new_path.exists():
-            return new_path
-        i += 1
-
-def organize_by_subject(source_dir_str, dest_dir_str, subjects_pipe, manejo_otros, profile_id):
-    source_dir = Path(source_dir_str)
-    dest_dir = Path(dest_dir_str)
-    
-    # Manejo de 'None' o string vacío
-    subjects_list = subjects_pipe.split(MATERIAS_SEPARATOR) if subjects_pipe else []
-    
-    subjects_normalized = [normalize_text(s) for s in subjects_list if s] # Lista de materias normalizadas
-    report = {'moved': 0, 'renamed': 0, 'skipped': 0, 'errors': 0}
-    
-    # Crear carpetas de materias
-    for subject in subjects_normalized:
-        folder_name = sanitize_folder_name(subject)
-        (dest_dir / folder_name).mkdir(parents=True, exist_ok=True)
-    
-    # Crear carpeta "Otros" si es necesario
-    others_dir = dest_dir / "Otros"
-    if manejo_otros == "Mover":
-        others_dir.mkdir(parents=True, exist_ok=True)
-
-    log_rows = []
-    username = get_username()
-    
-    for item in source_dir.iterdir():
-        # Ignorar accesos directos y el propio log
-        if item.is_symlink() or item.name.endswith(".lnk") or item.name == ADMIN_LOG_CSV.name:
-            report['skipped'] += 1
-            continue
-            
-        # Ignorar carpetas si no se van a mover (ej. venv)
-        if item.is_dir() and item.name == 'venv':
-             report['skipped'] += 1
-             continue
-
-        item_normalized = normalize_text(item.name)
-        matched_subject = None
-        
-        for subject in subjects_normalized:
-            if subject in item_normalized:
-                matched_subject = subject
-                break
-        
-        status = ""
-        final_destination_str = ""
-        original_path_str = str(item) # Guardar la ruta original aquí
-        
-        try:
-            target_dir = None
-            if matched_subject:
-                target_dir = dest_dir / sanitize_folder_name(matched_subject)
-            elif manejo_otros == "Mover":
-                target_dir = others_dir
-                matched_subject = "Otros"
-            
-            if target_dir:
-                file_hash = "" # Nota: Hashing puede ser lento, omitido por ahora
-                file_size = 0
-                if item.is_file():
-                    file_size = item.stat().st_size
-                elif item.is_dir():
-                    # Calcular tamaño de carpeta (puede ser lento) o dejar en 0
-                    try:
-                        file_size = sum(f.stat().st_size for f in item.glob('**/*') if f.is_file())
-                    except Exception:
-                        file_size = 0 # Ignorar si hay errores de permisos, etc.
-
-                
-                destination_path = get_unique_path(target_dir / item.name)
-                final_destination_str = str(destination_path)
-                
-                shutil.move(item, destination_path)
-                
-                if str(destination_path) == str(target_dir / item.name):
-                    status = "MOVIDO"
-                    report['moved'] += 1
-                else:
-                    status = "RENOMBRADO"
-                    report['renamed'] += 1
-            else:
-                status = "OMITIDO"
-                report['skipped'] += 1
-        
-        except Exception as e:
-            print_error(f"No se pudo mover {item.name}: {e}")
-            status = "ERROR"
-            report['errors'] += 1
-            final_destination_str = f"ERROR: {e}"
-            file_size = 0 # No hay tamaño si hay error
-
-        # Registrar en el log
-        # (Registrar todo excepto los 'OMITIDO' que no se querían mover)
-        if not (status == "OMITIDO" and manejo_otros != "Mover"):
-             log_rows.append({
-                'log_timestamp': datetime.now().isoformat(),
-                'username': username,
-                'id_perfil': profile_id,
-                'file_original_path': original_path_str,
-                'file_new_path': final_destination_str,
-                'file_size_bytes': file_size,
-                'subject_assigned': matched_subject if matched_subject else "N/A",
-                'status': status,
-                'file_hash': file_hash  # Aún vacío, pero la columna existe
-            })
-
-    log_to_admin_csv(log_rows)
-    return report
-
-# --- Lógica de Perfiles (CSV) ---
-
-def get_username():
-    try:
-        return getpass.getuser()
-    except Exception:
-        return "usuario_desconocido"
-
-def load_profiles():
-    if not PERFILES_CSV.exists():
-        return {}
-    
-    profiles = {}
-    try:
-        with open(PERFILES_CSV, mode='r', encoding='utf-8', newline='') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                profiles[row['id_perfil']] = row
-        return profiles
-    except Exception as e:
-        print_error(f"No se pudo leer {PERFILES_CSV}: {e}")
-        return {}
-
-def save_profiles(profiles_data):
-    if not profiles_data:
-        # Si el diccionario está vacío, podemos borrar el archivo o guardar un archivo vacío
-        try:
-            if PERFILES_CSV.exists():
-                os.remove(PERFILES_CSV)
-            print_warning("No hay perfiles, se ha limpiado el archivo.")
-        except Exception as e:
-            print_error(f"No se pudo borrar {PERFILES_CSV}: {e}")
-        return
-
-    try:
-        APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
-        # Obtener todas las llaves de todos los perfiles para estar seguros
-        all_keys = set()
-        for profile in profiles_data.values():
-            all_keys.update(profile.keys())
-        fieldnames = sorted(list(all_keys)) # Ordenar para consistencia
-        
-        with open(PERFILES_CSV, mode='w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for profile in profiles_data.values():
-                writer.writerow(profile)
-    except Exception as e:
-        print_error(f"No se pudo guardar {PERFILES_CSV}: {e}")
-
-# --- Lógica de Log (CSV) ---
-
-ADMIN_LOG_FIELDNAMES = [
-    'log_timestamp', 'username', 'id_perfil', 'file_original_path', 
-    'file_new_path', 'file_size_bytes', 'subject_assigned', 'status', 'file_hash'
-]
-
-def setup_admin_log():
-    try:
-        # Asegurarse que la carpeta del log exista (ahora es local)
-        SCRIPT_DIR.mkdir(parents=True, exist_ok=True)
-        
-        # Si el log no existe, crear y escribir cabecera
-        if not ADMIN_LOG_CSV.exists():
-            with open(ADMIN_LOG_CSV, mode='w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=ADMIN_LOG_FIELDNAMES)
-                writer.writeheader()
-    except Exception as e:
-        print_error(f"¡Error crítico al crear admin_log.csv! {e}")
-        print_warning("La app podría no funcionar. Intenta mover la carpeta a 'Documentos'.")
-
-def log_to_admin_csv(rows):
-    if not rows:
-        return
-    try:
-        with open(ADMIN_LOG_CSV, mode='a', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=ADMIN_LOG_FIELDNAMES)
-            for row in rows:
-                writer.writerow(row)
-    except Exception as e:
-        print_error(f"No se pudo escribir en admin_log.csv: {e}")
-
-# --- Setup Inicial ---
-
-def setup():
-    print("Ejecutando setup inicial...")
-    # 1. Asegurar que la carpeta de perfiles del usuario exista
-    APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
-    
-    # 2. Asegurar que el log de admin (local) exista
-    setup_admin_log()
-    print("Setup completado.")
-
-# -------------------------------------------------
-# --- RUTAS DE LA API (Las "Puertas" de Flask) ---
-# -------------------------------------------------
-
-@app.route('/')
-def index():
-    """ Sirve el archivo HTML principal (la "cara" de la app) """
-    return render_template('index.html')
-
-@app.route('/api/get-default-folders')
-def api_get_default_folders():
-    """ Devuelve las carpetas comunes (Descargas, etc.) al HTML """
-    try:
-        paths = get_default_directories()
-        return jsonify({'status': 'success', 'paths': paths})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-@app.route('/api/get-profiles')
-def api_get_profiles():
-    """ Devuelve todos los perfiles guardados del usuario Y el nombre de usuario """
-    try:
-        profiles = load_profiles()
-        # --- ¡ESTA ES LA ACTUALIZACIÓN! ---
-        # Ahora también enviamos el nombre de usuario.
-        username = get_username().capitalize() # Poner en mayúscula la primera letra
-        return jsonify({'status': 'success', 'profiles': profiles, 'username': username})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-@app.route('/api/create-profile', methods=['POST'])
-def api_create_profile():
-    """ Crea y guarda un nuevo perfil """
-    try:
-        data = request.json
-        profiles = load_profiles()
-        
-        # Validación simple de datos
-        required_keys = ['nombre_visible', 'ruta_origen', 'ruta_destino', 'nombre_carpeta_principal', 'manejo_otros']
-        if not all(key in data and data[key] for key in required_keys):
-            return jsonify({'status': 'error', 'message': 'Faltan datos requeridos.'}), 400
-        
-        profile_id = f"perfil_{int(time.time())}"
-        now = datetime.now().isoformat()
-        
-        # Crear la ruta de destino final para mostrar en la UI
-        ruta_destino_final = str(Path(data['ruta_destino']) / sanitize_folder_name(data['nombre_carpeta_principal']))
-
-        # --- CORRECCIÓN de bug de espacio ---
-        materias_str = data.get('lista_materias_str', '')
-        materias_list = [s.strip() for s in materias_str.split(',') if s.strip()]
-        materias_pipe_str = MATERIAS_SEPARATOR.join(materias_list)
-        # --- FIN DE LA CORRECCIÓN ---
-
-        new_profile = {
-            "id_perfil": profile_id,
-            "nombre_visible": data['nombre_visible'],
-            "lista_materias_pipe": materias_pipe_str, # Usar la cadena limpia
-            "ruta_origen": data['ruta_origen'],
-            "ruta_destino": data['ruta_destino'],
-            "nombre_carpeta_principal": data['nombre_carpeta_principal'],
-            "ultimo_uso_timestamp": now,
-            "creado_en_timestamp": now,
-            "contador_archivos_movidos": "0",
-            "manejo_otros": data['manejo_otros'],
-            "ruta_destino_final": ruta_destino_final # Dato extra para la UI
-        }
-        
-        profiles[profile_id] = new_profile
-        save_profiles(profiles)
-        
-        return jsonify({'status': 'success', 'profile': new_profile})
-        
-    except Exception as e:
-        print_error(f"Error en /api/create-profile: {e}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-@app.route('/api/delete-profile', methods=['POST'])
-def api_delete_profile():
-    """ Borra un perfil existente """
-    try:
-        data = request.json
-        profile_id = data.get('profile_id')
-        
-        profiles = load_profiles()
-        if profile_id in profiles:
-            del profiles[profile_id]
-            save_profiles(profiles)
-            return jsonify({'status': 'success', 'message': 'Perfil borrado.'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Perfil no encontrado.'}), 404
-            
-    except Exception as e:
-        print_error(f"Error en /api/delete-profile: {e}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-@app.route('/api/run-profile', methods=['POST'])
-def api_run_profile():
-    """ Ejecuta la lógica de organización de un perfil """
-    try:
-        data = request.json
-        profile_id = data.get('profile_id')
-        
-        profiles = load_profiles()
-        if profile_id not in profiles:
-            return jsonify({'status': 'error', 'message': 'Perfil no encontrado.'}), 404
-            
-        profile = profiles[profile_id]
-        
-        # Validar rutas
-        source_dir = Path(profile['ruta_origen'])
-        dest_parent_dir = Path(profile['ruta_destino'])
-        if not source_dir.is_dir():
-            return jsonify({'status': 'error', 'message': f"La carpeta de origen no existe: {source_dir}"}), 400
-        if not dest_parent_dir.is_dir():
-            return jsonify({'status': 'error', 'message': f"La carpeta de destino no existe: {dest_parent_dir}"}), 400
-        
-        # Crear la carpeta de destino principal
-        dest_dir = dest_parent_dir / sanitize_folder_name(profile['nombre_carpeta_principal'])
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        
-        # --- Ejecutar la lógica principal ---
-        report = organize_by_subject(
-            str(source_dir),
-            str(dest_dir),
-            profile.get('lista_materias_pipe'), # Usar .get() para seguridad
-            profile['manejo_otros'],
-            profile_id
-        )
-        
-        # Actualizar perfil y guardar
-        total_moved = int(profile.get('contador_archivos_movidos', 0)) + report['moved'] + report['renamed']
-        profile['contador_archivos_movidos'] = str(total_moved)
-        profile['ultimo_uso_timestamp'] = datetime.now().isoformat()
-        profiles[profile_id] = profile
-        save_profiles(profiles)
-        
-        return jsonify({'status': 'success', 'report': report})
-
-    except Exception as e:
-        print_error(f"Error en /api/run-profile: {e}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-# --- Funciones de Arranque ---
-
-def open_browser():
-    """ Abre el navegador web en la URL de la app """
-    try:
-        webbrowser.open_new(f"http://127.0.0.1:5000/")
-    except Exception as e:
-        print_warning(f"No se pudo abrir el navegador. Abre http://127.0.0.1:5000/ manualmente. ({e})")
-
-if __name__ == '__main__':
-    setup() # Ejecutar el setup inicial
-    print_success("Iniciando servidor Flask en http://127.0.0.1:5000/")
-    print_warning("Cierra esta ventana (o presiona Ctrl+C) para detener la aplicación.")
-    # Abrir el navegador 1 segundo después de que Flask inicie
-    threading.Timer(1, open_browser).start()
-    app.run(host='127.0.0.1', port=5000, debug=False)
-
+# --- app.py (El "Motor" y "Cocina") ---
+# Esta versión INCLUYE la corrección para el bug
+# de espacios en la lista de materias.
+
+import os
+from pathlib import Path
+import time
+import re
+import itertools
+import csv
+import shutil
+import stat
+from datetime import datetime
+import getpass
+import json # Necesario para enviar datos al HTML
+import webbrowser # Para abrir el navegador
+import threading # Para abrir el navegador después de que inicie Flask
+from concurrent.futures import ThreadPoolExecutor, Future # Para mover en paralelo
+
+# --- Importaciones de Flask ---
+from flask import Flask, render_template, jsonify, request, Response
+from flask_cors import CORS
+
+# --- Módulos propios ---
+from matcher import get_subject_matcher, MODO_PRIMERA, MODOS_COINCIDENCIA
+from normalizer import (get_normalizer, PLEGADO_CLASICO, PLEGAR_MAYUSCULAS, PLEGAR_ACENTOS,
+                        PLEGAR_SEPARADORES, PLEGAR_PUNTUACION)
+from rules import compile_rules, RuleError
+from jobs import JobManager, NULL_PROGRESS, ESTADOS_FINALES
+from dirsize import DirSizeCache
+from hashing import HashCache, hash_files
+from destinations import DestinationIndex, place_file, place_dir, discard_placeholder
+from copier import TransferStats, throughput
+from profiles_store import open_profile_store
+from live_stats import LiveStats
+from watcher import WatchManager
+from scheduler import PathLocks, DiskSlots, BatchProgress, group_by_source, run_groups
+from traversal import SourceWalker, PATRONES_EXCLUIR_POR_DEFECTO, parse_patterns, matches_patterns
+from journal import JournalStore, NULL_JOURNAL
+from metrics import MetricsRegistry, NULL_METRICS
+from log_writer import AdminLogWriter
+from dedupe import (find_identical, resolve_duplicate, DUPLICADOS_RENOMBRAR, MODOS_DUPLICADOS,
+                    STATUS_DUPLICADOS)
+
+# --- Configuración de Flask ---
+app = Flask(__name__)
+# Permitir que nuestro HTML hable con nuestro servidor Python
+CORS(app) 
+
+# --- Constantes Globales ---
+APP_VERSION = "6.16"
+# Carpeta privada del USUARIO (para perfiles)
+APP_DATA_DIR = Path(os.environ.get('APPDATA', Path.home())) / "OrganizadorMaterias"
+PERFILES_CSV = APP_DATA_DIR / "perfiles.csv"
+PERFILES_DB = APP_DATA_DIR / "perfiles.db"
+# Carpeta pública del SCRIPT (para el log)
+SCRIPT_DIR = Path(__file__).parent
+ADMIN_LOG_CSV = SCRIPT_DIR / "admin_log.csv"
+ADMIN_LOG_STATS = SCRIPT_DIR / ".stats_admin_log.json" # Foto de los contadores de /api/stats
+MATERIAS_SEPARATOR = "|"
+HOLGURA_RELOJ_SEGUNDOS = 0.1 # Las fechas de los archivos usan un reloj más grueso que datetime.now()
+# Almacén de perfiles: "csv" (perfiles.csv, por defecto) o "sqlite" (perfiles.db)
+PERFILES_BACKEND = os.environ.get('ORGANIZADOR_PERFILES', 'csv').strip().lower()
+profile_store = open_profile_store(PERFILES_CSV, PERFILES_DB, PERFILES_BACKEND)
+# Candados de carpetas (orígenes/destinos en uso) y turnos por disco para los lotes
+path_locks = PathLocks()
+disk_slots = DiskSlots()
+# Tareas en segundo plano (ejecuciones de perfiles); esperan sus carpetas en cola, sin ocupar hilo
+job_manager = JobManager(path_locks=path_locks)
+# Caché de tamaños de carpeta (privado del usuario, como los perfiles)
+dir_size_cache = DirSizeCache(APP_DATA_DIR / "cache_tamanos.json")
+hash_cache = HashCache(APP_DATA_DIR / "cache_hashes.json")
+# Diario de cada ejecución (para reanudar tras un corte y para deshacer)
+run_journals = JournalStore(APP_DATA_DIR / "diarios")
+# Tiempos por fase y contadores (cada reporte trae los suyos; /api/metrics los acumulados)
+metrics_registry = MetricsRegistry(APP_VERSION)
+# Contadores en vivo del log de admin (para /api/stats)
+live_stats = LiveStats(ADMIN_LOG_CSV, ADMIN_LOG_STATS)
+# Perfiles en modo vigilancia (organizan lo nuevo apenas llega)
+watch_manager = WatchManager()
+
+# --- Funciones de Ayuda (Impresión y Rutas) ---
+
+def print_success(message):
+    print(f"\033[92m[ÉXITO] {message}\033[0m")
+
+def print_error(message):
+    print(f"\033[91m[ERROR] {message}\033[0m")
+
+def print_warning(message):
+    print(f"\033[93m[AVISO] {message}\033[0m")
+
+def get_default_directories():
+    """
+    Encuentra las carpetas comunes del usuario (Descargas, etc.)
+    Probando rutas en Español e Inglés, con y sin OneDrive.
+    """
+    home = Path.home()
+    carpetas = {
+        'Descargas': [
+            home / "OneDrive" / "Descargas", home / "Descargas",
+            home / "OneDrive" / "Downloads", home / "Downloads"
+        ],
+        'Documentos': [
+            home / "OneDrive" / "Documentos", home / "Documentos",
+            home / "OneDrive" / "Documents", home / "Documents"
+        ],
+        'Escritorio': [
+            home / "OneDrive" / "Escritorio", home / "Escritorio",
+            home / "OneDrive" / "Desktop", home / "Desktop"
+        ],
+        'Imágenes': [
+            home / "OneDrive" / "Imágenes", home / "Imágenes",
+            home / "OneDrive" / "Pictures", home / "Pictures"
+        ],
+        'Música': [
+            home / "OneDrive" / "Música", home / "Música",
+            home / "OneDrive" / "Music", home / "Music"
+        ],
+        'Videos': [
+            home / "OneDrive" / "Videos", home / "Videos",
+            home / "OneDrive" / "Videos", home / "Videos"
+        ]
+    }
+
+    rutas_encontradas = {}
+    for nombre, candidatas in carpetas.items():
+        for ruta in candidatas:
+            if ruta.is_dir():
+                rutas_encontradas[nombre] = str(ruta)
+                break # Encontramos una, pasar a la siguiente
+    return rutas_encontradas
+
+# --- Lógica Principal (El Organizador) ---
+
+def sanitize_folder_name(name):
+    name = re.sub(r'[\\/:*?"<>|]', '_', name)
+    name = name.strip().replace(" ", "_")
+    # "", "." o ".." apuntarían al destino mismo o a su carpeta padre
+    return name if name.strip('.') else "Sin_Nombre"
+
+def get_unique_path(destination, index=None):
+    """
+    Devuelve 'destination' o la primera variante libre "nombre (N).ext",
+    sin crear nada. Con un DestinationIndex compartido, la carpeta se lee
+    una sola vez y los nombres ya repartidos cuentan como ocupados.
+    """
+    index = index or DestinationIndex()
+    return index.reserve(destination.parent, destination.name)
+
+def get_dir_size(path):
+    """ Tamaño de una carpeta (os.scandir + caché en disco); 0 si algo falla. """
+    try:
+        return dir_size_cache.size_of(path)
+    except Exception:
+        return 0 # Ignorar si hay errores de permisos, etc.
+
+def move_entry(item, target_dir, planned_destination=None, size_executor=None,
+               duplicates=DUPLICADOS_RENOMBRAR, source_hash=None, dest_index=None, transfer=None,
+               metrics=NULL_METRICS, on_claim=None):
+    """
+    Mueve UN elemento (archivo o carpeta) a su carpeta destino.
+    El nombre final sale del índice de destinos de la ejecución ('dest_index');
+    si hay un destino planeado y sigue libre se usa tal cual. Los archivos
+    se reservan en disco con O_EXCL (las carpetas con os.mkdir) antes de
+    moverlos, así nunca se pisa lo que otro programa creó a mitad de la ejecución.
+    Si el nombre choca y 'duplicates' no es "Renombrar", primero se busca
+    una copia idéntica en el destino (ver dedupe.py): si existe, el archivo
+    se omite, se borra o se enlaza en vez de crear "nombre (1).ext".
+    Con 'size_executor' el tamaño de las carpetas se calcula DESPUÉS de
+    moverlas, en segundo plano, y se devuelve un Future en lugar del número.
+    Entre discos distintos se copia con copier.py y se mide en 'transfer'.
+    'metrics' recibe el tiempo de cada sub-fase y las operaciones de disco.
+    'on_claim' recibe la ruta apartada antes de mover (para anotarla en el diario).
+    Devuelve (status, ruta_final, tamaño). Las excepciones se propagan.
+    """
+    dest_index = dest_index or DestinationIndex()
+    clock = time.perf_counter
+    file_size = 0
+    is_dir = False
+    try:
+        info = item.stat() # Un solo stat da el tipo y el tamaño
+    except OSError:
+        info = None # Enlace roto o sin permiso: se intenta mover igual, sin tamaño
+    metrics.count('stat')
+    if info is not None and stat.S_ISREG(info.st_mode):
+        file_size = info.st_size
+    elif info is not None and stat.S_ISDIR(info.st_mode):
+        is_dir = True
+        if size_executor is None:
+            start = clock()
+            file_size = get_dir_size(item)
+            metrics.add_time('dir_size', clock() - start)
+
+    if duplicates != DUPLICADOS_RENOMBRAR and not is_dir and dest_index.contains(target_dir, item.name):
+        start = clock()
+        existing = find_identical(item, target_dir, hash_cache, source_hash, dest_index)
+        metrics.add_time('dedupe', clock() - start)
+        if existing is not None:
+            return resolve_duplicate(item, existing, duplicates), str(existing), file_size
+
+    preferred = planned_destination.name if planned_destination is not None else None
+    start = clock()
+    destination_path = dest_index.claim(target_dir, item.name, preferred, directory=is_dir)
+    placed = clock()
+    metrics.add_time('claim', placed - start)
+    try:
+        if on_claim is not None:
+            on_claim(destination_path)
+        if is_dir:
+            place_dir(item, destination_path, transfer, claimed=True)
+            metrics.count('place_dir')
+        else:
+            place_file(item, destination_path, transfer, source_hash)
+            metrics.count('place_file')
+        metrics.add_time('place', clock() - placed)
+    except Exception:
+        discard_placeholder(destination_path)
+        dest_index.release(destination_path)
+        raise
+
+    if is_dir and size_executor is not None:
+        file_size = size_executor.submit(get_dir_size, destination_path)
+
+    if destination_path.name == item.name:
+        status = "MOVIDO"
+    else:
+        status = "RENOMBRADO"
+    return status, str(destination_path), file_size
+
+def _move_group(tasks, progress=NULL_PROGRESS, size_executor=None, duplicates=DUPLICADOS_RENOMBRAR, hashes=None,
+                dest_index=None, journal=NULL_JOURNAL, transfer=None, metrics=NULL_METRICS):
+    """
+    Mueve en orden una lista de (índice, item, target_dir, destino_planeado)
+    que comparten carpeta destino, así los sufijos "(N)" se reparten en
+    orden. Devuelve [(índice, status, ruta_final, tamaño, fecha)].
+    Cada resultado se anota en el diario de la ejecución y la duración de
+    cada movimiento va al histograma de 'metrics'.
+    """
+    clock = time.perf_counter
+    timings = metrics.local() # Sin locks dentro del bucle: se suma a 'metrics' al final
+    results = []
+    try:
+        for index, item, target_dir, planned_destination in tasks:
+            progress.add_progress(current_file=item.name)
+            start = clock()
+            try:
+                status, final_destination_str, file_size = move_entry(
+                    item, target_dir, planned_destination, size_executor,
+                    duplicates, (hashes or {}).get(str(item)), dest_index, transfer, timings,
+                    on_claim=lambda path, index=index: journal.record_claimed(index, str(path))
+                )
+                moved = 1 if status in ("MOVIDO", "RENOMBRADO") else 0
+                if isinstance(file_size, Future):
+                    progress.add_progress(files_done=1, files_moved=moved)
+                    file_size.add_done_callback(lambda f: progress.add_progress(bytes_moved=f.result()))
+                else:
+                    progress.add_progress(files_done=1, files_moved=moved, bytes_moved=file_size * moved)
+            except Exception as e:
+                print_error(f"No se pudo mover {item.name}: {e}")
+                status = "ERROR"
+                final_destination_str = f"ERROR: {e}"
+                file_size = 0 # No hay tamaño si hay error
+                progress.add_progress(files_done=1)
+            elapsed = clock() - start
+            timings.add_time('move', elapsed)
+            timings.observe_move(elapsed)
+            timestamp = datetime.now().isoformat()
+            file_hash = (hashes or {}).get(str(item), "") if status != "ERROR" else ""
+            journal.record_done(index, status, final_destination_str, file_size, timestamp, file_hash)
+            results.append((index, status, final_destination_str, file_size, timestamp))
+    finally:
+        timings.flush()
+    return results
+
+def _folder_fingerprint(paths):
+    """
+    Huella barata de un conjunto de carpetas: su mtime. Crear, borrar o
+    renombrar algo dentro de una carpeta cambia su mtime, así que si la
+    huella coincide los nombres del plan siguen siendo válidos.
+    """
+    fingerprint = {}
+    for path in paths:
+        try:
+            fingerprint[str(path)] = path.stat().st_mtime_ns
+        except OSError:
+            fingerprint[str(path)] = None
+    return fingerprint
+
+def plan_organization(source_dir_str, dest_dir_str, subjects_pipe, manejo_otros, profile_id,
+                      modo_coincidencia=MODO_PRIMERA, progress=None, items=None, metrics=None,
+                      folding=PLEGADO_CLASICO, whole_words=False, rules=None):
+    """
+    Fase de planeación: recorre el origen UNA vez y decide la materia,
+    la carpeta y el nombre final (con renombres por choque) de cada
+    elemento, sin tocar el disco. Devuelve el plan (dict).
+    'items' son las entradas a planear: por defecto el primer nivel del
+    origen (SourceWalker); también un recorrido recursivo, un bloque de él
+    o solo las entradas nuevas (modo vigilancia).
+    Los tiempos de cada fase van a 'metrics' (o a unas métricas nuevas) y
+    el plan las lleva consigo hasta execute_plan.
+    'folding' dice qué se pliega al comparar nombres y materias (ver
+    normalizer.py) y 'whole_words' exige que la materia sean palabras enteras.
+    'rules' (RuleSet de rules.py) se mira antes que las palabras clave.
+    """
+    progress = progress or NULL_PROGRESS
+    metrics = metrics or metrics_registry.new_run()
+    source_dir = Path(source_dir_str)
+    dest_dir = Path(dest_dir_str)
+    
+    # Manejo de 'None' o string vacío
+    subjects_list = subjects_pipe.split(MATERIAS_SEPARATOR) if subjects_pipe else []
+    
+    normalize = get_normalizer(folding)
+    subjects_normalized = [normalize(s) for s in subjects_list if s] # Lista de materias normalizadas
+    # Autómata de búsqueda (se construye una vez por perfil y queda en caché)
+    matcher = get_subject_matcher(subjects_normalized, modo_coincidencia, whole_words)
+    others_dir = dest_dir / "Otros"
+    now = time.time() # Referencia para las reglas por edad
+
+    # 'entries' guarda (item, materia, destino, ruta_planeada) en el orden del origen;
+    # 'dest_index' lee cada carpeta destino una vez y recuerda los nombres ya repartidos.
+    entries = []
+    dest_index = DestinationIndex()
+    skipped = 0
+    if items is None:
+        items = SourceWalker(source_dir, exclude=[dest_dir])
+    # Tiempos por fase acumulados en local (se suman a 'metrics' una vez al final)
+    clock = time.perf_counter
+    filter_seconds = normalize_seconds = match_seconds = names_seconds = 0.0
+    scanned = compared = stat_calls = 0
+
+    def counted_stat(path):
+        nonlocal stat_calls
+        stat_calls += 1
+        return os.stat(path)
+
+    # Una lista ya se recorrió antes (bloque, lote o vigilancia): solo se mide el recorrido real
+    timed_items = items if isinstance(items, list) else metrics.timed_iter('scan', items)
+    for item in timed_items:
+        progress.add_progress(files_scanned=1, current_file=item.name)
+        scanned += 1
+        start = clock()
+        # Ignorar accesos directos y el propio log (y su candado)
+        stat_calls += 1 # El lstat de is_symlink()
+        if item.is_symlink() or item.name.endswith(".lnk") or item.name in (ADMIN_LOG_CSV.name, ADMIN_LOG_CSV.name + ".lock"):
+            skipped += 1
+            filter_seconds += clock() - start
+            continue
+
+        # Nunca mover la carpeta destino (cuando está dentro del origen)
+        if item == dest_dir:
+            skipped += 1
+            filter_seconds += clock() - start
+            continue
+        normalized = clock()
+        filter_seconds += normalized - start
+        compared += 1
+
+        item_normalized = normalize(item.name)
+        matching = clock()
+        normalize_seconds += matching - normalized
+        matched_subject = rules.match(item, now, counted_stat) if rules is not None else None
+        if matched_subject is None:
+            matched_subject = matcher.match(item_normalized)
+        match_seconds += clock() - matching
+        
+        target_dir = None
+        if matched_subject:
+            target_dir = dest_dir / sanitize_folder_name(matched_subject)
+        elif manejo_otros == "Mover":
+            target_dir = others_dir
+            matched_subject = "Otros"
+
+        if target_dir is None:
+            # No coincide y 'Ignorar' está activo: se queda en el origen (sin registrar)
+            skipped += 1
+            continue
+
+        start = clock()
+        planned_destination = get_unique_path(target_dir / item.name, dest_index)
+        names_seconds += clock() - start
+        entries.append((item, matched_subject, target_dir, planned_destination))
+    skipped += getattr(items, 'pruned', 0) # Excluidas por patrón (ej. venv) al recorrer
+    metrics.add_time('filter', filter_seconds, scanned)
+    metrics.add_time('normalize', normalize_seconds, compared)
+    metrics.add_time('match', match_seconds, compared)
+    metrics.add_time('plan_names', names_seconds, len(entries))
+    metrics.count('stat', stat_calls)
+    rule_folders = rules.names if rules is not None else [] # Las carpetas de las reglas también se crean
+
+    return {
+        'plan_id': None, # Se asigna al guardarlo en la caché (store_plan)
+        'profile_id': profile_id,
+        'source_dir': source_dir,
+        'dest_dir': dest_dir,
+        'manejo_otros': manejo_otros,
+        'subjects': subjects_normalized + [name for name in rule_folders if name not in subjects_normalized],
+        'entries': entries,
+        'skipped': skipped,
+        'fingerprint': _folder_fingerprint([source_dir, *{target_dir for _, _, target_dir, _ in entries}]),
+        'created_at': datetime.now().isoformat(),
+        'metrics': metrics,
+    }
+
+def plan_is_current(plan):
+    """ True si el origen y las carpetas destino no han cambiado desde que se hizo el plan. """
+    paths = [Path(p) for p in plan['fingerprint']]
+    return _folder_fingerprint(paths) == plan['fingerprint']
+
+def plan_summary(plan, limit=None):
+    """ Versión JSON del plan para la vista previa en el HTML. """
+    entries = plan['entries'] if limit is None else plan['entries'][:limit]
+    renamed = sum(1 for item, _, target_dir, planned in plan['entries'] if planned.name != item.name)
+    return {
+        'plan_id': plan['plan_id'],
+        'profile_id': plan['profile_id'],
+        'created_at': plan['created_at'],
+        'report': {
+            'moved': len(plan['entries']) - renamed,
+            'renamed': renamed,
+            'skipped': plan['skipped'],
+            'errors': 0,
+        },
+        'total_entries': len(plan['entries']),
+        'entries': [
+            {
+                'file_original_path': str(item),
+                'subject_assigned': subject,
+                'file_new_path': str(planned),
+                'status': "MOVIDO" if planned.name == item.name else "RENOMBRADO",
+            }
+            for item, subject, target_dir, planned in entries
+        ],
+    }
+
+def remember_moved_hash(path_str, file_hash):
+    """ Guarda en el caché el hash de un archivo ya movido, con su ruta NUEVA. """
+    try:
+        st = os.stat(path_str)
+    except OSError:
+        return
+    hash_cache.remember(path_str, st.st_size, st.st_mtime_ns, file_hash)
+
+def execute_plan(plan, max_workers=1, progress=None, background_sizes=False, compute_hashes=False,
+                 duplicates=DUPLICADOS_RENOMBRAR):
+    """
+    Fase de movimiento: aplica un plan ya calculado y registra el log.
+    Solo hace E/S; no vuelve a recorrer ni a comparar nombres.
+    Con background_sizes=True el tamaño de las carpetas se mide en un hilo
+    aparte después de moverlas (el log espera a esos tamaños al final).
+    Con compute_hashes=True se llena 'file_hash' (etapa aparte, medida en el reporte).
+    'duplicates' decide qué pasa con los archivos idénticos a uno ya existente.
+    Antes de mover se escribe el plan en un diario (ver journal.py); un plan
+    reanudado trae su diario y los movimientos ya hechos ('completed').
+    El reporte trae el desglose de tiempos por fase ('metrics').
+    """
+    progress = progress or NULL_PROGRESS
+    metrics = plan.get('metrics') or metrics_registry.new_run()
+    run_start = time.perf_counter()
+    dest_dir = plan['dest_dir']
+    entries = plan['entries']
+    completed = plan.get('completed') or {} # índice -> (status, ruta_final, tamaño, fecha, hash)
+    report = {'moved': 0, 'renamed': 0, 'skipped': plan['skipped'], 'errors': 0, 'duplicates': 0}
+    
+    # Crear carpetas de materias
+    for subject in plan['subjects']:
+        folder_name = sanitize_folder_name(subject)
+        (dest_dir / folder_name).mkdir(parents=True, exist_ok=True)
+    
+    # Crear carpeta "Otros" si es necesario
+    if plan['manejo_otros'] == "Mover":
+        (dest_dir / "Otros").mkdir(parents=True, exist_ok=True)
+
+    username = get_username()
+    with metrics.phase('journal'):
+        journal = plan.get('journal') or start_journal(plan, duplicates)
+    pending = [(index, item, target_dir, planned) for index, (item, _, target_dir, planned) in enumerate(entries)
+               if index not in completed]
+
+    # Etapa opcional de hashes (antes de mover, leyendo desde el origen)
+    hashes = {str(entries[index][0]): done[4] for index, done in completed.items() if done[4]}
+    if compute_hashes:
+        progress.set_progress(current_file="Calculando hashes...")
+        with metrics.phase('hash'):
+            new_hashes, hash_stats = hash_files([str(item) for _, item, _, _ in pending], hash_cache)
+        hashes.update(new_hashes)
+        report.update(hash_stats)
+        metrics.count('hashed_bytes', hash_stats.get('hashed_bytes', 0))
+
+    progress.set_progress(files_total=len(pending))
+
+    # Con 1 hilo todo ocurre en orden, como siempre. Con más hilos cada
+    # carpeta destino es una tarea independiente (orden interno respetado).
+    groups = {}
+    for task in pending:
+        groups.setdefault(task[2], []).append(task)
+
+    size_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tamano") if background_sizes else None
+    dest_index = DestinationIndex() # Un scandir por carpeta destino, compartido por todos los hilos
+    transfer = TransferStats() # Copias entre discos (velocidad en MB/s)
+    results = [(index, *done[:4]) for index, done in completed.items()]
+    try:
+        if max_workers <= 1 or len(groups) <= 1:
+            results.extend(_move_group(pending, progress, size_executor, duplicates, hashes, dest_index, journal,
+                                       transfer, metrics))
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+                move_tasks = lambda tasks: _move_group(tasks, progress, size_executor, duplicates, hashes, dest_index,
+                                                       journal, transfer, metrics)
+                for group_results in executor.map(move_tasks, groups.values()):
+                    results.extend(group_results)
+    finally:
+        if size_executor is not None:
+            with metrics.phase('size_wait'):
+                size_executor.shutdown(wait=True) # Esperar los tamaños pendientes antes del log
+    with metrics.phase('cache_save'):
+        dir_size_cache.save()
+        if compute_hashes or duplicates != DUPLICADOS_RENOMBRAR:
+            hash_cache.save()
+    report.update(transfer.report())
+    metrics.count('cross_device_copies', transfer.files)
+    metrics.count('copied_bytes', transfer.bytes)
+    if transfer.files:
+        print_success(f"Copia entre discos: {transfer.files} archivos, {report['cross_device_mb']} MB "
+                      f"en {report['cross_device_seconds']} s ({report['throughput_mb_s']} MB/s).")
+
+    # Reporte y log (en el orden original del origen)
+    report_start = time.perf_counter()
+    moved_bytes = 0
+    log_rows = []
+    for index, status, final_destination_str, file_size, timestamp in sorted(results, key=lambda r: r[0]):
+        item, matched_subject, _, _ = entries[index]
+        if isinstance(file_size, Future):
+            file_size = file_size.result()
+        file_hash = hashes.get(str(item), "") if status != "ERROR" else ""
+        if file_hash and status in ("MOVIDO", "RENOMBRADO"):
+            remember_moved_hash(final_destination_str, file_hash)
+        if status == "MOVIDO":
+            report['moved'] += 1
+            moved_bytes += file_size
+        elif status == "RENOMBRADO":
+            report['renamed'] += 1
+            moved_bytes += file_size
+        elif status in STATUS_DUPLICADOS:
+            report['duplicates'] += 1
+        else:
+            report['errors'] += 1
+        log_rows.append({
+            'log_timestamp': timestamp,
+            'username': username,
+            'id_perfil': plan['profile_id'],
+            'file_original_path': str(item),
+            'file_new_path': final_destination_str,
+            'file_size_bytes': file_size,
+            'subject_assigned': matched_subject if matched_subject else "N/A",
+            'status': status,
+            'file_hash': file_hash  # Vacío si el perfil no calcula hashes
+        })
+
+    metrics.add_time('report', time.perf_counter() - report_start)
+    metrics.count('moved_bytes', moved_bytes)
+    with metrics.phase('log'):
+        log_to_admin_csv(log_rows)
+    metrics.count('log_rows', len(log_rows))
+    with metrics.phase('journal'):
+        journal.mark_logged()
+        journal.close()
+    if journal.run_id:
+        report['run_id'] = journal.run_id
+    metrics.finish(time.perf_counter() - run_start)
+    report['metrics'] = metrics.report()
+    return report
+
+# --- Diario de Movimientos (Reanudar y Deshacer) ---
+
+def start_journal(plan, duplicates):
+    """ Abre el diario de una ejecución nueva con todo su plan (o el diario nulo si no se puede). """
+    header = {
+        'profile_id': plan['profile_id'],
+        'source_dir': str(plan['source_dir']),
+        'dest_dir': str(plan['dest_dir']),
+        'manejo_otros': plan['manejo_otros'],
+        'subjects': plan['subjects'],
+        'duplicates': duplicates,
+    }
+    if plan.get('group'):
+        header['group'] = plan['group'] # Bloque de un recorrido recursivo (ver JournalStore.prune)
+    try:
+        return run_journals.start(header, [(str(item), str(planned), subject)
+                                           for item, subject, _, planned in plan['entries']])
+    except OSError as e:
+        print_warning(f"No se pudo crear el diario de movimientos ({e}). La ejecución sigue sin él.")
+        return NULL_JOURNAL
+
+def _entry_size(path):
+    try:
+        return get_dir_size(path) if path.is_dir() and not path.is_symlink() else path.stat().st_size
+    except OSError:
+        return 0
+
+def _run_started_at(header):
+    """ Momento (time.time) en que empezó la ejecución del diario, o None. """
+    try:
+        return datetime.fromisoformat(header['created_at']).timestamp() - HOLGURA_RELOJ_SEGUNDOS
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _is_own_placeholder(path, started_at):
+    """
+    True si 'path' es un marcador de claim() creado por esta ejecución (no
+    de otra ni del usuario): un archivo vacío o una carpeta (que
+    discard_placeholder solo quita si está vacía).
+    """
+    try:
+        info = path.lstat()
+    except OSError:
+        return False
+    if started_at is None or info.st_mtime < started_at:
+        return False
+    return stat.S_ISDIR(info.st_mode) or (stat.S_ISREG(info.st_mode) and info.st_size == 0)
+
+def _placed_by_run(path, started_at):
+    """
+    True si lo que hay en 'path' llegó después de empezar la ejecución. Se
+    mira st_ctime: os.replace/os.rename conservan el mtime del origen pero
+    cambian el ctime. En Windows st_ctime es la fecha de creación (se
+    conserva al mover), así que ahí solo cuenta lo que anotó el diario.
+    """
+    try:
+        return started_at is not None and os.name != 'nt' and path.lstat().st_ctime >= started_at
+    except OSError:
+        return False
+
+def resume_run(run, progress=None):
+    """
+    Reanuda una ejecución cortada con su diario, sin recorrer el origen:
+    lo anotado como hecho se respeta, lo que no alcanzó a anotarse se
+    confirma mirando el disco y el resto se vuelve a mover.
+    """
+    journal = run_journals.reopen(run.run_id)
+    # Releído con el candado del diario tomado: otra copia de la app pudo avanzarla o terminarla
+    run = run_journals.load(run.run_id)
+    if run is None or run.logged:
+        journal.close()
+        return {'run_id': journal.run_id, 'resumed': False}
+    header = run.header
+    started_at = _run_started_at(header)
+    entries = []
+    completed = {}
+    for index in sorted(run.planned):
+        record = run.planned[index]
+        item, planned = Path(record['src']), Path(record['dst'])
+        entries.append((item, record['subject'], planned.parent, planned))
+        done = run.done.get(index)
+        if done is not None:
+            size = done['size'] if done['size'] is not None else _entry_size(Path(done['final']))
+            completed[index] = (done['status'], done['final'], size, done['ts'], done.get('hash') or "")
+            continue
+        # claim() pudo apartar otro nombre que el planeado: se usa el anotado
+        # en el diario; sin él, solo se toca lo que esta ejecución dejó en 'planned'
+        claimed = run.claimed.get(index)
+        if os.path.lexists(item):
+            # El movimiento no llegó a ocurrir: quitar su marcador vacío
+            if claimed is not None:
+                discard_placeholder(Path(claimed))
+            elif _is_own_placeholder(planned, started_at):
+                discard_placeholder(planned)
+            continue
+        # El origen ya no está: el movimiento se hizo pero no alcanzó a anotarse
+        timestamp = datetime.now().isoformat()
+        if claimed is not None:
+            final = Path(claimed)
+            placed = os.path.lexists(final) # Nombre apartado con O_EXCL: lo que hay ahí es nuestro
+        else:
+            final = planned
+            placed = _placed_by_run(planned, started_at)
+        if placed:
+            status = "MOVIDO" if final.name == item.name else "RENOMBRADO"
+            done = (status, str(final), _entry_size(final), timestamp, "")
+        else:
+            done = ("ERROR", "ERROR: no se encontró al reanudar", 0, timestamp, "")
+        journal.record_done(index, *done)
+        completed[index] = done
+
+    plan = {
+        'plan_id': None,
+        'profile_id': header.get('profile_id'),
+        'source_dir': Path(header['source_dir']),
+        'dest_dir': Path(header['dest_dir']),
+        'manejo_otros': header.get('manejo_otros'),
+        'subjects': header.get('subjects') or [],
+        'entries': entries,
+        'skipped': 0,
+        'fingerprint': {},
+        'created_at': header.get('created_at'),
+        'completed': completed,
+        'journal': journal,
+    }
+    return execute_plan(plan, progress=progress, duplicates=header.get('duplicates') or DUPLICADOS_RENOMBRAR)
+
+def undo_entry(src, final, status):
+    """
+    Revierte UN movimiento del diario. Devuelve True si se restauró, False
+    si no hay nada que revertir (omitido, error) y lanza FileExistsError
+    si el origen ya está ocupado o FileNotFoundError si el destino ya no está.
+    """
+    if status in ("MOVIDO", "RENOMBRADO", "DUPLICADO_BORRADO") and os.path.lexists(src):
+        raise FileExistsError(f"El origen ya existe: {src}")
+    if status in ("MOVIDO", "RENOMBRADO", "DUPLICADO_BORRADO", "DUPLICADO_ENLAZADO") and not os.path.lexists(final):
+        raise FileNotFoundError(f"El destino ya no está: {final}")
+    if status in ("MOVIDO", "RENOMBRADO"):
+        src.parent.mkdir(parents=True, exist_ok=True)
+        if final.is_dir() and not final.is_symlink():
+            place_dir(final, src)
+        else:
+            place_file(final, src)
+    elif status == "DUPLICADO_BORRADO":
+        src.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(final, src) # El original se borró: se recupera con la copia del destino
+    elif status == "DUPLICADO_ENLAZADO":
+        tmp_copy = src.with_name(f".{src.name}.deshacer_tmp")
+        shutil.copy2(final, tmp_copy)
+        os.replace(tmp_copy, src) # El enlace vuelve a ser un archivo independiente
+    else:
+        return False
+    return True
+
+def undo_runs(run_ids, progress=None):
+    """
+    Deshace ejecuciones completas con sus diarios, de la más nueva a la más
+    vieja según su fecha de creación (no según el orden en que llegan).
+    Llamar con sus carpetas bloqueadas (ver run_dirs y api_undo_run).
+    """
+    progress = progress or NULL_PROGRESS
+    if len(set(run_ids)) != len(run_ids):
+        raise ValueError("La lista de ejecuciones a deshacer tiene ids repetidos.")
+    runs = []
+    for run_id in run_ids:
+        run = run_journals.load(run_id)
+        if run is None or not run.logged:
+            raise ValueError(f"No se puede deshacer {run_id}: el diario no existe o la ejecución no terminó.")
+        runs.append(run)
+    runs.sort(key=lambda run: run.header.get('created_at') or "", reverse=True)
+
+    report = {'undone': True, 'restored': 0, 'conflicts': 0, 'errors': 0, 'skipped': 0}
+    progress.set_progress(files_total=sum(len(run.done) - len(run.undone) for run in runs))
+    username = get_username()
+    for run in runs:
+        journal = run_journals.reopen(run.run_id)
+        log_rows = []
+        for index in sorted(run.done, reverse=True):
+            if index in run.undone:
+                continue
+            done, planned = run.done[index], run.planned[index]
+            src, final = Path(planned['src']), Path(done['final'])
+            progress.add_progress(current_file=src.name)
+            try:
+                if not undo_entry(src, final, done['status']):
+                    report['skipped'] += 1
+                    progress.add_progress(files_done=1)
+                    continue
+            except (FileExistsError, FileNotFoundError) as e:
+                print_warning(f"No se deshizo {src.name}: {e}")
+                report['conflicts'] += 1
+                progress.add_progress(files_done=1)
+                continue
+            except OSError as e:
+                print_error(f"No se pudo deshacer {src.name}: {e}")
+                report['errors'] += 1
+                progress.add_progress(files_done=1)
+                continue
+            journal.record_undone(index, done['status'])
+            report['restored'] += 1
+            progress.add_progress(files_done=1, files_moved=1)
+            log_rows.append({
+                'log_timestamp': datetime.now().isoformat(),
+                'username': username,
+                'id_perfil': run.header.get('profile_id'),
+                'file_original_path': str(final),
+                'file_new_path': str(src),
+                'file_size_bytes': done['size'] or 0,
+                'subject_assigned': planned['subject'] or "N/A",
+                'status': "DESHECHO",
+                'file_hash': ""
+            })
+        journal.close()
+        log_to_admin_csv(log_rows)
+    return report
+
+# --- Caché de Planes (Vista Previa) ---
+# Los planes viven en memoria unos minutos; "Ejecutar plan" los consume.
+
+PLAN_TTL_SECONDS = 15 * 60
+PLAN_PREVIEW_LIMIT = 500 # Entradas que se mandan al HTML en la vista previa
+_plan_cache = {}
+_plan_cache_lock = threading.Lock()
+_plan_ids = itertools.count(1)
+
+def store_plan(plan):
+    """ Guarda un plan en la caché, le asigna un id y limpia los expirados. """
+    now = time.monotonic()
+    with _plan_cache_lock:
+        for plan_id in [pid for pid, (stored_at, _) in _plan_cache.items() if now - stored_at > PLAN_TTL_SECONDS]:
+            del _plan_cache[plan_id]
+        plan['plan_id'] = f"plan_{int(time.time())}_{next(_plan_ids)}"
+        _plan_cache[plan['plan_id']] = (now, plan)
+    return plan['plan_id']
+
+def take_plan(plan_id):
+    """ Saca un plan de la caché (un plan solo se ejecuta una vez). """
+    with _plan_cache_lock:
+        stored = _plan_cache.pop(plan_id, None)
+    if stored is None or time.monotonic() - stored[0] > PLAN_TTL_SECONDS:
+        return None
+    return stored[1]
+
+ENTRADAS_POR_BLOQUE = 5000 # Recorrido recursivo: se planea y se mueve de a bloques
+
+def organize_by_subject(source_dir_str, dest_dir_str, subjects_pipe, manejo_otros, profile_id,
+                        modo_coincidencia=MODO_PRIMERA, max_workers=1, progress=None, background_sizes=False,
+                        compute_hashes=False, duplicates=DUPLICADOS_RENOMBRAR, walker=None,
+                        folding=PLEGADO_CLASICO, whole_words=False, rules=None):
+    """
+    Planea y ejecuta en un solo paso (lo que hace "Ejecutar Tarea").
+    Con un 'walker' recursivo las entradas se procesan a medida que se
+    descubren, de a ENTRADAS_POR_BLOQUE: la memoria no crece con el árbol.
+    """
+    if walker is None or walker.max_depth == 0:
+        plan = plan_organization(source_dir_str, dest_dir_str, subjects_pipe, manejo_otros, profile_id,
+                                 modo_coincidencia=modo_coincidencia, progress=progress, items=walker,
+                                 folding=folding, whole_words=whole_words, rules=rules)
+        return execute_plan(plan, max_workers=max_workers, progress=progress, background_sizes=background_sizes,
+                            compute_hashes=compute_hashes, duplicates=duplicates)
+
+    block_progress = BatchProgress(progress or NULL_PROGRESS) # Total acumulado entre bloques
+    metrics = metrics_registry.new_run() # Un solo desglose para todos los bloques
+    report = {'moved': 0, 'renamed': 0, 'skipped': 0, 'errors': 0, 'duplicates': 0}
+    entries = metrics.timed_iter('scan', walker)
+    while True:
+        block = list(itertools.islice(entries, ENTRADAS_POR_BLOQUE))
+        if not block:
+            break
+        plan = plan_organization(source_dir_str, dest_dir_str, subjects_pipe, manejo_otros, profile_id,
+                                 modo_coincidencia=modo_coincidencia, progress=block_progress, items=block,
+                                 metrics=metrics, folding=folding, whole_words=whole_words, rules=rules)
+        plan['group'] = (report.get('run_ids') or [None])[0] # Los diarios de los bloques se podan juntos
+        block_progress.add_total(len(plan['entries']))
+        block_report = execute_plan(plan, max_workers=max_workers, progress=block_progress,
+                                    background_sizes=background_sizes, compute_hashes=compute_hashes,
+                                    duplicates=duplicates)
+        for key, value in block_report.items():
+            if key == 'run_id':
+                report.setdefault('run_ids', []).append(value) # Un diario por bloque
+            elif key not in ('throughput_mb_s', 'metrics'):
+                report[key] = report.get(key, 0) + value
+    report['metrics'] = metrics.report()
+    if 'cross_device_mb' in report:
+        report['throughput_mb_s'] = throughput(report['cross_device_mb'], report['cross_device_seconds'])
+    report['skipped'] += walker.pruned
+    report['dirs_visited'] = walker.dirs_visited
+    report['symlink_loops'] = walker.loops
+    return report
+
+# --- Lógica de Perfiles (CSV) ---
+
+MAX_HILOS_MOVIMIENTO = 32
+
+def get_profile_int(profile, key, default, minimo, maximo):
+    """ Lee un número del perfil (todo se guarda como texto en el CSV) y lo acota. """
+    try:
+        value = int(profile.get(key) or default)
+    except (TypeError, ValueError):
+        value = default
+    return max(minimo, min(maximo, value))
+
+def get_profile_flag(profile, key, default=False):
+    """ Lee una opción Sí/No del perfil (en el CSV se guarda "Si" o "No"). """
+    value = str(profile.get(key) or "").strip().lower()
+    if not value:
+        return default
+    return value in ("si", "sí", "true", "1")
+
+# Opciones de plegado del perfil: (columna, opción de normalizer.py, valor si falta la columna)
+PLEGADO_PERFIL = (
+    ('plegar_mayusculas', PLEGAR_MAYUSCULAS, True),
+    ('plegar_acentos', PLEGAR_ACENTOS, True),
+    ('plegar_separadores', PLEGAR_SEPARADORES, False),
+    ('plegar_puntuacion', PLEGAR_PUNTUACION, False),
+)
+
+def profile_matching(profile):
+    """ Cómo reparte el perfil sus elementos: reglas, materias y plegado (argumentos para plan_organization). """
+    return {
+        'modo_coincidencia': profile.get('modo_coincidencia') or MODO_PRIMERA,
+        'folding': tuple(option for key, option, default in PLEGADO_PERFIL if get_profile_flag(profile, key, default)),
+        'whole_words': get_profile_flag(profile, 'coincidir_palabras'),
+        'rules': compile_rules(profile.get('reglas') or ""), # None si no tiene (compiladas una vez, en caché)
+    }
+
+def get_username():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "usuario_desconocido"
+
+def load_profiles():
+    """ Todos los perfiles (desde la caché del almacén si el archivo no cambió). """
+    try:
+        return profile_store.load_all()
+    except Exception as e:
+        print_error(f"No se pudo leer los perfiles ({profile_store.path}): {e}")
+        return {}
+
+def get_profile(profile_id):
+    """ Un perfil por id, o None si no existe. """
+    try:
+        return profile_store.get(profile_id)
+    except Exception as e:
+        print_error(f"No se pudo leer el perfil {profile_id}: {e}")
+        return None
+
+def save_profiles(profiles_data):
+    """ Reemplaza TODOS los perfiles (guardado atómico). """
+    try:
+        profile_store.save_all(profiles_data)
+        if not profiles_data:
+            print_warning("No hay perfiles, se ha limpiado el archivo.")
+    except Exception as e:
+        print_error(f"No se pudo guardar {profile_store.path}: {e}")
+
+# --- Lógica de Log (CSV) ---
+
+ADMIN_LOG_FIELDNAMES = [
+    'log_timestamp', 'username', 'id_perfil', 'file_original_path', 
+    'file_new_path', 'file_size_bytes', 'subject_assigned', 'status', 'file_hash'
+]
+
+admin_log_writer = None # Lo crea setup_admin_log()
+
+def setup_admin_log():
+    global admin_log_writer
+    try:
+        # Asegurarse que la carpeta del log exista (ahora es local)
+        SCRIPT_DIR.mkdir(parents=True, exist_ok=True)
+        
+        # Si el log no existe, crear y escribir cabecera
+        if not ADMIN_LOG_CSV.exists():
+            with open(ADMIN_LOG_CSV, mode='w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=ADMIN_LOG_FIELDNAMES)
+                writer.writeheader()
+    except Exception as e:
+        print_error(f"¡Error crítico al crear admin_log.csv! {e}")
+        print_warning("La app podría no funcionar. Intenta mover la carpeta a 'Documentos'.")
+
+    # Escritor compartido (candado entre procesos + group commit); se crea aquí
+    # para que use la ruta del log ya configurada
+    admin_log_writer = AdminLogWriter(ADMIN_LOG_CSV, ADMIN_LOG_FIELDNAMES,
+                                      on_commit=lambda rows, start, end: live_stats.record(rows, start, end))
+    try:
+        removed = admin_log_writer.repair()
+        if removed:
+            print_warning(f"admin_log.csv terminaba en una fila a medias (se quitaron {removed} bytes).")
+    except Exception as e:
+        print_error(f"No se pudo revisar el final de admin_log.csv: {e}")
+
+def log_to_admin_csv(rows):
+    """ Agrega las filas al log compartido; vuelve cuando están en disco. """
+    if not rows:
+        return
+    try:
+        admin_log_writer.write(rows)
+    except Exception as e:
+        print_error(f"No se pudo escribir en admin_log.csv: {e}")
+
+# --- Setup Inicial ---
+
+def setup():
+    print("Ejecutando setup inicial...")
+    # 1. Asegurar que la carpeta de perfiles del usuario exista
+    APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # 2. Asegurar que el log de admin (local) exista
+    setup_admin_log()
+
+    # 3. Cargar los contadores de /api/stats (foto + filas nuevas del log)
+    info = live_stats.load()
+    if info['rebuilt']:
+        print(f"Estadísticas recalculadas desde admin_log.csv ({live_stats.snapshot()['total']} filas).")
+    elif info['rows_new']:
+        print(f"Estadísticas cargadas de la foto (+{info['rows_new']} filas nuevas del log).")
+
+    # 4. Reanudar las ejecuciones que se cortaron (según su diario)
+    run_journals.prune()
+    for run in run_journals.interrupted():
+        if run_journals.in_use(run.run_id):
+            print(f"La ejecución {run.run_id} sigue abierta en otra copia de la app: no se reanuda.")
+            continue
+        print_warning(f"Reanudando la ejecución cortada {run.run_id} ({len(run.done)} de {len(run.planned)} ya hechos).")
+        job_manager.submit(f"reanudar:{run.run_id}", lambda job, run=run: resume_run(run, job), paths=run_dirs([run]))
+
+    # 5. Retomar la vigilancia de los perfiles que la tenían activa
+    for profile in load_profiles().values():
+        if get_profile_flag(profile, 'vigilar_origen'):
+            error = start_watch(profile)
+            if error:
+                print_warning(f"No se pudo retomar la vigilancia de '{profile.get('nombre_visible')}': {error}")
+            else:
+                print(f"Vigilando '{profile['ruta_origen']}' ({profile.get('nombre_visible')}).")
+    print("Setup completado.")
+
+# -------------------------------------------------
+# --- RUTAS DE LA API (Las "Puertas" de Flask) ---
+# -------------------------------------------------
+
+@app.route('/')
+def index():
+    """ Sirve el archivo HTML principal (la "cara" de la app) """
+    return render_template('index.html')
+
+@app.route('/api/get-default-folders')
+def api_get_default_folders():
+    """ Devuelve las carpetas comunes (Descargas, etc.) al HTML """
+    try:
+        paths = get_default_directories()
+        return jsonify({'status': 'success', 'paths': paths})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/get-profiles')
+def api_get_profiles():
+    """ Devuelve todos los perfiles guardados del usuario Y el nombre de usuario """
+    try:
+        profiles = load_profiles()
+        # --- ¡ESTA ES LA ACTUALIZACIÓN! ---
+        # Ahora también enviamos el nombre de usuario.
+        username = get_username().capitalize() # Poner en mayúscula la primera letra
+        return jsonify({'status': 'success', 'profiles': profiles, 'username': username})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/create-profile', methods=['POST'])
+def api_create_profile():
+    """ Crea y guarda un nuevo perfil """
+    try:
+        data = request.json
+        
+        # Validación simple de datos
+        required_keys = ['nombre_visible', 'ruta_origen', 'ruta_destino', 'nombre_carpeta_principal', 'manejo_otros']
+        if not all(key in data and data[key] for key in required_keys):
+            return jsonify({'status': 'error', 'message': 'Faltan datos requeridos.'}), 400
+        
+        profile_id = f"perfil_{int(time.time())}"
+        now = datetime.now().isoformat()
+        
+        # Crear la ruta de destino final para mostrar en la UI
+        ruta_destino_final = str(Path(data['ruta_destino']) / sanitize_folder_name(data['nombre_carpeta_principal']))
+
+        # --- CORRECCIÓN de bug de espacio ---
+        materias_str = data.get('lista_materias_str', '')
+        materias_list = [s.strip() for s in materias_str.split(',') if s.strip()]
+        materias_pipe_str = MATERIAS_SEPARATOR.join(materias_list)
+        # --- FIN DE LA CORRECCIÓN ---
+
+        modo_coincidencia = data.get('modo_coincidencia') or MODO_PRIMERA
+        if modo_coincidencia not in MODOS_COINCIDENCIA:
+            return jsonify({'status': 'error', 'message': f"Modo de coincidencia inválido: {modo_coincidencia}"}), 400
+        manejo_duplicados = data.get('manejo_duplicados') or DUPLICADOS_RENOMBRAR
+        if manejo_duplicados not in MODOS_DUPLICADOS:
+            return jsonify({'status': 'error', 'message': f"Manejo de duplicados inválido: {manejo_duplicados}"}), 400
+        reglas = (data.get('reglas') or "").strip()
+        try:
+            compile_rules(reglas)
+        except RuleError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        new_profile = {
+            "id_perfil": profile_id,
+            "nombre_visible": data['nombre_visible'],
+            "lista_materias_pipe": materias_pipe_str, # Usar la cadena limpia
+            "ruta_origen": data['ruta_origen'],
+            "ruta_destino": data['ruta_destino'],
+            "nombre_carpeta_principal": data['nombre_carpeta_principal'],
+            "ultimo_uso_timestamp": now,
+            "creado_en_timestamp": now,
+            "contador_archivos_movidos": "0",
+            "manejo_otros": data['manejo_otros'],
+            "modo_coincidencia": modo_coincidencia,
+            "hilos_movimiento": str(get_profile_int(data, 'hilos_movimiento', 1, 1, MAX_HILOS_MOVIMIENTO)),
+            "tamano_en_segundo_plano": "Si" if get_profile_flag(data, 'tamano_en_segundo_plano') else "No",
+            "calcular_hash": "Si" if get_profile_flag(data, 'calcular_hash') else "No",
+            "vigilar_origen": "No", # Se activa desde la tarjeta del perfil (/api/watch-profile)
+            "recorrido_recursivo": "Si" if get_profile_flag(data, 'recorrido_recursivo') else "No",
+            "profundidad_maxima": str(get_profile_int(data, 'profundidad_maxima', 0, 0, MAX_PROFUNDIDAD)),
+            "patrones_excluir": ", ".join(parse_patterns(data.get('patrones_excluir', ", ".join(PATRONES_EXCLUIR_POR_DEFECTO)))),
+            "seguir_enlaces": "Si" if get_profile_flag(data, 'seguir_enlaces') else "No",
+            "manejo_duplicados": manejo_duplicados,
+            **{key: "Si" if get_profile_flag(data, key, default) else "No" for key, _, default in PLEGADO_PERFIL},
+            "coincidir_palabras": "Si" if get_profile_flag(data, 'coincidir_palabras') else "No",
+            "reglas": reglas,
+            "ruta_destino_final": ruta_destino_final # Dato extra para la UI
+        }
+        
+        profile_store.put(new_profile)
+        
+        return jsonify({'status': 'success', 'profile': new_profile})
+        
+    except Exception as e:
+        print_error(f"Error en /api/create-profile: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/delete-profile', methods=['POST'])
+def api_delete_profile():
+    """ Borra un perfil existente """
+    try:
+        data = request.json
+        profile_id = data.get('profile_id')
+        
+        watch_manager.stop(profile_id)
+        if profile_store.delete(profile_id):
+            return jsonify({'status': 'success', 'message': 'Perfil borrado.'})
+        else:
+            return jsonify({'status': 'error', 'message': 'Perfil no encontrado.'}), 404
+            
+    except Exception as e:
+        print_error(f"Error en /api/delete-profile: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+def run_profile(profile, dest_dir, progress=None, plan=None):
+    """
+    Organiza un perfil ya validado (o aplica un plan ya calculado) y
+    actualiza su contador. Se usa desde las tareas en segundo plano
+    (progress = la tarea).
+    """
+    profile_id = profile['id_perfil']
+    max_workers = get_profile_int(profile, 'hilos_movimiento', 1, 1, MAX_HILOS_MOVIMIENTO)
+    background_sizes = get_profile_flag(profile, 'tamano_en_segundo_plano')
+    compute_hashes = get_profile_flag(profile, 'calcular_hash')
+    duplicates = profile.get('manejo_duplicados') or DUPLICADOS_RENOMBRAR
+    if plan is not None:
+        report = execute_plan(plan, max_workers=max_workers, progress=progress, background_sizes=background_sizes,
+                              compute_hashes=compute_hashes, duplicates=duplicates)
+    else:
+        report = organize_by_subject(
+            profile['ruta_origen'],
+            str(dest_dir),
+            profile.get('lista_materias_pipe'), # Usar .get() para seguridad
+            profile['manejo_otros'],
+            profile_id,
+            **profile_matching(profile),
+            max_workers=max_workers,
+            progress=progress,
+            background_sizes=background_sizes,
+            compute_hashes=compute_hashes,
+            duplicates=duplicates,
+            walker=source_walker(profile, profile['ruta_origen'], [dest_dir])
+        )
+
+    # Actualizar el contador del perfil (solo esa fila, bajo su candado)
+    def bump_counter(current):
+        total_moved = int(current.get('contador_archivos_movidos', 0)) + report['moved'] + report['renamed']
+        current['contador_archivos_movidos'] = str(total_moved)
+        current['ultimo_uso_timestamp'] = datetime.now().isoformat()
+        return current
+    profile_store.update(profile_id, bump_counter)
+    return report
+
+MAX_PROFUNDIDAD = 1000
+
+def profile_max_depth(profile):
+    """ 0 = solo el primer nivel; None = sin límite (recursivo con profundidad 0 o vacía). """
+    if not get_profile_flag(profile, 'recorrido_recursivo'):
+        return 0
+    depth = get_profile_int(profile, 'profundidad_maxima', 0, 0, MAX_PROFUNDIDAD)
+    return depth or None
+
+def profile_prune_patterns(profile):
+    """ Patrones de exclusión del perfil (los perfiles viejos no tienen la columna: "venv"). """
+    if profile.get('patrones_excluir') is None:
+        return PATRONES_EXCLUIR_POR_DEFECTO
+    return parse_patterns(profile['patrones_excluir'])
+
+def source_walker(profile, source_dir, dest_dirs):
+    """ Recorrido del origen según las opciones del perfil (las carpetas destino nunca entran). """
+    return SourceWalker(source_dir, max_depth=profile_max_depth(profile), prune=profile_prune_patterns(profile),
+                        exclude=dest_dirs, follow_symlinks=get_profile_flag(profile, 'seguir_enlaces'))
+
+def submit_profile_run(profile, dest_dir, plan=None):
+    """ run_profile como tarea, con su origen y su destino bloqueados (None si el perfil está ocupado). """
+    return job_manager.submit(profile['id_perfil'], lambda job: run_profile(profile, dest_dir, job, plan=plan),
+                              paths=[profile['ruta_origen'], dest_dir])
+
+def run_dirs(runs):
+    """ Carpetas (origen y destino) que tocan las ejecuciones de estos diarios. """
+    return [path for run in runs for path in (run.header['source_dir'], run.header['dest_dir'])]
+
+def run_source_group(members, progress):
+    """
+    Un grupo del lote: perfiles [(perfil, origen, destino)] con el MISMO
+    origen. El origen se lee una vez y cada perfil se planea sobre lo que
+    dejaron los anteriores (igual que si se ejecutaran uno tras otro).
+    """
+    first_profile, source_dir, _ = members[0]
+    # Un solo recorrido; las carpetas destino del grupo nunca son candidatas
+    remaining = list(source_walker(first_profile, source_dir, [dest_dir for _, _, dest_dir in members]))
+    progress.add_progress(files_scanned=len(remaining))
+
+    plans = []
+    for profile, _, dest_dir in members:
+        plan = plan_organization(
+            str(source_dir),
+            str(dest_dir),
+            profile.get('lista_materias_pipe'),
+            profile['manejo_otros'],
+            profile['id_perfil'],
+            **profile_matching(profile),
+            items=remaining
+        )
+        claimed = {item for item, _, _, _ in plan['entries']}
+        remaining = [item for item in remaining if item not in claimed]
+        plans.append((profile, dest_dir, plan))
+    progress.add_total(sum(len(plan['entries']) for _, _, plan in plans))
+
+    return {profile['id_perfil']: run_profile(profile, dest_dir, progress, plan=plan) for profile, dest_dir, plan in plans}
+
+def run_ids_of(report):
+    """ Diarios de una ejecución (uno, o uno por bloque en el recorrido recursivo). """
+    if 'run_ids' in report:
+        return list(report['run_ids'])
+    return [report['run_id']] if report.get('run_id') else []
+
+def run_profile_batch(members, progress=None):
+    """
+    Ejecuta un lote de perfiles [(perfil, origen, destino)]: un grupo por
+    origen, grupos de discos distintos en paralelo y carpetas bloqueadas
+    (llamar con todas las carpetas del lote bloqueadas).
+    Devuelve el reporte sumado más el de cada perfil.
+    """
+    batch_progress = BatchProgress(progress or NULL_PROGRESS)
+    # Un grupo por origen (y por forma de recorrerlo: recursivo, exclusiones, enlaces)
+    traversal_of = lambda member: (profile_max_depth(member[0]), profile_prune_patterns(member[0]),
+                                   get_profile_flag(member[0], 'seguir_enlaces'))
+    groups = list(group_by_source(members, lambda member: member[1], traversal_of).values())
+    work = [([group[0][1], *[dest_dir for _, _, dest_dir in group]], group) for group in groups]
+    # Las carpetas de todo el lote ya están bloqueadas (ver api_run_batch); entre sus grupos se turnan con candados propios
+    results = run_groups(work, lambda group: run_source_group(group, batch_progress), PathLocks(), disk_slots)
+
+    report = {'moved': 0, 'renamed': 0, 'skipped': 0, 'errors': 0, 'duplicates': 0,
+              'groups': len(groups), 'profiles': {}, 'run_ids': []}
+    for group, result in zip(groups, results):
+        if isinstance(result, Exception):
+            print_error(f"Error en el lote (origen {group[0][1]}): {result}")
+            for profile, _, _ in group:
+                report['profiles'][profile['id_perfil']] = {'error': str(result)}
+            report['errors'] += len(group)
+            continue
+        for profile_id, profile_report in result.items():
+            report['profiles'][profile_id] = profile_report
+            for key in ('moved', 'renamed', 'skipped', 'errors', 'duplicates'):
+                report[key] += profile_report.get(key, 0)
+            report['run_ids'].extend(run_ids_of(profile_report))
+    return report
+
+def organize_watched_entries(profile_id, paths):
+    """
+    Llamado por el vigía con las entradas nuevas ya estables: las planea
+    (solo esas, sin recorrer el origen) y las mueve como una tarea normal.
+    Devuelve False si el perfil está ocupado (el vigía reintenta después).
+    """
+    profile = get_profile(profile_id)
+    if profile is None:
+        watch_manager.stop(profile_id)
+        return True
+    source_dir, dest_dir, error = resolve_profile_dirs(profile)
+    if error:
+        print_warning(f"Vigilancia de '{profile.get('nombre_visible')}': {error}")
+        return True
+    prune = profile_prune_patterns(profile)
+    items = [path for path in paths if path.parent == source_dir and not matches_patterns(path.name, prune)]
+    max_depth = profile_max_depth(profile)
+    if max_depth != 0:
+        # Perfil recursivo: de una carpeta nueva se organizan sus archivos, no la carpeta
+        expanded = []
+        for path in items:
+            if path.is_dir() and not path.is_symlink() and path != dest_dir:
+                expanded.extend(SourceWalker(path, max_depth=None if max_depth is None else max_depth - 1,
+                                             prune=prune, exclude=[dest_dir],
+                                             follow_symlinks=get_profile_flag(profile, 'seguir_enlaces')))
+            else:
+                expanded.append(path)
+        items = expanded
+    plan = plan_organization(
+        str(source_dir),
+        str(dest_dir),
+        profile.get('lista_materias_pipe'),
+        profile['manejo_otros'],
+        profile_id,
+        **profile_matching(profile),
+        items=items
+    )
+    if not plan['entries']:
+        return True
+    return submit_profile_run(profile, dest_dir, plan=plan) is not None
+
+def start_watch(profile):
+    """ Empieza a vigilar el origen de un perfil. Devuelve un mensaje de error o None. """
+    source_dir, _, error = resolve_profile_dirs(profile)
+    if error:
+        return error
+    profile_id = profile['id_perfil']
+    try:
+        watch_manager.start(profile_id, source_dir, lambda paths: organize_watched_entries(profile_id, paths))
+    except OSError as e:
+        return f"No se pudo vigilar {source_dir}: {e}"
+    return None
+
+def resolve_profile_dirs(profile):
+    """
+    Valida las rutas de un perfil y crea la carpeta principal.
+    Devuelve (source_dir, dest_dir, mensaje_de_error).
+    """
+    source_dir = Path(profile['ruta_origen'])
+    dest_parent_dir = Path(profile['ruta_destino'])
+    if not source_dir.is_dir():
+        return None, None, f"La carpeta de origen no existe: {source_dir}"
+    if not dest_parent_dir.is_dir():
+        return None, None, f"La carpeta de destino no existe: {dest_parent_dir}"
+    
+    # Crear la carpeta de destino principal
+    dest_dir = dest_parent_dir / sanitize_folder_name(profile['nombre_carpeta_principal'])
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    return source_dir, dest_dir, None
+
+@app.route('/api/run-profile', methods=['POST'])
+def api_run_profile():
+    """ Inicia la organización de un perfil en segundo plano y devuelve el id de la tarea """
+    try:
+        data = request.json
+        profile_id = data.get('profile_id')
+        
+        profile = get_profile(profile_id)
+        if profile is None:
+            return jsonify({'status': 'error', 'message': 'Perfil no encontrado.'}), 404
+            
+        
+        # Validar rutas
+        source_dir, dest_dir, error = resolve_profile_dirs(profile)
+        if error:
+            return jsonify({'status': 'error', 'message': error}), 400
+        
+        # --- Lanzar la tarea (la lógica principal corre en segundo plano) ---
+        job = submit_profile_run(profile, dest_dir)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Este perfil ya se está ejecutando.'}), 409
+        
+        return jsonify({'status': 'success', 'job_id': job.id}), 202
+
+    except Exception as e:
+        print_error(f"Error en /api/run-profile: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/run-batch', methods=['POST'])
+def api_run_batch():
+    """ Ejecuta varios perfiles (o todos) en un lote: un escaneo por origen compartido """
+    try:
+        data = request.json or {}
+        profile_ids = data.get('profile_ids') or list(load_profiles().keys())
+        profile_ids = list(dict.fromkeys(profile_ids)) # Sin repetidos, en el mismo orden
+        if not profile_ids:
+            return jsonify({'status': 'error', 'message': 'No hay perfiles para ejecutar.'}), 400
+
+        members = []
+        for profile_id in profile_ids:
+            profile = get_profile(profile_id)
+            if profile is None:
+                return jsonify({'status': 'error', 'message': f'Perfil no encontrado: {profile_id}'}), 404
+            source_dir, dest_dir, error = resolve_profile_dirs(profile)
+            if error:
+                return jsonify({'status': 'error', 'message': f"{profile.get('nombre_visible')}: {error}"}), 400
+            members.append((profile, source_dir, dest_dir))
+
+        batch_id = "lote:" + ",".join(sorted(profile_ids))
+        paths = [path for _, source, dest in members for path in (source, dest)]
+        job = job_manager.submit(batch_id, lambda job: run_profile_batch(members, job), paths=paths)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Este lote ya se está ejecutando.'}), 409
+
+        return jsonify({'status': 'success', 'job_id': job.id}), 202
+
+    except Exception as e:
+        print_error(f"Error en /api/run-batch: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/plan-profile', methods=['POST'])
+def api_plan_profile():
+    """ Calcula el plan de movimientos de un perfil (vista previa, sin tocar archivos) """
+    try:
+        data = request.json
+        profile_id = data.get('profile_id')
+        limit = get_profile_int(data, 'limite', PLAN_PREVIEW_LIMIT, 0, 100000)
+        
+        profile = get_profile(profile_id)
+        if profile is None:
+            return jsonify({'status': 'error', 'message': 'Perfil no encontrado.'}), 404
+            
+        source_dir, dest_dir, error = resolve_profile_dirs(profile)
+        if error:
+            return jsonify({'status': 'error', 'message': error}), 400
+        
+        plan = plan_organization(
+            str(source_dir),
+            str(dest_dir),
+            profile.get('lista_materias_pipe'),
+            profile['manejo_otros'],
+            profile_id,
+            **profile_matching(profile),
+            items=source_walker(profile, source_dir, [dest_dir])
+        )
+        store_plan(plan)
+        return jsonify({'status': 'success', 'plan': plan_summary(plan, limit)})
+
+    except Exception as e:
+        print_error(f"Error en /api/plan-profile: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/execute-plan', methods=['POST'])
+def api_execute_plan():
+    """ Aplica un plan guardado en segundo plano (solo si el origen no ha cambiado) """
+    try:
+        data = request.json
+        plan = take_plan(data.get('plan_id'))
+        if plan is None:
+            return jsonify({'status': 'error', 'message': 'Plan no encontrado o expirado. Genera la vista previa de nuevo.'}), 404
+        
+        profile_id = plan['profile_id']
+        profile = get_profile(profile_id)
+        if profile is None:
+            return jsonify({'status': 'error', 'message': 'Perfil no encontrado.'}), 404
+        if not plan_is_current(plan):
+            return jsonify({'status': 'error', 'message': 'Las carpetas cambiaron desde la vista previa. Genera el plan de nuevo.'}), 409
+        
+        job = submit_profile_run(profile, plan['dest_dir'], plan=plan)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Este perfil ya se está ejecutando.'}), 409
+        
+        return jsonify({'status': 'success', 'job_id': job.id}), 202
+
+    except Exception as e:
+        print_error(f"Error en /api/execute-plan: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/runs')
+def api_runs():
+    """ Últimas ejecuciones con diario (para deshacer) """
+    try:
+        return jsonify({'status': 'success', 'runs': run_journals.recent()})
+    except Exception as e:
+        print_error(f"Error en /api/runs: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/undo-run', methods=['POST'])
+def api_undo_run():
+    """ Deshace una o varias ejecuciones (devuelve los archivos a su origen) en segundo plano """
+    try:
+        data = request.json or {}
+        run_ids = data.get('run_ids') or ([data['run_id']] if data.get('run_id') else [])
+        if not run_ids:
+            return jsonify({'status': 'error', 'message': 'Falta el id de la ejecución.'}), 400
+        if len(set(run_ids)) != len(run_ids):
+            return jsonify({'status': 'error', 'message': 'La lista de ejecuciones tiene ids repetidos.'}), 400
+        runs = []
+        for run_id in run_ids:
+            run = run_journals.load(run_id)
+            if run is None:
+                return jsonify({'status': 'error', 'message': f'Ejecución no encontrada: {run_id}'}), 404
+            if not run.logged:
+                return jsonify({'status': 'error', 'message': f'La ejecución {run_id} no terminó; se reanudará al reiniciar la app.'}), 409
+            if run_journals.in_use(run_id):
+                return jsonify({'status': 'error', 'message': f'La ejecución {run_id} está en uso (otra tarea la está deshaciendo).'}), 409
+            runs.append(run)
+
+        job = job_manager.submit("deshacer:" + ",".join(run_ids), lambda job: undo_runs(run_ids, job), paths=run_dirs(runs))
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Ya se está deshaciendo esta ejecución.'}), 409
+        return jsonify({'status': 'success', 'job_id': job.id}), 202
+
+    except Exception as e:
+        print_error(f"Error en /api/undo-run: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/watch-profile', methods=['POST'])
+def api_watch_profile():
+    """ Activa o desactiva el modo vigilancia de un perfil (se recuerda entre arranques) """
+    try:
+        data = request.json
+        profile_id = data.get('profile_id')
+        active = get_profile_flag(data, 'activo')
+
+        profile = get_profile(profile_id)
+        if profile is None:
+            return jsonify({'status': 'error', 'message': 'Perfil no encontrado.'}), 404
+
+        if active:
+            error = start_watch(profile)
+            if error:
+                return jsonify({'status': 'error', 'message': error}), 400
+        else:
+            watch_manager.stop(profile_id)
+
+        def set_flag(current):
+            current['vigilar_origen'] = "Si" if active else "No"
+            return current
+        profile_store.update(profile_id, set_flag)
+        return jsonify({'status': 'success', 'watch': watch_manager.status(profile_id)})
+
+    except Exception as e:
+        print_error(f"Error en /api/watch-profile: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/watch-status')
+def api_watch_status():
+    """ Estado de las vigilancias activas (eventos, lotes, pendientes) por perfil """
+    return jsonify({'status': 'success', 'watches': watch_manager.status()})
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """ Devuelve el estado y progreso de una tarea """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Tarea no encontrada.'}), 404
+    return jsonify({'status': 'success', 'job': job.snapshot()})
+
+@app.route('/api/jobs/<job_id>/stream')
+def api_job_stream(job_id):
+    """ Envía el progreso de una tarea en vivo (Server-Sent Events) """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Tarea no encontrada.'}), 404
+
+    def event_stream():
+        snapshot = job.snapshot()
+        while True:
+            yield f"data: {json.dumps(snapshot)}\n\n"
+            if snapshot['state'] in ESTADOS_FINALES:
+                break
+            # Como mucho ~4 eventos por segundo; un comentario cada 15 s mantiene viva la conexión
+            time.sleep(0.25)
+            new_snapshot = job.wait_for_change(snapshot['version'], timeout=15)
+            if new_snapshot['version'] == snapshot['version']:
+                yield ": ping\n\n"
+            snapshot = new_snapshot
+
+    return Response(event_stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/metrics')
+def api_metrics():
+    """ Métricas acumuladas (tiempos por fase, operaciones, latencias) en formato de texto de Prometheus """
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/stats')
+def api_stats():
+    """ Contadores en vivo del log de admin (sin pandas) """
+    try:
+        return jsonify({'status': 'success', 'stats': live_stats.snapshot()})
+    except Exception as e:
+        print_error(f"Error en /api/stats: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# --- Funciones de Arranque ---
+
+def open_browser():
+    """ Abre el navegador web en la URL de la app """
+    try:
+        webbrowser.open_new(f"http://127.0.0.1:5000/")
+    except Exception as e:
+        print_warning(f"No se pudo abrir el navegador. Abre http://127.0.0.1:5000/ manualmente. ({e})")
+
+if __name__ == '__main__':
+    setup() # Ejecutar el setup inicial
+    print_success("Iniciando servidor Flask en http://127.0.0.1:5000/")
+    print_warning("Cierra esta ventana (o presiona Ctrl+C) para detener la aplicación.")
+    # Abrir el navegador 1 segundo después de que Flask inicie
+    threading.Timer(1, open_browser).start()
+    try:
+        app.run(host='127.0.0.1', port=5000, debug=False)
+    finally:
+        live_stats.flush() # La foto de /api/stats se guarda de a ratos: guardar lo último
+
@@ -0,0 +1,143 @@
+# --- bench_analytics.py ---
+# Compara el análisis clásico del analizador (value_counts repetidos,
+# merge con perfiles dos veces, .copy() + apply(get_extension) fila por
+# fila y filtro con .dt.date) contra el resumen de una sola pasada de
+# log_stats.py, sobre un log sintético. Uso:
+#   python benchmarks/bench_analytics.py [num_filas]      (por defecto 10 millones)
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Permitir importar los módulos de la app desde la carpeta padre
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from log_cache import COLUMNAS_CATEGORICAS  # noqa: E402
+from log_stats import LogAggregates, get_extension  # noqa: E402
+
+USUARIOS = ['ana', 'kevin', 'sebas', 'luz', 'marco', 'sofia']
+PERFILES = ['perfil_uni', 'perfil_trabajo', 'perfil_gaming', 'perfil_fotos']
+MATERIAS = ['calculo', 'fisica', 'quimica', 'reportes', 'Otros', 'N/A']
+STATUS = ['MOVIDO', 'RENOMBRADO', 'OMITIDO', 'ERROR', 'DUPLICADO_OMITIDO']
+EXTENSIONES = ['.pdf', '.docx', '.zip', '.png', '.jpg', '.mp4', '.PDF', '']
+
+
+def generar_log(num_filas, semilla=42):
+    """ Log ya tipado (como lo devuelve cargar_admin_log), con columnas de texto. """
+    rng = np.random.default_rng(semilla)
+    inicio = np.datetime64('2025-01-01T00:00:00', 'us')
+    segundos = rng.integers(0, 300 * 24 * 3600, num_filas)
+    timestamps = pd.Series(inicio + segundos.astype('timedelta64[s]')).dt.tz_localize('UTC')
+    nombres = rng.integers(0, 1_000_000, num_filas).astype(str)
+    extensiones = np.array(EXTENSIONES, dtype=object)[rng.integers(0, len(EXTENSIONES), num_filas)]
+    rutas = "C:\\Users\\u\\Downloads\\archivo_" + nombres.astype(object) + extensiones
+    return pd.DataFrame({
+        'log_timestamp': timestamps,
+        'id_perfil': np.array(PERFILES, dtype=object)[rng.integers(0, len(PERFILES), num_filas)],
+        'username': np.array(USUARIOS, dtype=object)[rng.integers(0, len(USUARIOS), num_filas)],
+        'file_original_path': rutas,
+        'subject_assigned': np.array(MATERIAS, dtype=object)[rng.integers(0, len(MATERIAS), num_filas)],
+        'status': np.array(STATUS, dtype=object)[rng.integers(0, len(STATUS), num_filas)],
+        'file_size_bytes': rng.integers(0, 50_000_000, num_filas).astype(np.float64),
+    })
+
+
+def analisis_clasico(df_log, df_perfiles, fecha_inicio, fecha_fin):
+    """ Los mismos cálculos que hacían antes analizar_datos + generar_graficos. """
+    df = df_log[(df_log['log_timestamp'].dt.date >= fecha_inicio) & (df_log['log_timestamp'].dt.date <= fecha_fin)]
+    r = {}
+    # analizar_datos
+    df_merged = df.merge(df_perfiles, on='id_perfil', how='left')
+    df_merged['nombre_visible'] = df_merged['nombre_visible'].fillna('Perfil Desconocido (Otro Usuario)')
+    r['total_bytes'] = df['file_size_bytes'].sum()
+    r['usuarios'] = df['username'].nunique()
+    movidos = df[df['status'].isin(['MOVIDO', 'RENOMBRADO'])]['file_size_bytes'].sum()
+    r['bytes_movidos'] = movidos
+    r['status'] = df['status'].value_counts()
+    r['materias'] = df[~df['subject_assigned'].isin(['N/A', 'Otros', None, ''])]['subject_assigned'].value_counts().head(10)
+    r['usuarios_top'] = df['username'].value_counts().head(5)
+    r['perfiles'] = df_merged['nombre_visible'].value_counts()
+    r['horas'] = df['log_timestamp'].dt.hour.value_counts().sort_index()
+    copia = df.copy()
+    copia['extension'] = copia['file_original_path'].apply(get_extension)
+    ext = copia[~copia['extension'].isin(["Sin Extensión", "N/A (No es path)", "N/A (Error)"])]
+    r['extensiones'] = ext['extension'].value_counts().head(10)
+    r['dias'] = df.set_index('log_timestamp').resample('D').size()
+    # generar_graficos (volvía a calcular casi todo)
+    df_merged = df.merge(df_perfiles, on='id_perfil', how='left')
+    df['status'].value_counts()
+    df['username'].value_counts().head(5)
+    df[~df['subject_assigned'].isin(['N/A', 'Otros', None, ''])].loc[:, 'subject_assigned'].value_counts().head(10)
+    df.set_index('log_timestamp').resample('D').size()
+    df['log_timestamp'].dt.hour.value_counts().sort_index()
+    return r
+
+
+def analisis_una_pasada(df_log, df_perfiles, fecha_inicio, fecha_fin):
+    """ Filtro por rango de timestamps + un solo LogAggregates compartido. """
+    ts = df_log['log_timestamp']
+    inicio = pd.Timestamp(fecha_inicio).tz_localize(ts.dt.tz)
+    fin = (pd.Timestamp(fecha_fin) + pd.Timedelta(days=1)).tz_localize(ts.dt.tz)
+    df = df_log[(ts >= inicio) & (ts < fin)]
+    resumen = LogAggregates.from_frame(df)
+    nombres = dict(zip(df_perfiles['id_perfil'], df_perfiles['nombre_visible']))
+    return {
+        'total_bytes': resumen.total_bytes,
+        'usuarios': len(resumen.users),
+        'bytes_movidos': resumen.bytes_for(['MOVIDO', 'RENOMBRADO']),
+        'status': resumen.status_series(),
+        'materias': resumen.subject_series().head(10),
+        'usuarios_top': resumen.user_series().head(5),
+        'perfiles': resumen.profile_name_series(nombres, 'Perfil Desconocido (Otro Usuario)'),
+        'horas': resumen.hour_series(),
+        'extensiones': resumen.extension_series().head(10),
+        'dias': resumen.day_series(),
+    }
+
+
+def iguales(a, b):
+    for key in a:
+        x, y = a[key], b[key]
+        if isinstance(x, pd.Series):
+            if list(x.index) != list(y.index) or list(x.to_numpy()) != list(y.to_numpy()):
+                return key
+        elif x != y:
+            return key
+    return None
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    num_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    print(f"Generando log sintético de {num_filas} filas...")
+    df_texto = generar_log(num_filas)
+    df_perfiles = pd.DataFrame({'id_perfil': PERFILES[:3], 'nombre_visible': ['Uni', 'Trabajo', 'Juegos']})
+    # El analizador ahora recibe las columnas de pocos valores como 'category'
+    df_categorias = df_texto.astype({col: 'category' for col in COLUMNAS_CATEGORICAS})
+    fecha_inicio = pd.Timestamp('2025-02-01').date()
+    fecha_fin = pd.Timestamp('2025-09-30').date()
+
+    t_clasico, r_clasico = medir(lambda: analisis_clasico(df_texto, df_perfiles, fecha_inicio, fecha_fin))
+    t_pasada, r_pasada = medir(lambda: analisis_una_pasada(df_categorias, df_perfiles, fecha_inicio, fecha_fin))
+
+    diferente = iguales(r_clasico, r_pasada)
+    if diferente:
+        print(f"[ERROR] ¡El resultado '{diferente}' NO coincide con el análisis clásico!")
+        sys.exit(1)
+
+    print(f"Filas: {num_filas}")
+    print(f"  - Análisis clásico:  {t_clasico:.2f} s")
+    print(f"  - Una sola pasada:   {t_pasada:.2f} s")
+    print(f"  - Aceleración: x{t_clasico / t_pasada:.1f} (resultados idénticos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# --- bench_arranque.py ---
+# Mide el arranque del analizador en sus dos modos: el resumen rápido
+# (--resumen, solo biblioteca estándar) y el análisis completo (pandas +
+# matplotlib). Copia los scripts a una carpeta temporal con un log
+# sintético y los ejecuta como lo haría un usuario. Uso:
+#   python benchmarks/bench_arranque.py [num_filas] [repeticiones]
+
+import csv
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CARPETA_APP = Path(__file__).resolve().parent.parent
+ANALIZADOR = "analizador de datos.py"
+CAMPOS = ['log_timestamp', 'username', 'id_perfil', 'file_original_path', 'file_new_path',
+          'file_size_bytes', 'subject_assigned', 'status', 'file_hash']
+
+
+def generar_log(ruta, num_filas, semilla=42):
+    rnd = random.Random(semilla)
+    inicio = datetime(2025, 1, 1)
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CAMPOS)
+        writer.writeheader()
+        for i in range(num_filas):
+            writer.writerow({
+                'log_timestamp': (inicio + timedelta(seconds=rnd.randrange(300 * 24 * 3600))).isoformat(),
+                'username': rnd.choice(['ana', 'kevin', 'sebas', 'luz']),
+                'id_perfil': rnd.choice(['perfil_uni', 'perfil_trabajo']),
+                'file_original_path': f"C:\\Users\\u\\Downloads\\archivo_{i}{rnd.choice(['.pdf', '.docx', '.zip'])}",
+                'file_new_path': 'N/A',
+                'file_size_bytes': rnd.randrange(50_000_000),
+                'subject_assigned': rnd.choice(['calculo', 'fisica', 'Otros', 'N/A']),
+                'status': rnd.choice(['MOVIDO', 'RENOMBRADO', 'OMITIDO', 'ERROR']),
+                'file_hash': '',
+            })
+
+
+def ejecutar(carpeta, argumentos):
+    """ Devuelve (segundos hasta la primera línea, segundos totales). """
+    env = dict(os.environ, MPLBACKEND='Agg', APPDATA=str(carpeta), PYTHONUNBUFFERED='1')
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, ANALIZADOR, *argumentos], cwd=carpeta, env=env,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    proceso.stdin.write("\n\n\n") # Enter en todos los filtros
+    proceso.stdin.close()
+    proceso.stdout.readline()
+    primera_linea = time.perf_counter() - inicio
+    proceso.stdout.read()
+    if proceso.wait() != 0:
+        raise RuntimeError(f"El analizador falló con {argumentos}")
+    return primera_linea, time.perf_counter() - inicio
+
+
+def main():
+    num_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    carpeta = Path(tempfile.mkdtemp(prefix="bench_arranque_"))
+    try:
+        for script in CARPETA_APP.glob("*.py"):
+            shutil.copy(script, carpeta)
+        print(f"Generando log sintético de {num_filas} filas...")
+        generar_log(carpeta / "admin_log.csv", num_filas)
+
+        # Primera ejecución de cada modo: construye los cachés (no se mide)
+        ejecutar(carpeta, ['--resumen'])
+        ejecutar(carpeta, [])
+
+        print(f"Filas: {num_filas} | repeticiones: {repeticiones} (mediana, cachés ya construidos)")
+        for nombre, argumentos in [("Resumen rápido", ['--resumen']), ("Análisis completo", [])]:
+            tiempos = [ejecutar(carpeta, argumentos) for _ in range(repeticiones)]
+            primera = statistics.median(t[0] for t in tiempos)
+            total = statistics.median(t[1] for t in tiempos)
+            print(f"  - {nombre:<18} primera salida: {primera:.2f} s | total: {total:.2f} s")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
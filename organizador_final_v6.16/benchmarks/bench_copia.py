@@ -0,0 +1,74 @@
+# --- bench_copia.py ---
+# Compara shutil.move contra el camino de copier.py al mover archivos
+# entre DOS discos distintos (p. ej. un disco local y un USB o /dev/shm).
+# Uso:
+#   python benchmarks/bench_copia.py <carpeta_disco_a> <carpeta_disco_b> [mb_por_archivo] [num_archivos]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Permitir importar los módulos de la app desde la carpeta padre
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from copier import TransferStats, copy_file, throughput  # noqa: E402
+
+BLOQUE = 1024 * 1024
+
+
+def generar_archivos(carpeta, mb_por_archivo, num_archivos):
+    rutas = []
+    bloque = os.urandom(BLOQUE)
+    for i in range(num_archivos):
+        ruta = carpeta / f"archivo_{i}.bin"
+        with open(ruta, 'wb') as f:
+            for _ in range(mb_por_archivo):
+                f.write(bloque)
+        rutas.append(ruta)
+    return rutas
+
+
+def mover_shutil(rutas, destino):
+    for ruta in rutas:
+        shutil.move(str(ruta), str(destino / ruta.name))
+
+
+def mover_copier(rutas, destino):
+    transfer = TransferStats()
+    for ruta in rutas:
+        copy_file(ruta, destino / ruta.name, transfer)
+        os.remove(ruta)
+    return transfer
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Uso: python benchmarks/bench_copia.py <carpeta_disco_a> <carpeta_disco_b> [mb_por_archivo] [num_archivos]")
+        sys.exit(1)
+    disco_a, disco_b = Path(sys.argv[1]), Path(sys.argv[2])
+    mb_por_archivo = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+    num_archivos = int(sys.argv[4]) if len(sys.argv) > 4 else 8
+    if os.stat(disco_a).st_dev == os.stat(disco_b).st_dev:
+        print("Aviso: las dos carpetas están en el mismo disco; se medirá un simple renombre.")
+
+    total_mb = mb_por_archivo * num_archivos
+    print(f"Archivos: {num_archivos} x {mb_por_archivo} MB ({total_mb} MB)")
+    for nombre, mover in [("shutil.move", mover_shutil), ("copier.copy_file", mover_copier)]:
+        origen = Path(tempfile.mkdtemp(prefix="bench_copia_", dir=disco_a))
+        destino = Path(tempfile.mkdtemp(prefix="bench_copia_", dir=disco_b))
+        try:
+            rutas = generar_archivos(origen, mb_por_archivo, num_archivos)
+            inicio = time.perf_counter()
+            mover(rutas, destino)
+            segundos = time.perf_counter() - inicio
+            print(f"  - {nombre:<18} {segundos:.2f} s | {throughput(total_mb, segundos)} MB/s")
+        finally:
+            shutil.rmtree(origen, ignore_errors=True)
+            shutil.rmtree(destino, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
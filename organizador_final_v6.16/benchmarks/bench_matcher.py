@@ -0,0 +1,74 @@
+# --- bench_matcher.py ---
+# Compara el bucle clásico (materia por materia con 'in') contra el
+# autómata de matcher.py. Uso:
+#   python benchmarks/bench_matcher.py [num_archivos] [num_materias]
+
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+# Permitir importar los módulos de la app desde la carpeta padre
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from matcher import SubjectMatcher, MODO_PRIMERA  # noqa: E402
+
+
+def bucle_clasico(subjects_normalized, item_normalized):
+    """ Copia exacta de la lógica anterior de organize_by_subject. """
+    for subject in subjects_normalized:
+        if subject in item_normalized:
+            return subject
+    return None
+
+
+def generar_datos(num_archivos, num_materias, semilla=42):
+    rnd = random.Random(semilla)
+    letras = string.ascii_lowercase
+    materias = sorted({
+        ''.join(rnd.choices(letras, k=rnd.randint(4, 12))) for _ in range(num_materias)
+    })
+    nombres = []
+    for _ in range(num_archivos):
+        base = ''.join(rnd.choices(letras + "_- ", k=rnd.randint(10, 40)))
+        # ~30% de los archivos contienen alguna materia
+        if rnd.random() < 0.3:
+            pos = rnd.randint(0, len(base))
+            base = base[:pos] + rnd.choice(materias) + base[pos:]
+        nombres.append(base + rnd.choice([".pdf", ".docx", ".zip", ".png"]))
+    return materias, nombres
+
+
+def medir(funcion, repeticiones=3):
+    mejor = float('inf')
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main():
+    num_archivos = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    num_materias = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    materias, nombres = generar_datos(num_archivos, num_materias)
+
+    t_build, matcher = medir(lambda: SubjectMatcher(materias, MODO_PRIMERA), repeticiones=1)
+    t_loop, r_loop = medir(lambda: [bucle_clasico(materias, n) for n in nombres])
+    t_ac, r_ac = medir(lambda: [matcher.match(n) for n in nombres])
+
+    if r_loop != r_ac:
+        print("[ERROR] ¡Los resultados del autómata NO coinciden con el bucle clásico!")
+        sys.exit(1)
+
+    print(f"Archivos: {num_archivos} | Materias: {len(materias)}")
+    print(f"  - Construcción del autómata: {t_build * 1000:.1f} ms (una vez por perfil)")
+    print(f"  - Bucle clásico:             {t_loop * 1000:.1f} ms")
+    print(f"  - Autómata Aho-Corasick:     {t_ac * 1000:.1f} ms")
+    print(f"  - Aceleración: x{t_loop / t_ac:.1f} (resultados idénticos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# --- bench_reglas.py ---
+# Compara lo de antes (un perfil por regla: cada uno recorre la carpeta
+# completa) contra UNA pasada con el RuleSet compilado de rules.py, y
+# también la evaluación en memoria (regla por regla vs. RuleSet).
+# Uso:
+#   python benchmarks/bench_reglas.py [num_archivos] [num_reglas]
+
+import os
+import random
+import shutil
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Permitir importar los módulos de la app desde la carpeta padre
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rules import RuleSet, parse_rules  # noqa: E402
+
+EXTENSIONES = ['pdf', 'docx', 'pptx', 'zip', 'png', 'jpg', 'xlsx', 'txt', 'mp4', 'mp3', 'csv', 'py']
+
+
+def generar_reglas(num_reglas, semilla=42):
+    """ Mitad reglas por extensión, mitad por regex (algunas con las dos). """
+    rnd = random.Random(semilla)
+    lineas = []
+    for i in range(num_reglas):
+        condiciones = []
+        if i % 2 == 0 or rnd.random() < 0.3:
+            condiciones.append("ext=" + ",".join(rnd.sample(EXTENSIONES, 2)))
+        if i % 2 == 1:
+            palabra = ''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 8)))
+            condiciones.append(f"regex=^{palabra}|_{palabra}\\d+")
+        condiciones.append(f"prioridad={rnd.randint(0, 3)}")
+        lineas.append(f"Regla{i}: " + " ".join(condiciones))
+    return "\n".join(lineas)
+
+
+def generar_nombres(num_archivos, semilla=42):
+    rnd = random.Random(semilla)
+    return [Path(''.join(rnd.choices(string.ascii_lowercase + "_", k=rnd.randint(8, 30))) + "." + rnd.choice(EXTENSIONES))
+            for _ in range(num_archivos)]
+
+
+def una_por_una(reglas, ruta):
+    """ Sin compilar: cada regla mira su extensión y busca su regex. """
+    extension = os.path.splitext(ruta.name)[1][1:].lower()
+    for regla in reglas:
+        if regla.extensions is not None and extension not in regla.extensions:
+            continue
+        if regla.pattern is not None and not regla.pattern.search(ruta.name):
+            continue
+        return regla.name
+    return None
+
+
+def un_perfil_por_regla(reglas, carpeta):
+    """ Cada regla es un perfil aparte: un recorrido completo (con su stat) por regla. """
+    asignados = {}
+    for regla in reglas:
+        for ruta in carpeta.iterdir():
+            if ruta.is_symlink() or ruta.name in asignados:
+                continue
+            if una_por_una([regla], ruta) is not None:
+                asignados[ruta.name] = regla.name
+    return asignados
+
+
+def una_pasada(compiladas, carpeta):
+    asignados = {}
+    for ruta in carpeta.iterdir():
+        if ruta.is_symlink():
+            continue
+        destino = compiladas.match(ruta, 0)
+        if destino is not None:
+            asignados[ruta.name] = destino
+    return asignados
+
+
+def medir(funcion, repeticiones=3):
+    mejor = float('inf')
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main():
+    num_archivos = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    num_reglas = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    texto = generar_reglas(num_reglas)
+    nombres = generar_nombres(num_archivos)
+
+    t_build, compiladas = medir(lambda: RuleSet(parse_rules(texto)), repeticiones=1)
+    reglas = compiladas.rules # Mismo orden (prioridad) para las dos versiones
+    t_simple, r_simple = medir(lambda: [una_por_una(reglas, n) for n in nombres])
+    t_rs, r_rs = medir(lambda: [compiladas.match(n, 0) for n in nombres])
+
+    if r_simple != r_rs:
+        print("[ERROR] ¡El RuleSet NO decide lo mismo que la evaluación regla por regla!")
+        sys.exit(1)
+
+    carpeta = Path(tempfile.mkdtemp(prefix="bench_reglas_"))
+    try:
+        for ruta in nombres:
+            (carpeta / ruta.name).touch()
+        t_perfiles, r_perfiles = medir(lambda: un_perfil_por_regla(reglas, carpeta))
+        t_pasada, r_pasada = medir(lambda: una_pasada(compiladas, carpeta))
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+    if r_perfiles != r_pasada:
+        print("[ERROR] ¡La pasada única NO reparte igual que un perfil por regla!")
+        sys.exit(1)
+
+    print(f"Archivos: {num_archivos} | Reglas: {num_reglas}")
+    print(f"  - Compilación:                 {t_build * 1000:.1f} ms (una vez por perfil)")
+    print("  En memoria (solo decidir):")
+    print(f"  - Regla por regla:             {t_simple * 1000:.1f} ms")
+    print(f"  - RuleSet compilado:           {t_rs * 1000:.1f} ms (x{t_simple / t_rs:.1f})")
+    print("  Con la carpeta real:")
+    print(f"  - Un perfil por regla:         {t_perfiles * 1000:.1f} ms ({num_reglas} recorridos)")
+    print(f"  - Un perfil con reglas:        {t_pasada * 1000:.1f} ms (1 recorrido, x{t_perfiles / t_pasada:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# --- generador.py ---
+# Carga de trabajo sintética y reproducible (misma semilla = mismos datos)
+# para benchmarks/suite.py: árboles de origen con nombres de archivo
+# configurables y un admin_log.csv con filas al azar. Todo en carpetas
+# temporales locales, sin red. También se puede usar solo:
+#   python benchmarks/generador.py <carpeta> [--archivos N] [--profundidad N] ...
+
+import argparse
+import csv
+import random
+import string
+import unicodedata
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CONFIG_POR_DEFECTO = {
+    'archivos': 5000,          # Archivos en el árbol de origen
+    'largo_nombre': 40,        # Caracteres del nombre (sin extensión)
+    'densidad_acentos': 0.1,   # Probabilidad de que una vocal lleve acento/diéresis
+    'materias': 20,            # Palabras clave (materias) del perfil
+    'tasa_coincidencia': 0.7,  # Fracción de archivos que contienen alguna materia
+    'tasa_choques': 0.1,       # Fracción de archivos cuyo nombre ya existe en el destino
+    'profundidad': 0,          # 0 = todo en el primer nivel; N = subcarpetas de hasta N niveles
+    'filas_log': 100_000,      # Filas del admin_log.csv sintético
+    'semilla': 42,
+}
+
+EXTENSIONES = ['.pdf', '.docx', '.pptx', '.zip', '.png', '.jpg', '.xlsx', '.txt']
+ACENTOS = {'a': 'áàä', 'e': 'éèë', 'i': 'íìï', 'o': 'óòö', 'u': 'úùü', 'n': 'ñ'}
+SEPARADORES = ' _-.'
+CAMPOS_LOG = ['log_timestamp', 'username', 'id_perfil', 'file_original_path', 'file_new_path',
+              'file_size_bytes', 'subject_assigned', 'status', 'file_hash']
+
+
+def generar_materias(cantidad, semilla=42):
+    """ Materias en minúsculas ASCII, distintas entre sí (como quedan tras normalizar). """
+    rnd = random.Random(semilla)
+    materias = set()
+    while len(materias) < cantidad:
+        materias.add(''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(5, 12))))
+    return sorted(materias)
+
+
+def _sin_acentos(texto):
+    return ''.join(c for c in unicodedata.normalize('NFD', texto.lower()) if unicodedata.category(c) != 'Mn')
+
+
+def _acentuar(texto, densidad, rnd):
+    if densidad <= 0:
+        return texto
+    return ''.join(rnd.choice(ACENTOS[c]) if c in ACENTOS and rnd.random() < densidad else c for c in texto)
+
+
+def generar_nombre(rnd, config, materias):
+    """ Nombre de archivo: palabras al azar, a veces con una materia (mayúsculas y acentos incluidos). """
+    largo = max(4, config['largo_nombre'])
+    partes = []
+    if materias and rnd.random() < config['tasa_coincidencia']:
+        materia = rnd.choice(materias)
+        partes.append(materia.upper() if rnd.random() < 0.3 else materia.capitalize())
+    while sum(len(p) + 1 for p in partes) < largo:
+        partes.append(''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 9))))
+    rnd.shuffle(partes)
+    nombre = rnd.choice(SEPARADORES).join(partes)[:largo]
+    return _acentuar(nombre, config['densidad_acentos'], rnd) + rnd.choice(EXTENSIONES)
+
+
+def generar_nombres(config, materias=None):
+    """ Solo la lista de nombres (para medir normalización o nombres únicos sin tocar el disco). """
+    rnd = random.Random(config['semilla'])
+    materias = materias if materias is not None else generar_materias(config['materias'], config['semilla'])
+    return [generar_nombre(rnd, config, materias) for _ in range(config['archivos'])]
+
+
+def generar_arbol(raiz, config, materias=None):
+    """
+    Crea raiz/origen (con subcarpetas si 'profundidad' > 0) y raiz/destino,
+    donde 'tasa_choques' de los archivos ya existen con el mismo nombre en
+    la carpeta de su materia. Devuelve (origen, destino, materias).
+    """
+    raiz = Path(raiz)
+    rnd = random.Random(config['semilla'])
+    materias = materias if materias is not None else generar_materias(config['materias'], config['semilla'])
+    origen = raiz / "origen"
+    destino = raiz / "destino"
+    origen.mkdir(parents=True, exist_ok=True)
+    destino.mkdir(parents=True, exist_ok=True)
+
+    carpetas = [origen]
+    for nivel in range(config['profundidad']):
+        carpetas += [carpeta / f"nivel{nivel}_{i}" for carpeta in carpetas if len(carpeta.parts) - len(origen.parts) == nivel
+                     for i in range(2)]
+    for carpeta in carpetas:
+        carpeta.mkdir(parents=True, exist_ok=True)
+
+    usados = set()
+    for _ in range(config['archivos']):
+        carpeta = rnd.choice(carpetas)
+        nombre = generar_nombre(rnd, config, materias)
+        while (carpeta, nombre.lower()) in usados:
+            nombre = generar_nombre(rnd, config, materias)
+        usados.add((carpeta, nombre.lower()))
+        (carpeta / nombre).write_bytes(b'x' * rnd.randint(0, 64))
+        if rnd.random() < config['tasa_choques']:
+            materia = next((m for m in materias if m in _sin_acentos(nombre)), None)
+            carpeta_destino = destino / (materia or "Otros")
+            carpeta_destino.mkdir(exist_ok=True)
+            (carpeta_destino / nombre).touch()
+    return origen, destino, materias
+
+
+def generar_log(ruta, filas, semilla=42):
+    """ admin_log.csv sintético con 'filas' filas. """
+    rnd = random.Random(semilla)
+    inicio = datetime(2025, 1, 1)
+    materias = generar_materias(10, semilla) + ['Otros', 'N/A']
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CAMPOS_LOG)
+        writer.writeheader()
+        for i in range(filas):
+            writer.writerow({
+                'log_timestamp': (inicio + timedelta(seconds=rnd.randrange(300 * 24 * 3600))).isoformat(),
+                'username': rnd.choice(['ana', 'kevin', 'sebas', 'luz']),
+                'id_perfil': rnd.choice(['perfil_uni', 'perfil_trabajo']),
+                'file_original_path': f"C:\\Users\\u\\Downloads\\archivo_{i}{rnd.choice(EXTENSIONES)}",
+                'file_new_path': 'N/A',
+                'file_size_bytes': rnd.randrange(50_000_000),
+                'subject_assigned': rnd.choice(materias),
+                'status': rnd.choice(['MOVIDO', 'RENOMBRADO', 'OMITIDO', 'ERROR']),
+                'file_hash': '',
+            })
+    return Path(ruta)
+
+
+def agregar_argumentos(parser):
+    """ Un flag --nombre-con-guiones por cada clave de CONFIG_POR_DEFECTO. """
+    for clave, valor in CONFIG_POR_DEFECTO.items():
+        parser.add_argument(f"--{clave.replace('_', '-')}", type=type(valor), default=valor, dest=clave)
+
+
+def config_desde_argumentos(args):
+    return {clave: getattr(args, clave) for clave in CONFIG_POR_DEFECTO}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un árbol de origen y un admin_log.csv sintéticos")
+    parser.add_argument('carpeta', type=Path)
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    config = config_desde_argumentos(args)
+    carpeta = args.carpeta
+    origen, destino, materias = generar_arbol(carpeta, config)
+    generar_log(carpeta / "admin_log.csv", config['filas_log'], config['semilla'])
+    print(f"Origen: {origen}\nDestino: {destino}\nMaterias: {', '.join(materias)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# --- suite.py ---
+# Suite de benchmarks reproducible: mide las funciones calientes de la app
+# sobre datos sintéticos (generador.py) en carpetas temporales locales, sin
+# red, y compara contra una base guardada para ver si una versión nueva es
+# más lenta. Casos:
+#   normalize_text      -> normalizar 'archivos' nombres
+#   get_unique_path     -> repartir nombres únicos en una carpeta con choques
+#   plan_organization   -> planear el árbol completo (sin mover)
+#   organize_by_subject -> planear + mover + registrar (árbol nuevo en cada repetición)
+#   organize_by_subject_hilos -> lo mismo con HILOS_BENCH hilos moviendo y hashes (paralelo)
+#   cargar_admin_log    -> cargar el log con el caché frío y con el caché tibio (requiere pandas)
+# Uso:
+#   python benchmarks/suite.py [--archivos N] [--profundidad N] ... [--repeticiones N]
+#       [--salida resultados.json] [--base base.json] [--guardar-base] [--tolerancia 0.15]
+#       [--exigir-base]
+# Sale con código 1 si algún caso quedó más lento que la base por encima de la tolerancia,
+# y con código 2 si no hay base y se pidió --exigir-base (para CI).
+#
+# La base de referencia es benchmarks/base.json (va en el repositorio, con
+# la máquina en la que se midió en 'entorno'). Para renovarla después de un
+# cambio que vuelve algo más lento A PROPÓSITO, o al cambiar la máquina de
+# referencia, correr en esa máquina con la configuración por defecto:
+#   python benchmarks/suite.py --guardar-base
+# y subir el base.json nuevo junto con el cambio. Comparar contra una base
+# de otra máquina es solo orientativo (se avisa). Los casos paralelos
+# (CASOS_PARALELOS) dependen de los núcleos: si la base se midió con otra
+# cantidad de CPUs no se comparan (ni hacen fallar la suite).
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+CARPETA_BENCH = Path(__file__).resolve().parent
+CARPETA_APP = CARPETA_BENCH.parent
+sys.path.insert(0, str(CARPETA_BENCH))
+sys.path.insert(0, str(CARPETA_APP))
+
+import generador  # noqa: E402
+from normalizer import normalize_text  # noqa: E402
+
+BASE_POR_DEFECTO = CARPETA_BENCH / "base.json"
+FORMATO = 1 # Versión del JSON de resultados
+HILOS_BENCH = 4
+CASOS_PARALELOS = ('organize_by_subject_hilos',) # Su tiempo depende de los núcleos de la máquina
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """ Segundos de cada repetición de funcion(estado); 'preparar' no se mide. """
+    tiempos = []
+    for _ in range(repeticiones):
+        estado = preparar() if preparar is not None else None
+        inicio = time.perf_counter()
+        funcion(estado)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def resumir(tiempos, elementos):
+    mediana = statistics.median(tiempos)
+    return {
+        'mediana_s': round(mediana, 6),
+        'min_s': round(min(tiempos), 6),
+        'max_s': round(max(tiempos), 6),
+        'repeticiones': len(tiempos),
+        'elementos': elementos,
+        'us_por_elemento': round(mediana / elementos * 1e6, 3) if elementos else None,
+    }
+
+
+def cargar_app(carpeta):
+    """ Importa app.py con sus datos (perfiles, log, diarios) dentro de 'carpeta'. """
+    os.environ['APPDATA'] = str(carpeta / "appdata")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        from live_stats import LiveStats
+        app.ADMIN_LOG_CSV = carpeta / "admin_log.csv"
+        app.live_stats = LiveStats(app.ADMIN_LOG_CSV, carpeta / ".stats_admin_log.json")
+        app.setup()
+    return app
+
+
+def cargar_analizador(carpeta_log):
+    """ Importa el analizador (su archivo tiene espacios) apuntando al log sintético. """
+    spec = importlib.util.spec_from_file_location("analizador", CARPETA_APP / "analizador de datos.py")
+    analizador = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(analizador)
+    analizador.ADMIN_LOG_PATH = carpeta_log / "admin_log.csv"
+    analizador.LOG_CACHE_DIR = carpeta_log / ".cache_admin_log"
+    analizador.importar_analisis_completo()
+    return analizador
+
+
+def casos_app(app, config, repeticiones, carpeta):
+    from destinations import DestinationIndex
+    from traversal import SourceWalker
+
+    resultados = {}
+    nombres = generador.generar_nombres(config)
+    materias = generador.generar_materias(config['materias'], config['semilla'])
+    materias_pipe = app.MATERIAS_SEPARATOR.join(materias)
+    max_depth = None if config['profundidad'] > 0 else 0
+
+    def normalizar(_):
+        for nombre in nombres:
+            normalize_text(nombre)
+    resultados['normalize_text'] = resumir(medir(normalizar, repeticiones), len(nombres))
+
+    # Carpeta con 'tasa_choques' de los nombres ya ocupados (y nombres repetidos en la lista)
+    ocupada = carpeta / "nombres_unicos"
+    ocupada.mkdir()
+    for nombre in nombres[:int(len(nombres) * config['tasa_choques'])]:
+        (ocupada / nombre).touch()
+
+    def nombres_unicos(_):
+        indice = DestinationIndex()
+        for nombre in nombres:
+            app.get_unique_path(ocupada / nombre, indice)
+    resultados['get_unique_path'] = resumir(medir(nombres_unicos, repeticiones), len(nombres))
+
+    arbol = carpeta / "arbol_plan"
+    origen, destino, _ = generador.generar_arbol(arbol, config, materias)
+
+    def planear(_):
+        walker = SourceWalker(origen, max_depth=max_depth, exclude=[destino])
+        app.plan_organization(str(origen), str(destino), materias_pipe, "Mover", "bench", items=walker)
+    resultados['plan_organization'] = resumir(medir(planear, repeticiones), config['archivos'])
+
+    contador = iter(range(1_000_000))
+
+    def preparar_arbol():
+        raiz = carpeta / f"arbol_{next(contador)}"
+        return generador.generar_arbol(raiz, config, materias)
+
+    def organizar(estado):
+        origen, destino, _ = estado
+        walker = SourceWalker(origen, max_depth=max_depth, exclude=[destino])
+        app.organize_by_subject(str(origen), str(destino), materias_pipe, "Mover", "bench", walker=walker)
+    resultados['organize_by_subject'] = resumir(medir(organizar, repeticiones, preparar_arbol), config['archivos'])
+
+    def organizar_en_paralelo(estado):
+        origen, destino, _ = estado
+        walker = SourceWalker(origen, max_depth=max_depth, exclude=[destino])
+        app.organize_by_subject(str(origen), str(destino), materias_pipe, "Mover", "bench", walker=walker,
+                                max_workers=HILOS_BENCH, compute_hashes=True)
+    resultados['organize_by_subject_hilos'] = resumir(medir(organizar_en_paralelo, repeticiones, preparar_arbol),
+                                                      config['archivos'])
+    return resultados
+
+
+def casos_analizador(config, repeticiones, carpeta):
+    carpeta_log = carpeta / "log"
+    carpeta_log.mkdir()
+    generador.generar_log(carpeta_log / "admin_log.csv", config['filas_log'], config['semilla'])
+    try:
+        analizador = cargar_analizador(carpeta_log)
+    except ImportError as e:
+        print(f"  (cargar_admin_log omitido: falta {e.name})")
+        return {}
+
+    def cargar(_):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if analizador.cargar_admin_log() is None:
+                raise RuntimeError("cargar_admin_log no pudo leer el log sintético")
+
+    def enfriar():
+        shutil.rmtree(analizador.LOG_CACHE_DIR, ignore_errors=True)
+
+    resultados = {
+        'cargar_admin_log_frio': resumir(medir(cargar, repeticiones, enfriar), config['filas_log']),
+    }
+    cargar(None) # Deja el caché construido
+    resultados['cargar_admin_log_tibio'] = resumir(medir(cargar, repeticiones), config['filas_log'])
+    return resultados
+
+
+def entorno(app):
+    return {
+        'version_app': getattr(app, 'APP_VERSION', None),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def comparar(actual, base, tolerancia):
+    """ Imprime la comparación y devuelve los nombres de los casos que empeoraron. """
+    if base.get('config') != actual['config']:
+        print("Aviso: la base se midió con otra configuración; la comparación es orientativa.")
+    maquina = lambda resultados: {k: resultados.get('entorno', {}).get(k) for k in ('python', 'plataforma', 'cpus')}
+    if maquina(base) != maquina(actual):
+        print(f"Aviso: la base es de otra máquina ({maquina(base)}); la comparación es orientativa.")
+    cpus_base = base.get('entorno', {}).get('cpus')
+    otras_cpus = cpus_base != actual['entorno']['cpus']
+    regresiones = []
+    print(f"\n{'Caso':<26}{'Base (s)':>12}{'Ahora (s)':>12}{'Cambio':>10}")
+    for nombre, caso in actual['casos'].items():
+        caso_base = base.get('casos', {}).get(nombre)
+        if caso_base is None:
+            print(f"{nombre:<26}{'-':>12}{caso['mediana_s']:>12.4f}{'nuevo':>10}")
+            continue
+        if nombre in CASOS_PARALELOS and otras_cpus:
+            print(f"{nombre:<26}{caso_base['mediana_s']:>12.4f}{caso['mediana_s']:>12.4f}"
+                  f"  (no se compara: base con {cpus_base} CPUs)")
+            continue
+        cambio = caso['mediana_s'] / caso_base['mediana_s'] - 1 if caso_base['mediana_s'] else 0.0
+        marca = ""
+        if cambio > tolerancia:
+            marca = "  <- MÁS LENTO"
+            regresiones.append(nombre)
+        print(f"{nombre:<26}{caso_base['mediana_s']:>12.4f}{caso['mediana_s']:>12.4f}{cambio:>+10.1%}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del organizador")
+    generador.agregar_argumentos(parser)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--salida', type=Path, default=None, help="JSON con los resultados")
+    parser.add_argument('--base', type=Path, default=BASE_POR_DEFECTO, help="JSON de resultados a comparar")
+    parser.add_argument('--guardar-base', action='store_true', help="Guarda estos resultados como la base")
+    parser.add_argument('--tolerancia', type=float, default=0.15, help="Cuánto más lento se acepta (0.15 = 15%%)")
+    parser.add_argument('--sin-analizador', action='store_true', help="No medir cargar_admin_log")
+    parser.add_argument('--exigir-base', action='store_true', help="Falla (código 2) si no hay base para comparar")
+    args = parser.parse_args()
+    config = generador.config_desde_argumentos(args)
+
+    carpeta = Path(tempfile.mkdtemp(prefix="bench_suite_"))
+    try:
+        app = cargar_app(carpeta)
+        print(f"Configuración: {json.dumps(config)} | repeticiones: {args.repeticiones}")
+        casos = casos_app(app, config, args.repeticiones, carpeta)
+        if not args.sin_analizador:
+            casos.update(casos_analizador(config, args.repeticiones, carpeta))
+        resultados = {'formato': FORMATO, 'entorno': entorno(app), 'config': config,
+                      'repeticiones': args.repeticiones, 'casos': casos}
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+    for nombre, caso in casos.items():
+        print(f"  - {nombre:<26} mediana: {caso['mediana_s']:.4f} s | {caso['us_por_elemento']} µs por elemento")
+
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if args.salida:
+        args.salida.write_text(texto, encoding='utf-8')
+        print(f"Resultados guardados en {args.salida}")
+    if args.guardar_base:
+        args.base.write_text(texto, encoding='utf-8')
+        print(f"Base guardada en {args.base}")
+        return
+
+    if args.base.exists():
+        base = json.loads(args.base.read_text(encoding='utf-8'))
+        regresiones = comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            print(f"\nMás lentos que la base (>{args.tolerancia:.0%}): {', '.join(regresiones)}")
+            sys.exit(1)
+    else:
+        print(f"\nNo hay base en {args.base} (créala con --guardar-base).")
+        if args.exigir_base:
+            sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# --- cache_utils.py (Cachés en disco) ---
+# Base común para los cachés que se guardan como JSON en la carpeta del
+# usuario (tamaños de carpeta, hashes, ...). Se cargan al primer uso, se
+# comparten entre hilos y se guardan de forma atómica (temporal + rename).
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+class PersistentJsonCache:
+    """ Diccionario llave -> valor (JSON) con carga perezosa y guardado atómico. """
+
+    max_entries = 200000 # Si se supera, el caché se vacía y empieza de nuevo
+
+    def __init__(self, cache_path):
+        self.cache_path = Path(cache_path)
+        self._entries = None # Se carga al primer uso
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """ Llamar con el lock tomado. """
+        if self._entries is not None:
+            return
+        try:
+            with open(self.cache_path, mode='r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, key):
+        with self._lock:
+            self._load()
+            return self._entries.get(key)
+
+    def put(self, key, value):
+        with self._lock:
+            self._load()
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = value
+            self._dirty = True
+
+    def pop(self, key):
+        with self._lock:
+            self._load()
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """ Guarda el caché en disco (solo si hubo cambios). """
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+        tmp_path = None
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Temporal con nombre propio: dos tareas que guardan a la vez no se pisan el archivo
+            with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', dir=self.cache_path.parent,
+                                             prefix=f".{self.cache_path.name}.", suffix=".tmp",
+                                             delete=False) as f:
+                tmp_path = f.name
+                json.dump(entries, f, separators=(',', ':'))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # El caché es opcional: si no se puede guardar, se recalcula la próxima vez
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
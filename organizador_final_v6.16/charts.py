@@ -0,0 +1,157 @@
+# --- charts.py (El "Pintor" de gráficos) ---
+# Dibuja los PNG del analizador en un pool de procesos con el backend
+# 'Agg' (sin ventana), cada gráfico en su propio proceso.
+# Cada gráfico lleva una huella (hash de sus datos + sus parámetros); si
+# el PNG ya existe con la misma huella no se vuelve a dibujar.
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+VERSION_GRAFICOS = 1 # Cambiarla obliga a redibujar todo (p. ej. si cambia el estilo)
+
+
+class ChartSpec:
+    """ Un gráfico: sus datos (una Serie de pandas) y cómo dibujarlos. """
+
+    def __init__(self, number, name, filename, kind, series, title, xlabel=None, ylabel=None,
+                 figsize=(10, 6), plot_kwargs=None, xticks_rotation=None, invert_y=False,
+                 grid=None, tight_layout=True):
+        self.number = number
+        self.name = name
+        self.filename = filename
+        self.kind = kind
+        self.series = series
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.figsize = figsize
+        self.plot_kwargs = plot_kwargs or {}
+        self.xticks_rotation = xticks_rotation
+        self.invert_y = invert_y
+        self.grid = grid
+        self.tight_layout = tight_layout
+
+    def fingerprint(self):
+        """ Hash de los datos y de todos los parámetros del dibujo. """
+        payload = {
+            'version': VERSION_GRAFICOS,
+            'kind': self.kind,
+            'index': [str(key) for key in self.series.index],
+            'values': [float(value) for value in self.series.to_numpy()],
+            'params': [self.title, self.xlabel, self.ylabel, list(self.figsize), self.plot_kwargs,
+                       self.xticks_rotation, self.invert_y, self.grid, self.tight_layout],
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def render_chart(spec, output_path):
+    """
+    Dibuja un gráfico y lo guarda (se ejecuta dentro del pool de procesos).
+    Devuelve los segundos que tardó.
+    """
+    start = time.perf_counter()
+    import matplotlib
+    matplotlib.use('Agg') # Sin interfaz gráfica: más rápido y funciona sin pantalla
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=spec.figsize)
+    if spec.kind == 'pie':
+        plt.pie(spec.series, labels=spec.series.index, **spec.plot_kwargs)
+    else:
+        spec.series.plot(kind=spec.kind, **spec.plot_kwargs)
+    plt.title(spec.title)
+    if spec.xlabel:
+        plt.xlabel(spec.xlabel)
+    if spec.ylabel:
+        plt.ylabel(spec.ylabel)
+    if spec.xticks_rotation is not None:
+        plt.xticks(rotation=spec.xticks_rotation)
+    if spec.invert_y:
+        plt.gca().invert_yaxis() # La más popular arriba
+    if spec.grid:
+        plt.grid(True, **spec.grid)
+    if spec.tight_layout:
+        plt.tight_layout()
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(f".{output_path.stem}.{os.getpid()}.tmp.png")
+    plt.savefig(tmp_path)
+    plt.close()
+    os.replace(tmp_path, output_path) # Nunca queda un PNG a medio escribir
+    return time.perf_counter() - start
+
+
+class ChartCache:
+    """ Índice en disco: nombre del PNG -> huella de los datos con que se dibujó. """
+
+    def __init__(self, index_path):
+        self.index_path = Path(index_path)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_current(self, output_path, fingerprint):
+        return self.entries.get(Path(output_path).name) == fingerprint and Path(output_path).exists()
+
+    def remember(self, output_path, fingerprint):
+        self.entries[Path(output_path).name] = fingerprint
+
+    def save(self):
+        tmp_path = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            pass # Sin caché el próximo arranque simplemente redibuja
+
+
+def render_charts(specs, output_dir, cache_path, max_workers=None):
+    """
+    Dibuja los gráficos que cambiaron y reutiliza los demás.
+    Devuelve {número: (estado, segundos o excepción)} con estado
+    'dibujado', 'reutilizado' o 'error'.
+    """
+    output_dir = Path(output_dir)
+    cache = ChartCache(cache_path)
+    results = {}
+    pending = []
+    for spec in specs:
+        fingerprint = spec.fingerprint()
+        output_path = output_dir / spec.filename
+        if cache.is_current(output_path, fingerprint):
+            results[spec.number] = ('reutilizado', 0.0)
+        else:
+            pending.append((spec, output_path, fingerprint))
+
+    def finished(spec, output_path, fingerprint, seconds):
+        results[spec.number] = ('dibujado', seconds)
+        cache.remember(output_path, fingerprint)
+
+    if len(pending) == 1:
+        # Un solo gráfico: no vale la pena levantar procesos
+        spec, output_path, fingerprint = pending[0]
+        try:
+            finished(spec, output_path, fingerprint, render_chart(spec, output_path))
+        except Exception as e:
+            results[spec.number] = ('error', e)
+    elif pending:
+        workers = max_workers or max(1, min(len(pending), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(item, pool.submit(render_chart, item[0], item[1])) for item in pending]
+            for (spec, output_path, fingerprint), future in futures:
+                try:
+                    finished(spec, output_path, fingerprint, future.result())
+                except Exception as e:
+                    results[spec.number] = ('error', e)
+
+    if pending:
+        cache.save()
+    return results
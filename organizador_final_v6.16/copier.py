@@ -0,0 +1,239 @@
+# --- copier.py (El "Transportista" entre discos) ---
+# Cuando el origen y el destino están en discos distintos (USB, red) no se
+# puede renombrar: hay que copiar y borrar. shutil.move hace eso con un
+# buffer pequeño; aquí la copia va por el camino más rápido disponible:
+#   1. os.copy_file_range (Linux): el kernel copia sin pasar por Python.
+#   2. os.sendfile (Linux), si copy_file_range no sirve entre esos discos.
+#   3. Lectura/escritura con un buffer grande (BUFFER_COPIA).
+# Los archivos enormes se copian en trozos paralelos (cada hilo con sus
+# propios offsets). Antes de borrar el origen la copia se sincroniza a
+# disco y se verifica: tamaño + hash si ya se conoce el del origen, o
+# tamaño + primeros y últimos bytes si no. Al final se vuelve a mirar el
+# origen: si cambió su tamaño o su fecha de modificación mientras se
+# copiaba (alguien seguía escribiéndolo), la copia no vale.
+
+import errno
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hashing import hash_file
+
+BUFFER_COPIA = 8 * 1024 * 1024            # 8 MB por lectura/escritura
+UMBRAL_PARALELO = 256 * 1024 * 1024       # Archivos de 256 MB o más se copian en trozos paralelos
+HILOS_COPIA = 4
+MUESTRA_VERIFICACION = 64 * 1024          # Bytes comparados al inicio y al final (sin hash)
+
+# Errores que solo dicen "esta vía no sirve aquí": se prueba la siguiente
+_SIN_SOPORTE = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF, errno.EPERM,
+                getattr(errno, 'EOPNOTSUPP', errno.EINVAL), getattr(errno, 'ENOTSUP', errno.EINVAL)}
+
+
+class CopyVerificationError(OSError):
+    """ La copia no coincide con el origen (el origen NO se borra). """
+
+
+class TransferStats:
+    """
+    Copias entre discos de UNA ejecución (seguro entre hilos). El tiempo
+    va del inicio de la primera copia al final de la última, así con
+    varios hilos la velocidad es la del conjunto.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self._first_start = None
+        self._last_end = None
+        self._lock = threading.Lock()
+
+    def record(self, size, start, end):
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            if self._first_start is None or start < self._first_start:
+                self._first_start = start
+            if self._last_end is None or end > self._last_end:
+                self._last_end = end
+
+    @property
+    def seconds(self):
+        if self._first_start is None:
+            return 0.0
+        return self._last_end - self._first_start
+
+    def report(self):
+        """ Claves para el reporte de la ejecución (vacío si no hubo copias entre discos). """
+        if not self.files:
+            return {}
+        megabytes = self.bytes / (1024 * 1024)
+        return {
+            'cross_device_files': self.files,
+            'cross_device_mb': round(megabytes, 2),
+            'cross_device_seconds': round(self.seconds, 3),
+            'throughput_mb_s': throughput(megabytes, self.seconds),
+        }
+
+
+def throughput(megabytes, seconds):
+    """ MB/s redondeado (0 si no hubo tiempo medible). """
+    return round(megabytes / seconds, 2) if seconds > 0 else 0.0
+
+
+def same_device(source, dest_dir):
+    """
+    True si 'source' y 'dest_dir' están en el mismo disco (st_dev). Si no se
+    puede saber se asume que sí: os.replace dirá EXDEV si no lo estaban.
+    """
+    try:
+        return os.stat(source, follow_symlinks=False).st_dev == os.stat(dest_dir).st_dev
+    except OSError:
+        return True
+
+
+def _copy_kernel(fd_in, fd_out, offset, length):
+    """ copy_file_range con offsets explícitos. Devuelve los bytes copiados (puede ser menos de 'length'). """
+    done = 0
+    if not hasattr(os, 'copy_file_range'):
+        return done
+    try:
+        while done < length:
+            copied = os.copy_file_range(fd_in, fd_out, length - done, offset + done, offset + done)
+            if copied == 0:
+                break # Algunos sistemas de archivos devuelven 0 en vez de fallar
+            done += copied
+    except OSError as e:
+        if e.errno not in _SIN_SOPORTE:
+            raise
+    return done
+
+
+def _copy_sendfile(fd_in, fd_out, offset, length):
+    """ sendfile de archivo a archivo (Linux). Escribe en la posición actual de fd_out. """
+    done = 0
+    if not hasattr(os, 'sendfile') or not sys.platform.startswith('linux'):
+        return done
+    os.lseek(fd_out, offset, os.SEEK_SET)
+    try:
+        while done < length:
+            sent = os.sendfile(fd_out, fd_in, offset + done, min(length - done, 1 << 30))
+            if sent == 0:
+                break
+            done += sent
+    except OSError as e:
+        if e.errno not in _SIN_SOPORTE:
+            raise
+    return done
+
+
+def _copy_buffered(fd_in, fd_out, offset, length):
+    """ Lectura/escritura con un buffer grande reutilizable (pread/pwrite si existen). """
+    if not (hasattr(os, 'preadv') and hasattr(os, 'pwrite')):
+        # Windows: sin offsets explícitos (aquí nunca hay trozos en paralelo)
+        os.lseek(fd_in, offset, os.SEEK_SET)
+        os.lseek(fd_out, offset, os.SEEK_SET)
+        remaining = length
+        while remaining > 0:
+            data = os.read(fd_in, min(BUFFER_COPIA, remaining))
+            if not data:
+                raise OSError(errno.EIO, "El archivo de origen se acortó durante la copia")
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd_out, view):]
+            remaining -= len(data)
+        return
+    buffer = bytearray(min(BUFFER_COPIA, max(length, 1)))
+    done = 0
+    while done < length:
+        chunk = memoryview(buffer)[:min(len(buffer), length - done)]
+        read = os.preadv(fd_in, [chunk], offset + done)
+        if not read:
+            raise OSError(errno.EIO, "El archivo de origen se acortó durante la copia")
+        written = 0
+        while written < read:
+            written += os.pwrite(fd_out, chunk[written:read], offset + done + written)
+        done += read
+
+
+def _copy_range(fd_in, fd_out, offset, length, sequential):
+    """ Copia [offset, offset + length) por la vía más rápida que funcione. """
+    done = _copy_kernel(fd_in, fd_out, offset, length)
+    if done < length and sequential:
+        done += _copy_sendfile(fd_in, fd_out, offset + done, length - done)
+    if done < length:
+        _copy_buffered(fd_in, fd_out, offset + done, length - done)
+
+
+def _copy_parallel(fd_in, fd_out, size, workers):
+    """ Trozos contiguos, uno por hilo (copy_file_range y pread/pwrite no comparten posición). """
+    os.ftruncate(fd_out, size) # Reservar el tamaño final de una vez
+    chunk = -(-size // workers)
+    ranges = [(start, min(chunk, size - start)) for start in range(0, size, chunk)]
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="copia") as executor:
+        futures = [executor.submit(_copy_range, fd_in, fd_out, start, length, False) for start, length in ranges]
+        for future in futures:
+            future.result()
+
+
+def _read_sample(path, size):
+    with open(path, 'rb') as f:
+        head = f.read(MUESTRA_VERIFICACION)
+        if size > MUESTRA_VERIFICACION:
+            f.seek(max(MUESTRA_VERIFICACION, size - MUESTRA_VERIFICACION))
+            return head + f.read(MUESTRA_VERIFICACION)
+        return head
+
+
+def verify_copy(source, destination, size, source_hash=None):
+    """ Lanza CopyVerificationError si la copia no coincide con el origen. """
+    copied_size = os.stat(destination).st_size
+    if copied_size != size:
+        raise CopyVerificationError(errno.EIO, f"La copia mide {copied_size} bytes y el origen {size}")
+    if source_hash:
+        if hash_file(destination) != source_hash:
+            raise CopyVerificationError(errno.EIO, "El hash de la copia no coincide con el del origen")
+    elif _read_sample(source, size) != _read_sample(destination, size):
+        raise CopyVerificationError(errno.EIO, "El contenido de la copia no coincide con el del origen")
+
+
+def copy_file(source, destination, transfer=None, source_hash=None):
+    """
+    Copia un archivo a otro disco (con sus fechas y permisos, como copy2),
+    lo sincroniza y lo verifica. Si algo falla la copia queda vacía (para
+    que discard_placeholder la borre) y el origen no se toca.
+    """
+    start = time.perf_counter()
+    before = os.stat(source)
+    size = before.st_size
+    try:
+        with open(source, 'rb', buffering=0) as fsrc, open(destination, 'wb', buffering=0) as fdst:
+            fd_in, fd_out = fsrc.fileno(), fdst.fileno()
+            if size >= UMBRAL_PARALELO and HILOS_COPIA > 1 and hasattr(os, 'pwrite'):
+                _copy_parallel(fd_in, fd_out, size, HILOS_COPIA)
+            else:
+                _copy_range(fd_in, fd_out, 0, size, sequential=True)
+            os.fsync(fd_out)
+        shutil.copystat(source, destination)
+        verify_copy(source, destination, size, source_hash)
+        after = os.stat(source)
+        if (after.st_size, after.st_mtime_ns) != (size, before.st_mtime_ns):
+            raise CopyVerificationError(errno.EAGAIN, f"El origen cambió durante la copia ({size} -> {after.st_size} bytes)")
+    except BaseException:
+        try:
+            os.truncate(destination, 0)
+        except OSError:
+            pass
+        raise
+    if transfer is not None:
+        transfer.record(size, start, time.perf_counter())
+    return destination
+
+
+def copy_tree(source, destination, transfer=None):
+    """ copytree con copy_file para cada archivo (los enlaces se copian como enlaces). """
+    def copy_function(src, dst):
+        return copy_file(src, dst, transfer)
+    return shutil.copytree(source, destination, symlinks=True, copy_function=copy_function)
@@ -0,0 +1,108 @@
+# --- dedupe.py (El detector de "Duplicados" reales) ---
+# Cuando un archivo choca de nombre en el destino, antes de crear
+# "nombre (1).ext" se revisa si en realidad es el MISMO archivo.
+# La comparación va por niveles, del más barato al más caro:
+#   1. Tamaño (un stat)
+#   2. Hash del primer y último bloque (dos lecturas cortas)
+#   3. Hash completo (usa el caché de hashes si ya se conoce)
+
+import hashlib
+import os
+
+from destinations import DestinationIndex
+from hashing import hash_file
+
+# Qué hacer con un archivo idéntico a uno que ya está en el destino
+DUPLICADOS_RENOMBRAR = "Renombrar" # Comportamiento clásico: "nombre (1).ext"
+DUPLICADOS_OMITIR = "Omitir"       # Dejarlo en el origen
+DUPLICADOS_BORRAR = "Borrar"       # Borrarlo del origen (la copia del destino se queda)
+DUPLICADOS_ENLAZAR = "Enlazar"     # Cambiarlo por un enlace duro a la copia del destino
+MODOS_DUPLICADOS = (DUPLICADOS_RENOMBRAR, DUPLICADOS_OMITIR, DUPLICADOS_BORRAR, DUPLICADOS_ENLAZAR)
+
+# Status nuevos para el admin_log
+STATUS_POR_MODO = {
+    DUPLICADOS_OMITIR: "DUPLICADO_OMITIDO",
+    DUPLICADOS_BORRAR: "DUPLICADO_BORRADO",
+    DUPLICADOS_ENLAZAR: "DUPLICADO_ENLAZADO",
+}
+STATUS_DUPLICADOS = tuple(STATUS_POR_MODO.values())
+
+BLOQUE_MUESTRA = 64 * 1024 # Tamaño del primer/último bloque del nivel 2
+
+
+def _edge_hash(path, size):
+    """ Hash del primer y último bloque de un archivo. """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        digest.update(f.read(BLOQUE_MUESTRA))
+        if size > BLOQUE_MUESTRA:
+            f.seek(max(BLOQUE_MUESTRA, size - BLOQUE_MUESTRA))
+            digest.update(f.read(BLOQUE_MUESTRA))
+    return digest.hexdigest()
+
+
+def _full_hash(path, st, hash_cache):
+    if hash_cache is not None:
+        cached = hash_cache.lookup(path, st.st_size, st.st_mtime_ns)
+        if cached:
+            return cached
+    digest = hash_file(path)
+    if hash_cache is not None:
+        hash_cache.remember(path, st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+def files_identical(source, existing, hash_cache=None, source_hash=None):
+    """ True si los dos archivos tienen exactamente el mismo contenido. """
+    try:
+        st_source = os.stat(source)
+        st_existing = os.stat(existing)
+    except OSError:
+        return False
+    # Nivel 1: tamaño
+    if st_source.st_size != st_existing.st_size:
+        return False
+    if os.path.samestat(st_source, st_existing):
+        return True
+    # Archivos pequeños: el nivel 2 ya los lee completos
+    if st_source.st_size <= 2 * BLOQUE_MUESTRA:
+        return _edge_hash(source, st_source.st_size) == _edge_hash(existing, st_existing.st_size)
+    # Nivel 2: primer y último bloque
+    if _edge_hash(source, st_source.st_size) != _edge_hash(existing, st_existing.st_size):
+        return False
+    # Nivel 3: hash completo
+    source_hash = source_hash or _full_hash(str(source), st_source, hash_cache)
+    return source_hash == _full_hash(str(existing), st_existing, hash_cache)
+
+
+def find_identical(item, target_dir, hash_cache=None, source_hash=None, dest_index=None):
+    """
+    Busca en target_dir una copia idéntica de 'item' entre "nombre.ext",
+    "nombre (1).ext", "nombre (2).ext"... (las variantes que ya existen).
+    Los nombres salen del índice de destinos de la ejecución ('dest_index',
+    ver destinations.py), sin un exists() por variante.
+    Devuelve la ruta de la copia o None.
+    """
+    dest_index = dest_index or DestinationIndex()
+    for candidate in dest_index.variants(target_dir, item.name):
+        if candidate.is_file() and files_identical(item, candidate, hash_cache, source_hash):
+            return candidate
+    return None
+
+
+def resolve_duplicate(item, existing, mode):
+    """
+    Aplica el modo elegido a un archivo idéntico a 'existing'.
+    Devuelve el status para el log. Si el enlace duro no es posible
+    (otro disco, sistema de archivos sin soporte) el archivo se omite.
+    """
+    if mode == DUPLICADOS_BORRAR:
+        os.remove(item)
+    elif mode == DUPLICADOS_ENLAZAR:
+        tmp_link = item.with_name(f".{item.name}.enlace_tmp")
+        try:
+            os.link(existing, tmp_link)
+        except OSError:
+            return STATUS_POR_MODO[DUPLICADOS_OMITIR]
+        os.replace(tmp_link, item) # Reemplazo atómico: nunca queda el origen sin archivo
+    return STATUS_POR_MODO[mode]
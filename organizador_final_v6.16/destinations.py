@@ -0,0 +1,206 @@
+# --- destinations.py (El "Índice" de nombres en el destino) ---
+# Antes, cada choque de nombre probaba exists() con " (1)", " (2)", ...
+# uno por uno. Aquí cada carpeta destino se lee UNA vez por ejecución
+# (un solo os.scandir), los sufijos se reparten desde memoria y el índice
+# se actualiza a medida que llegan archivos.
+# Además el destino se reserva de forma atómica (O_EXCL para archivos,
+# os.mkdir para carpetas) para que otro programa que escriba en la misma
+# carpeta no provoque una sobreescritura.
+
+import errno
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from copier import copy_file, copy_tree, same_device
+
+
+def _key(name):
+    """ Nombre normalizado para comparar (en Windows no distingue mayúsculas). """
+    return os.path.normcase(name)
+
+
+def _split_name(name):
+    path = Path(name)
+    return path.stem, path.suffix
+
+
+class _FolderIndex:
+    """ Nombres de UNA carpeta destino + el siguiente sufijo libre por nombre base. """
+
+    def __init__(self, folder):
+        self.lock = threading.Lock()
+        self.names = set()
+        self.next_suffix = {}
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    self.names.add(_key(entry.name))
+        except OSError:
+            pass # La carpeta aún no existe: índice vacío
+
+    def allocate(self, preferred, base):
+        """
+        Reserva 'preferred' si está libre; si no, el primer "base (N).ext" libre.
+        Llamar con el lock tomado.
+        """
+        if preferred and _key(preferred) not in self.names:
+            self.names.add(_key(preferred))
+            return preferred
+        stem, ext = _split_name(base)
+        i = self.next_suffix.get(_key(base), 1)
+        while True:
+            candidate = f"{stem} ({i}){ext}"
+            i += 1
+            if _key(candidate) not in self.names:
+                self.next_suffix[_key(base)] = i
+                self.names.add(_key(candidate))
+                return candidate
+
+    def mark_taken(self, name):
+        self.names.add(_key(name))
+
+    def release(self, name):
+        self.names.discard(_key(name))
+
+
+class DestinationIndex:
+    """ Índice de nombres por carpeta destino, válido durante UNA ejecución. """
+
+    def __init__(self):
+        self._folders = {}
+        self._lock = threading.Lock()
+
+    def _folder(self, folder):
+        folder = Path(folder)
+        with self._lock:
+            index = self._folders.get(folder)
+            if index is None:
+                index = self._folders[folder] = _FolderIndex(folder)
+            return index
+
+    def contains(self, folder, name):
+        index = self._folder(folder)
+        with index.lock:
+            return _key(name) in index.names
+
+    def variants(self, folder, name):
+        """
+        Rutas de "name", "name (1)", "name (2)"... que ya están en 'folder',
+        hasta el primer número libre (sin tocar el disco: sale del índice).
+        """
+        index = self._folder(folder)
+        stem, ext = _split_name(name)
+        found = []
+        with index.lock:
+            candidate, i = name, 0
+            while _key(candidate) in index.names:
+                found.append(Path(folder) / candidate)
+                i += 1
+                candidate = f"{stem} ({i}){ext}"
+        return found
+
+    def reserve(self, folder, name, preferred=None):
+        """
+        Aparta (solo en memoria) un nombre libre para 'name' en 'folder'.
+        Lo usa la planeación, que no debe tocar el disco.
+        """
+        index = self._folder(folder)
+        with index.lock:
+            return Path(folder) / index.allocate(preferred or name, name)
+
+    def claim(self, folder, name, preferred=None, create_placeholder=True, directory=False):
+        """
+        Aparta un nombre libre y, si create_placeholder=True, crea en disco un
+        archivo vacío con O_EXCL (o una carpeta vacía con os.mkdir si
+        directory=True) para que nadie más pueda usarlo. Si otro programa
+        ya lo creó se marca como ocupado y se prueba el siguiente.
+        """
+        index = self._folder(folder)
+        while True:
+            with index.lock:
+                chosen = index.allocate(preferred or name, name)
+            preferred = None
+            destination = Path(folder) / chosen
+            if not create_placeholder:
+                return destination
+            try:
+                if directory:
+                    os.mkdir(destination)
+                else:
+                    fd = os.open(destination, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                    os.close(fd)
+                return destination
+            except FileExistsError:
+                continue # Alguien más lo creó después del escaneo: ya quedó marcado
+
+    def release(self, destination):
+        """ Libera un nombre reservado que al final no se usó. """
+        index = self._folder(destination.parent)
+        with index.lock:
+            index.release(destination.name)
+
+
+def _is_cross_device(error):
+    return error.errno == errno.EXDEV or getattr(error, 'winerror', None) == 17 # ERROR_NOT_SAME_DEVICE
+
+
+def place_file(source, destination, transfer=None, source_hash=None):
+    """
+    Mueve un archivo sobre su marcador vacío (creado por claim).
+    Mismo disco: os.replace (atómico). Otro disco (st_dev distinto o EXDEV):
+    copy_file (rápida y verificada) y recién entonces se borra el origen.
+    'transfer' (TransferStats) acumula lo copiado entre discos.
+    """
+    if same_device(source, destination.parent):
+        try:
+            os.replace(source, destination)
+            return
+        except OSError as e:
+            if not _is_cross_device(e):
+                raise
+    copy_file(source, destination, transfer, source_hash)
+    os.remove(source)
+
+
+def place_dir(source, destination, transfer=None, claimed=False):
+    """
+    Mueve una carpeta a un nombre que NO debe existir (FileExistsError si
+    existe). Se revisa antes de renombrar: en POSIX os.rename sobre una
+    carpeta vacía la reemplaza sin avisar. Con claimed=True 'destination'
+    es la carpeta vacía que creó claim(): se quita justo antes de mover
+    (os.rmdir falla si alguien escribió en ella, así no se pisa nada).
+    Si la copia entre discos falla se borra lo copiado (la carpeta no
+    existía) y el origen queda intacto.
+    """
+    if claimed:
+        os.rmdir(destination)
+    if os.path.lexists(destination):
+        raise FileExistsError(errno.EEXIST, "El destino ya existe", str(destination))
+    if same_device(source, destination.parent):
+        try:
+            os.rename(source, destination)
+            return
+        except OSError as e:
+            if not _is_cross_device(e):
+                raise
+    try:
+        copy_tree(source, destination, transfer)
+    except BaseException:
+        shutil.rmtree(destination, ignore_errors=True)
+        raise
+    shutil.rmtree(source)
+
+
+def discard_placeholder(destination):
+    """ Borra el marcador vacío (archivo o carpeta) si el movimiento falló (y sigue vacío). """
+    try:
+        if destination.is_symlink():
+            return
+        if destination.is_dir():
+            os.rmdir(destination) # Falla si ya tiene algo: entonces no es solo el marcador
+        elif destination.is_file() and destination.stat().st_size == 0:
+            destination.unlink()
+    except OSError:
+        pass
@@ -0,0 +1,82 @@
+# --- dirsize.py (La "Báscula" de carpetas) ---
+# Calcula el tamaño de una carpeta con os.scandir (reusando los datos de
+# cada DirEntry) y guarda en disco un caché por carpeta, llave
+# (dispositivo, inodo) + mtime, para no volver a recorrer lo que no cambió.
+#
+# Cómo funciona el caché: por cada carpeta se guarda la suma de SUS archivos
+# y la lista de sus subcarpetas. Si el mtime de la carpeta no cambió (nadie
+# creó, borró ni renombró nada dentro) se usan esos datos y solo se baja a
+# las subcarpetas, con un stat por carpeta en vez de uno por archivo.
+# Limitación conocida: reescribir un archivo "en su lugar" no cambia el
+# mtime de su carpeta, así que ese cambio de tamaño no se detecta.
+
+import os
+
+from cache_utils import PersistentJsonCache
+
+
+def _own_files(path):
+    """
+    Recorre UNA carpeta: devuelve (bytes de sus archivos, nombres de subcarpetas).
+    Los enlaces simbólicos se ignoran (no se siguen ni se cuentan).
+    """
+    total = 0
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    # En Windows este stat ya viene del listado (sin llamada extra)
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue # Permisos, archivo borrado a mitad del recorrido, etc.
+    return total, subdirs
+
+
+def scandir_size(path):
+    """ Tamaño total de una carpeta (sin caché), recorrido iterativo con os.scandir. """
+    total = 0
+    stack = [os.fspath(path)]
+    while stack:
+        current = stack.pop()
+        try:
+            own, subdirs = _own_files(current)
+        except OSError:
+            continue
+        total += own
+        stack.extend(os.path.join(current, name) for name in subdirs)
+    return total
+
+
+class DirSizeCache(PersistentJsonCache):
+    """ Caché persistente de tamaños de carpeta: "dev:inodo" -> [mtime_ns, bytes propios, subcarpetas]. """
+
+    def size_of(self, path):
+        """ Tamaño total de una carpeta usando (y actualizando) el caché. """
+        total = 0
+        stack = [os.fspath(path)]
+        while stack:
+            current = stack.pop()
+            try:
+                st = os.stat(current, follow_symlinks=False)
+            except OSError:
+                continue
+            key = f"{st.st_dev}:{st.st_ino}"
+            cached = self.get(key)
+            if cached and cached[0] == st.st_mtime_ns:
+                own, subdirs = cached[1], cached[2]
+            else:
+                try:
+                    own, subdirs = _own_files(current)
+                except OSError:
+                    continue
+                # Sin inodo real (algunos sistemas de archivos devuelven 0) no se guarda
+                if st.st_ino:
+                    self.put(key, [st.st_mtime_ns, own, subdirs])
+            total += own
+            stack.extend(os.path.join(current, name) for name in subdirs)
+        return total
@@ -0,0 +1,105 @@
+# --- hashing.py (La "Huella" de los archivos) ---
+# Llena la columna 'file_hash' del admin_log. Lee en bloques grandes,
+# reparte los archivos enormes en un pool de PROCESOS (cada uno hashea un
+# archivo completo con su propio núcleo) y los pequeños en hilos, y guarda
+# los resultados en un caché en disco con llave (ruta, tamaño, mtime) para
+# no volver a leer un archivo que no cambió.
+
+import hashlib
+import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from cache_utils import PersistentJsonCache
+
+HASH_ALGORITHM = "sha256"
+CHUNK_SIZE = 4 * 1024 * 1024            # 4 MB por lectura
+UMBRAL_PROCESOS = 512 * 1024 * 1024     # Archivos de 512 MB o más van al pool de procesos
+HILOS_HASH = 4
+PROCESOS_HASH = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def hash_file(path, algorithm=HASH_ALGORITHM, chunk_size=CHUNK_SIZE):
+    """
+    Hash de un archivo leyendo bloques grandes en un buffer reutilizable.
+    (Función de módulo para que el pool de procesos la pueda usar.)
+    """
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+class HashCache(PersistentJsonCache):
+    """ Caché persistente de hashes: ruta -> [tamaño, mtime_ns, hash]. """
+
+    def lookup(self, path, size, mtime_ns):
+        cached = self.get(str(path))
+        if cached and cached[0] == size and cached[1] == mtime_ns:
+            return cached[2]
+        return None
+
+    def remember(self, path, size, mtime_ns, digest):
+        self.put(str(path), [size, mtime_ns, digest])
+
+
+def hash_files(paths, cache=None):
+    """
+    Calcula el hash de varios archivos. Devuelve (hashes, stats):
+      - hashes: {ruta: hash} (las rutas que fallan no aparecen)
+      - stats:  costo de la etapa para el reporte de la ejecución
+    """
+    start = time.perf_counter()
+    stats = {'hash_seconds': 0.0, 'hashed_files': 0, 'hashed_bytes': 0, 'hash_cache_hits': 0}
+    hashes = {}
+    small, large = [], []
+
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue # Las carpetas no llevan hash
+        if cache is not None:
+            cached = cache.lookup(path, st.st_size, st.st_mtime_ns)
+            if cached:
+                hashes[path] = cached
+                stats['hash_cache_hits'] += 1
+                continue
+        (large if st.st_size >= UMBRAL_PROCESOS else small).append((path, st))
+
+    def collect(futures):
+        for (path, st), future in futures:
+            try:
+                digest = future.result()
+            except Exception:
+                continue # Sin permisos, archivo bloqueado, etc.: se queda sin hash
+            hashes[path] = digest
+            stats['hashed_files'] += 1
+            stats['hashed_bytes'] += st.st_size
+            if cache is not None:
+                cache.remember(path, st.st_size, st.st_mtime_ns, digest)
+
+    # hashlib suelta el GIL con bloques grandes, así que los hilos ya paralelizan
+    # los archivos normales; los enormes van a procesos para no acaparar los hilos.
+    process_pool = ProcessPoolExecutor(max_workers=min(PROCESOS_HASH, len(large))) if large else None
+    try:
+        large_futures = [(item, process_pool.submit(hash_file, item[0])) for item in large]
+        if small:
+            with ThreadPoolExecutor(max_workers=HILOS_HASH, thread_name_prefix="hash") as thread_pool:
+                collect([(item, thread_pool.submit(hash_file, item[0])) for item in small])
+        collect(large_futures)
+    finally:
+        if process_pool is not None:
+            process_pool.shutdown(wait=True)
+
+    stats['hash_seconds'] = round(time.perf_counter() - start, 3)
+    return hashes, stats
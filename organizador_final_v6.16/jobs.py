@@ -0,0 +1,217 @@
+# --- jobs.py (Las "Tareas en segundo plano") ---
+# Permite que /api/run-profile responda al instante con un id de tarea
+# mientras la organización corre en un hilo aparte. El HTML consulta el
+# progreso por /api/jobs/<id> o lo recibe en vivo por Server-Sent Events.
+# Una tarea puede pedir carpetas (origen, destino): si otra tarea las está
+# usando, espera EN COLA sin ocupar un hilo del pool y arranca cuando se
+# sueltan (ver scheduler.PathLocks).
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from scheduler import path_key, paths_overlap
+
+# Estados de una tarea
+ESTADO_EN_COLA = "en_cola"
+ESTADO_EJECUTANDO = "ejecutando"
+ESTADO_COMPLETADO = "completado"
+ESTADO_ERROR = "error"
+ESTADOS_FINALES = (ESTADO_COMPLETADO, ESTADO_ERROR)
+
+MENSAJE_ESPERA = "Esperando: otra tarea usa estas carpetas..."
+
+
+class NullProgress:
+    """ Progreso "mudo" para cuando organize_by_subject corre sin tarea. """
+
+    def set_progress(self, **campos):
+        pass
+
+    def add_progress(self, **incrementos):
+        pass
+
+
+NULL_PROGRESS = NullProgress()
+
+
+class Job:
+    """ Una ejecución de perfil en segundo plano y su progreso. """
+
+    def __init__(self, job_id, profile_id):
+        self.id = job_id
+        self.profile_id = profile_id
+        self.state = ESTADO_EN_COLA
+        self.report = None
+        self.message = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {
+            'files_scanned': 0,  # Elementos vistos en el origen
+            'files_total': 0,    # Elementos que hay que mover (se conoce al terminar el escaneo)
+            'files_done': 0,     # Elementos procesados (movidos o con error)
+            'files_moved': 0,    # Elementos movidos con éxito (incluye renombrados)
+            'bytes_moved': 0,
+            'current_file': "",
+        }
+        self._move_started = None
+        self._version = 0
+        self._cond = threading.Condition()
+
+    # --- Actualización (llamado desde el hilo de trabajo) ---
+
+    def set_progress(self, **campos):
+        with self._cond:
+            if campos.get('files_total') and self._move_started is None:
+                self._move_started = time.monotonic()
+            self.progress.update(campos)
+            self._touch()
+
+    def add_progress(self, **incrementos):
+        with self._cond:
+            for key, value in incrementos.items():
+                if key == 'current_file':
+                    self.progress[key] = value
+                else:
+                    self.progress[key] += value
+            self._touch()
+
+    def _set_state(self, state, **extra):
+        with self._cond:
+            self.state = state
+            for key, value in extra.items():
+                setattr(self, key, value)
+            self._touch()
+
+    def _touch(self):
+        self._version += 1
+        self._cond.notify_all()
+
+    # --- Lectura (llamado desde Flask) ---
+
+    def eta_seconds(self):
+        """ Segundos estimados para terminar, según el ritmo de la fase de movimiento. """
+        done = self.progress['files_done']
+        total = self.progress['files_total']
+        if self.state in ESTADOS_FINALES:
+            return 0
+        if not self._move_started or done == 0 or total == 0:
+            return None
+        elapsed = time.monotonic() - self._move_started
+        return round(elapsed / done * (total - done), 1)
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'job_id': self.id,
+                'profile_id': self.profile_id,
+                'state': self.state,
+                'progress': dict(self.progress, eta_seconds=self.eta_seconds()),
+                'report': self.report,
+                'message': self.message,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'version': self._version,
+            }
+
+    def wait_for_change(self, version, timeout):
+        """ Bloquea hasta que la versión cambie (o pase 'timeout') y devuelve la foto actual. """
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != version or self.state in ESTADOS_FINALES, timeout)
+        return self.snapshot()
+
+    @property
+    def finished(self):
+        return self.state in ESTADOS_FINALES
+
+
+class JobManager:
+    """
+    Guarda las tareas en memoria y las ejecuta en un pool pequeño de hilos.
+    Solo se permite una tarea activa por perfil. Con 'path_locks' las
+    tareas que piden carpetas ocupadas esperan en cola (en orden de
+    llegada entre las que se solapan) sin ocupar un hilo.
+    """
+
+    def __init__(self, max_workers=2, max_finished=50, path_locks=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._max_finished = max_finished
+        self._path_locks = path_locks
+        self._waiting = [] # (tarea, func, rutas canónicas) esperando sus carpetas
+        if path_locks is not None:
+            path_locks.add_listener(self._dispatch)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_job_for(self, profile_id):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.profile_id == profile_id and not job.finished:
+                    return job
+        return None
+
+    def submit(self, profile_id, func, paths=None):
+        """
+        Crea una tarea y ejecuta func(job) en segundo plano.
+        func devuelve el 'report'; si lanza una excepción la tarea queda en error.
+        'paths': carpetas que la tarea usa; func corre con ellas bloqueadas.
+        Devuelve None si ese perfil ya tiene una tarea activa.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.profile_id == profile_id and not job.finished:
+                    return None
+            job_id = f"job_{int(time.time())}_{next(self._ids)}"
+            job = Job(job_id, profile_id)
+            self._jobs[job_id] = job
+            self._prune()
+            if not paths or self._path_locks is None:
+                self._executor.submit(self._run, job, func, None)
+                return job
+            self._waiting.append((job, func, [path_key(path) for path in paths]))
+        self._dispatch()
+        return job
+
+    def _dispatch(self):
+        """ Pasa al pool las tareas en cola cuyas carpetas ya están libres. """
+        with self._lock:
+            still_waiting = []
+            ahead = [] # Carpetas de las que siguen esperando: las de atrás no se les adelantan
+            for job, func, keys in self._waiting:
+                held = None
+                if not any(paths_overlap(key, other) for other in ahead for key in keys):
+                    held = self._path_locks.try_acquire(keys)
+                if held is None:
+                    if job.progress['current_file'] != MENSAJE_ESPERA:
+                        job.set_progress(current_file=MENSAJE_ESPERA)
+                    still_waiting.append((job, func, keys))
+                    ahead.extend(keys)
+                    continue
+                self._executor.submit(self._run, job, func, held)
+            self._waiting = still_waiting
+
+    def _run(self, job, func, held=None):
+        job._set_state(ESTADO_EJECUTANDO, started_at=datetime.now().isoformat())
+        try:
+            report = func(job)
+            job._set_state(ESTADO_COMPLETADO, report=report, finished_at=datetime.now().isoformat())
+        except Exception as e:
+            job._set_state(ESTADO_ERROR, message=str(e), finished_at=datetime.now().isoformat())
+        finally:
+            if held is not None:
+                self._path_locks.release(held) # Despierta a las que esperaban estas carpetas
+
+    def _prune(self):
+        """ Olvida las tareas terminadas más viejas (llamar con el lock tomado). """
+        finished = [j for j in self._jobs.values() if j.finished]
+        for job in finished[:max(0, len(finished) - self._max_finished)]:
+            del self._jobs[job.id]
@@ -0,0 +1,378 @@
+# --- journal.py (La "Bitácora" de movimientos) ---
+# Diario de cada ejecución (write-ahead), en JSON Lines:
+#   inicio      -> datos del plan (perfil, origen, destino, opciones)
+#   plan        -> cada movimiento planeado, ANTES de mover nada (con fsync)
+#   reservado   -> el nombre que claim() apartó en el destino, antes de mover
+#   hecho       -> cada movimiento terminado (status, ruta final, tamaño)
+#   registrado  -> las filas ya están en admin_log.csv
+#   deshecho    -> un movimiento revertido por "Deshacer"
+# Los "hecho" se acumulan y se sincronizan (fsync) en lotes: cada
+# FSYNC_CADA_REGISTROS registros o FSYNC_CADA_SEGUNDOS segundos. Si el
+# proceso muere a mitad de camino, el diario sin "registrado" dice qué
+# faltaba: al arrancar se reanuda sin volver a recorrer el origen (lo que
+# no alcanzó a sincronizarse se confirma mirando el disco).
+# Mientras una ejecución escribe su diario tiene tomado un candado
+# exclusivo (run_....jsonl.lock, ver log_writer.FileLock): otra copia de la
+# app que arranca en ese momento no reanuda ni deshace un diario vivo.
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from log_writer import FileLock
+
+FSYNC_CADA_REGISTROS = 256
+FSYNC_CADA_SEGUNDOS = 0.5
+MAX_DIARIOS = 200 # Ejecuciones terminadas cuyos diarios se guardan (para poder deshacer)
+BYTES_COLA = 8192 # Bloque que se lee desde el final para saber si un diario terminó
+
+TIPO_INICIO = "inicio"
+TIPO_PLAN = "plan"
+TIPO_RESERVADO = "reservado"
+TIPO_HECHO = "hecho"
+TIPO_REGISTRADO = "registrado"
+TIPO_DESHECHO = "deshecho"
+
+
+class JournalBusyError(OSError):
+    """ Otro proceso (u otra tarea) tiene abierto el diario. """
+
+
+def _lock_path(path):
+    return path.with_name(path.name + ".lock")
+
+
+class NullJournal:
+    """ Diario "mudo" (si no se pudo crear el archivo, la ejecución sigue sin él). """
+
+    run_id = None
+
+    def record_claimed(self, index, path):
+        pass
+
+    def record_done(self, index, status, final, size, timestamp, file_hash=""):
+        pass
+
+    def record_undone(self, index, status):
+        pass
+
+    def mark_logged(self):
+        pass
+
+    def sync(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_JOURNAL = NullJournal()
+
+
+class RunJournal:
+    """
+    Escritor del diario de UNA ejecución (seguro entre hilos). Tiene el
+    candado del diario desde que se crea hasta close(); lanza
+    JournalBusyError si ya lo tiene alguien más.
+    """
+
+    def __init__(self, path, run_id):
+        self.path = Path(path)
+        self.run_id = run_id
+        self._file_lock = FileLock(_lock_path(self.path), timeout=0)
+        try:
+            self._file_lock.acquire()
+        except TimeoutError:
+            raise JournalBusyError(f"El diario {run_id} está en uso por otra ejecución.") from None
+        try:
+            self._file = open(self.path, mode='a', encoding='utf-8', newline='\n')
+        except OSError:
+            self._file_lock.release()
+            raise
+        self._buffer = []
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _write(self, record, sync=False):
+        with self._lock:
+            self._buffer.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            if (sync or len(self._buffer) >= FSYNC_CADA_REGISTROS
+                    or time.monotonic() - self._last_sync >= FSYNC_CADA_SEGUNDOS):
+                self._sync()
+
+    def _sync(self):
+        """ Llamar con el lock tomado. """
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def begin(self, header, entries):
+        """ Escribe el encabezado y TODOS los movimientos planeados, con un solo fsync. """
+        self._write(dict(header, type=TIPO_INICIO, run_id=self.run_id))
+        for index, (src, dst, subject) in enumerate(entries):
+            self._write({'type': TIPO_PLAN, 'index': index, 'src': src, 'dst': dst, 'subject': subject})
+        self.sync()
+
+    def record_claimed(self, index, path):
+        """ Ruta que claim() apartó para el movimiento 'index' (puede no ser la planeada). """
+        self._write({'type': TIPO_RESERVADO, 'index': index, 'path': path})
+
+    def record_done(self, index, status, final, size, timestamp, file_hash=""):
+        self._write({'type': TIPO_HECHO, 'index': index, 'status': status, 'final': final,
+                     'size': size if isinstance(size, (int, float)) else None, 'ts': timestamp,
+                     'hash': file_hash})
+
+    def record_undone(self, index, status):
+        self._write({'type': TIPO_DESHECHO, 'index': index, 'status': status})
+
+    def mark_logged(self):
+        """ Las filas ya están en admin_log.csv: el diario queda cerrado. """
+        self._write({'type': TIPO_REGISTRADO, 'ts': datetime.now().isoformat()}, sync=True)
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._sync()
+                self._file.close()
+            finally:
+                self._file_lock.release()
+
+
+class JournalRun:
+    """ Lo que dice un diario ya escrito (para reanudar o deshacer). """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.header = {}
+        self.planned = {}  # índice -> registro "plan"
+        self.claimed = {}  # índice -> ruta apartada por claim()
+        self.done = {}     # índice -> registro "hecho"
+        self.undone = {}   # índice -> registro "deshecho"
+        self.logged = False
+        with open(self.path, mode='r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break # Última línea cortada por el corte: lo anterior sí vale
+                kind = record.get('type')
+                if kind == TIPO_INICIO:
+                    self.header = record
+                elif kind == TIPO_PLAN:
+                    self.planned[record['index']] = record
+                elif kind == TIPO_RESERVADO:
+                    self.claimed[record['index']] = record['path']
+                elif kind == TIPO_HECHO:
+                    self.done[record['index']] = record
+                elif kind == TIPO_DESHECHO:
+                    self.undone[record['index']] = record
+                elif kind == TIPO_REGISTRADO:
+                    self.logged = True
+
+    @property
+    def run_id(self):
+        return self.header.get('run_id') or self.path.stem
+
+    def summary(self):
+        moved = sum(1 for record in self.done.values() if record['status'] in ("MOVIDO", "RENOMBRADO"))
+        return {
+            'run_id': self.run_id,
+            'profile_id': self.header.get('profile_id'),
+            'created_at': self.header.get('created_at'),
+            'planned': len(self.planned),
+            'done': len(self.done),
+            'moved': moved,
+            'undone': len(self.undone),
+            'finished': self.logged,
+        }
+
+
+def _truncate_torn_line(path):
+    """ Corta lo escrito después del último salto de línea (un registro a medias). """
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            step = min(4096, end)
+            f.seek(end - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                end = end - step + newline + 1
+                break
+            end -= step
+        if end != size:
+            f.truncate(end)
+
+
+def _read_header(path):
+    """ Encabezado ("inicio") de un diario, leyendo solo su primera línea. """
+    with open(path, mode='r', encoding='utf-8') as f:
+        try:
+            record = json.loads(f.readline())
+        except ValueError:
+            return {}
+    return record if record.get('type') == TIPO_INICIO else {}
+
+
+def _is_logged(path):
+    """
+    True si el diario ya tiene su "registrado", leyendo desde el final:
+    después de él solo pueden venir "deshecho", así que casi siempre basta
+    con el último bloque del archivo.
+    """
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        pending = b''
+        while end > 0:
+            step = min(BYTES_COLA, end)
+            end -= step
+            f.seek(end)
+            lines = (f.read(step) + pending).split(b'\n')
+            pending = lines.pop(0) if end > 0 else b'' # Puede empezar a mitad de una línea
+            for line in reversed(lines):
+                if not line.strip():
+                    continue
+                try:
+                    kind = json.loads(line).get('type')
+                except ValueError:
+                    continue # Última línea cortada
+                if kind == TIPO_REGISTRADO:
+                    return True
+                if kind != TIPO_DESHECHO:
+                    return False
+    return False
+
+
+class JournalStore:
+    """ Carpeta con un diario (.jsonl) por ejecución. """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self._ids = 0
+        self._lock = threading.Lock()
+
+    def _new_id(self):
+        with self._lock:
+            self._ids += 1
+            return f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{self._ids}"
+
+    def path_for(self, run_id):
+        return self.folder / f"{run_id}.jsonl"
+
+    def start(self, header, entries):
+        """ Crea el diario de una ejecución nueva y escribe su plan (write-ahead). """
+        self.folder.mkdir(parents=True, exist_ok=True)
+        run_id = self._new_id()
+        journal = RunJournal(self.path_for(run_id), run_id)
+        journal.begin(dict(header, created_at=datetime.now().isoformat()), entries)
+        return journal
+
+    def reopen(self, run_id):
+        """
+        Sigue escribiendo en el diario de una ejecución ya empezada (sin su
+        última línea cortada). Lanza JournalBusyError si otro lo tiene abierto.
+        """
+        path = self.path_for(run_id)
+        journal = RunJournal(path, run_id) # Primero el candado: no cortar lo que otro está escribiendo
+        try:
+            _truncate_torn_line(path)
+        except OSError:
+            journal.close()
+            raise
+        return journal
+
+    def in_use(self, run_id):
+        """ True si alguien (este u otro proceso) tiene abierto el diario ahora mismo. """
+        lock = FileLock(_lock_path(self.path_for(run_id)), timeout=0)
+        try:
+            lock.acquire()
+        except TimeoutError:
+            return True
+        except OSError:
+            return False
+        lock.release()
+        return False
+
+    def load(self, run_id):
+        """ Lee un diario, o None si no existe. """
+        if not run_id or os.sep in run_id or '/' in run_id:
+            return None
+        try:
+            return JournalRun(self.path_for(run_id))
+        except OSError:
+            return None
+
+    def _paths(self):
+        """ Diarios de la carpeta, del más viejo al más nuevo (por mtime). """
+        try:
+            return sorted(self.folder.glob("run_*.jsonl"), key=lambda path: path.stat().st_mtime)
+        except OSError:
+            return []
+
+    def interrupted(self):
+        """
+        Ejecuciones que no llegaron a escribir su log (hay que reanudarlas).
+        Solo se leen enteros los diarios sin "registrado" al final.
+        """
+        runs = []
+        for path in self._paths():
+            try:
+                if _is_logged(path):
+                    continue
+                run = JournalRun(path)
+            except OSError:
+                continue
+            if run.header:
+                runs.append(run)
+        return runs
+
+    def recent(self, limit=20):
+        """ Resumen de las 'limit' ejecuciones más nuevas (solo se leen esos diarios). """
+        summaries = []
+        for path in reversed(self._paths()[-limit:]):
+            try:
+                summaries.append(JournalRun(path).summary())
+            except OSError:
+                continue
+        return summaries
+
+    def prune(self, keep=MAX_DIARIOS):
+        """
+        Borra los diarios de las ejecuciones terminadas más viejas. Los
+        bloques de un recorrido recursivo (mismo 'group' en el encabezado)
+        son una sola ejecución: se guardan o se borran todos juntos.
+        """
+        groups = {}      # grupo -> diarios, del más viejo al más nuevo
+        newest = {}      # grupo -> posición de su diario más nuevo
+        unfinished = set()
+        for position, path in enumerate(self._paths()):
+            try:
+                group = _read_header(path).get('group') or path.stem
+                logged = _is_logged(path)
+            except OSError:
+                continue
+            groups.setdefault(group, []).append(path)
+            newest[group] = position
+            if not logged:
+                unfinished.add(group)
+        finished = [group for group in sorted(groups, key=newest.get) if group not in unfinished]
+        for group in finished[:max(0, len(finished) - keep)]:
+            if any(self.in_use(path.stem) for path in groups[group]):
+                continue # Alguien lo está deshaciendo
+            for path in groups[group]:
+                for stale in (path, _lock_path(path)):
+                    try:
+                        stale.unlink()
+                    except OSError:
+                        pass
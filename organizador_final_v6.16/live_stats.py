@@ -0,0 +1,274 @@
+# --- live_stats.py (El "Marcador") ---
+# Contadores en vivo del admin_log.csv para /api/stats, sin pandas.
+# Se actualizan con las filas que escribe log_to_admin_csv y se guardan en
+# una "foto" JSON pequeña junto al log. Al arrancar se carga la foto y
+# solo se leen las filas agregadas después; si el log se truncó o se
+# reescribió (la foto ya no coincide con sus bytes), se recalcula todo.
+# La foto no se reescribe en cada escritura del log: cada
+# GUARDAR_CADA_FILAS filas o GUARDAR_CADA_SEGUNDOS segundos y al cerrar
+# (flush). Una foto atrasada solo hace leer unas filas más al arrancar.
+# Las filas con fecha ilegible no cuentan, igual que en el análisis
+# completo (pandas las descarta como NaT).
+
+import csv
+import io
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+SNAPSHOT_VERSION = 4 # 4: las filas con fecha ilegible ya no cuentan
+STATUS_MOVIDOS = ('MOVIDO', 'RENOMBRADO')
+BYTES_HUELLA = 4096 # Bytes antes del offset que se usan para reconocer el log
+BYTES_POR_LECTURA = 1 << 20
+GUARDAR_CADA_FILAS = 500
+GUARDAR_CADA_SEGUNDOS = 5.0
+
+# "2025-11-01T10:15:01.123Z": fracción de cualquier largo y zona opcional ('Z' o +hh:mm)
+_FECHA_ISO = re.compile(r'^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2})?)(?:[.,](\d+))?(Z|[+-]\d{2}:?\d{2})?$', re.IGNORECASE)
+
+
+def _empty_counters():
+    return {
+        'total': 0,
+        'bad_timestamp': 0, # Filas descartadas por fecha ilegible
+        'bytes': 0,
+        'bytes_moved': 0,
+        'first_timestamp': None,
+        'last_timestamp': None,
+        'by_status': {},
+        'by_subject': {},
+        'by_user': {},
+        'by_hour': {},
+        'by_day': {},
+    }
+
+
+def _bump(counts, key, amount=1):
+    counts[key] = counts.get(key, 0) + amount
+
+
+def _parse_size(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_timestamp(text):
+    """
+    Fecha ISO 8601 del log -> datetime, o None si no se entiende. Acepta lo
+    que fromisoformat rechaza en Python 3.10: 'Z' final y fracciones que no
+    son de 6 dígitos ("10:15:01.123Z").
+    """
+    text = str(text or '').strip()
+    found = _FECHA_ISO.match(text)
+    if not found:
+        return None
+    base, fraction, zone = found.groups()
+    if fraction:
+        base += '.' + fraction[:6].ljust(6, '0')
+    if zone:
+        zone = '+00:00' if zone.upper() == 'Z' else zone
+        base += zone if ':' in zone else zone[:3] + ':' + zone[3:]
+    try:
+        return datetime.fromisoformat(base)
+    except ValueError:
+        return None # Números fuera de rango (mes 13, hora 25...)
+
+
+class LiveStats:
+    """ Contadores del log de admin, al día y con foto en disco. """
+
+    def __init__(self, log_path, snapshot_path):
+        self.log_path = Path(log_path)
+        self.snapshot_path = Path(snapshot_path)
+        self._lock = threading.Lock()
+        self._counters = _empty_counters()
+        self._offset = 0 # Bytes del log ya contados
+        self._header = None
+        self._unsaved = 0 # Filas contadas desde la última foto
+        self._last_save = time.monotonic()
+
+    # --- Contar filas ---
+
+    def _add_row(self, row):
+        """
+        Llamar con el lock tomado. Los campos vacíos no forman categoría; una
+        fila con fecha ilegible no cuenta (el análisis completo la descarta).
+        """
+        timestamp = str(row.get('log_timestamp') or '')
+        moment = parse_timestamp(timestamp)
+        c = self._counters
+        if moment is None:
+            c['bad_timestamp'] += 1
+            return
+        size = _parse_size(row.get('file_size_bytes'))
+        status = row.get('status')
+        c['total'] += 1
+        c['bytes'] += size
+        if status in STATUS_MOVIDOS:
+            c['bytes_moved'] += size
+        if status:
+            _bump(c['by_status'], status)
+        if row.get('subject_assigned'):
+            _bump(c['by_subject'], row['subject_assigned'])
+        if row.get('username'):
+            _bump(c['by_user'], row['username'])
+        _bump(c['by_hour'], f"{moment.hour:02d}")
+        _bump(c['by_day'], moment.date().isoformat())
+        if c['first_timestamp'] is None or timestamp < c['first_timestamp']:
+            c['first_timestamp'] = timestamp
+        if c['last_timestamp'] is None or timestamp > c['last_timestamp']:
+            c['last_timestamp'] = timestamp
+
+    def record(self, rows, start_offset, end_offset):
+        """
+        Suma las filas que se acaban de escribir en el log entre los bytes
+        'start_offset' y 'end_offset'. Si antes alguien más escribió en el
+        log (otro proceso), primero se leen esas filas del archivo.
+        """
+        with self._lock:
+            if start_offset != self._offset:
+                self._read_tail()
+            if start_offset != self._offset:
+                return # Lo que faltaba ya incluyó estas filas (o el log cambió)
+            for row in rows:
+                self._add_row(row)
+            self._offset = end_offset
+            self._unsaved += len(rows)
+            if (self._unsaved >= GUARDAR_CADA_FILAS
+                    or time.monotonic() - self._last_save >= GUARDAR_CADA_SEGUNDOS):
+                self._save()
+
+    def flush(self):
+        """ Guarda la foto si quedaron filas sin guardar (al cerrar la app). """
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    # --- Leer el log ---
+
+    def _fingerprint(self, f, offset):
+        """ CRC32 de los últimos bytes antes de 'offset' (reconoce el mismo log). """
+        start = max(0, offset - BYTES_HUELLA)
+        f.seek(start)
+        return zlib.crc32(f.read(offset - start))
+
+    def _read_tail(self):
+        """ Cuenta las filas completas desde self._offset. Llamar con el lock tomado. """
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size < self._offset:
+                    # El log se truncó: empezar de cero
+                    self._counters = _empty_counters()
+                    self._offset = 0
+                    self._header = None
+                f.seek(self._offset)
+                pending = b''
+                while True:
+                    chunk = f.read(BYTES_POR_LECTURA)
+                    if not chunk:
+                        break
+                    data = pending + chunk
+                    cut = data.rfind(b'\n') + 1 # Solo líneas completas
+                    pending = data[cut:]
+                    self._consume(data[:cut])
+        except FileNotFoundError:
+            self._counters = _empty_counters()
+            self._offset = 0
+            self._header = None
+
+    def _consume(self, data):
+        if not data:
+            return
+        text = data.decode('utf-8', errors='replace')
+        if self._header is None:
+            header_line, _, text = text.partition('\n')
+            self._header = next(csv.reader([header_line]), [])
+        for row in csv.DictReader(io.StringIO(text, newline=''), fieldnames=self._header):
+            self._add_row(row)
+            self._unsaved += 1
+        self._offset += len(data)
+
+    # --- Foto en disco ---
+
+    def load(self):
+        """
+        Carga la foto (si sigue coincidiendo con el log) y cuenta solo las
+        filas nuevas. Devuelve {'from_snapshot', 'rows_new', 'rebuilt'}.
+        """
+        with self._lock:
+            from_snapshot = self._load_snapshot()
+            total_before = self._counters['total']
+            self._read_tail()
+            rows_new = self._counters['total'] - (total_before if from_snapshot else 0)
+            self._save()
+        return {'from_snapshot': from_snapshot, 'rows_new': rows_new, 'rebuilt': not from_snapshot}
+
+    def _load_snapshot(self):
+        self._counters = _empty_counters()
+        self._offset = 0
+        self._header = None
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != SNAPSHOT_VERSION:
+                return False
+            offset = int(data['offset'])
+            with open(self.log_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < offset or self._fingerprint(f, offset) != data['fingerprint']:
+                    return False # El log se truncó o se reescribió
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        counters = _empty_counters()
+        counters.update(data['counters'])
+        self._counters = counters
+        self._offset = offset
+        self._header = data.get('header')
+        return True
+
+    def _save(self):
+        """ Guardado atómico de la foto. Llamar con el lock tomado. """
+        try:
+            with open(self.log_path, 'rb') as f:
+                fingerprint = self._fingerprint(f, self._offset)
+        except OSError:
+            return
+        data = {
+            'version': SNAPSHOT_VERSION,
+            'offset': self._offset,
+            'fingerprint': fingerprint,
+            'header': self._header,
+            'counters': self._counters,
+        }
+        tmp_path = self.snapshot_path.with_name(f".{self.snapshot_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            pass # Sin foto el próximo arranque simplemente relee el log
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+
+    # --- Lectura ---
+
+    def snapshot(self):
+        """ Copia de los contadores más los KPIs derivados (para /api/stats). """
+        with self._lock:
+            self._read_tail() # Filas que otro proceso haya agregado
+            c = json.loads(json.dumps(self._counters))
+        by_status = c['by_status']
+        c['moved'] = sum(by_status.get(status, 0) for status in STATUS_MOVIDOS)
+        c['errors'] = by_status.get('ERROR', 0)
+        c['users'] = len(c['by_user'])
+        c['success_rate'] = round(c['moved'] / c['total'], 4) if c['total'] else None
+        return c
@@ -0,0 +1,335 @@
+# --- log_cache.py (La "Memoria" del analizador) ---
+# El admin_log.csv solo crece por el final, así que no hace falta volver a
+# leerlo completo en cada arranque. Aquí se guarda una copia YA TIPADA
+# (fechas como datetime, tamaños como número) en formato binario por
+# columnas (.npz de numpy, una columna por arreglo), junto con:
+#   - el byte hasta donde se leyó el CSV (offset)
+#   - la longitud y el CRC32 de la última línea leída
+# En el siguiente arranque solo se lee lo que se agregó después del offset.
+# Si la última línea ya no coincide (el CSV se truncó o se reescribió),
+# o cambió la cabecera, el caché se reconstruye desde cero.
+#
+# Cada lectura incremental agrega un "segmento" .npz nuevo (no se reescribe
+# lo anterior). Cuando hay demasiados segmentos se compactan en uno.
+
+import csv
+import io
+import json
+import os
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from pandas.tseries.api import guess_datetime_format
+
+CACHE_VERSION = 1
+MAX_SEGMENTOS = 16
+COLUMNA_FECHA = 'log_timestamp'
+COLUMNA_TAMANO = 'file_size_bytes'
+# Columnas con pocos valores distintos: se guardan como 'category' (códigos
+# enteros + diccionario), así los conteos trabajan sobre enteros.
+COLUMNAS_CATEGORICAS = ('username', 'id_perfil', 'subject_assigned', 'status')
+
+
+class LogColumnsError(ValueError):
+    """ El CSV no tiene las columnas esperadas. """
+
+    def __init__(self, missing):
+        super().__init__(f"Faltan columnas: {missing}")
+        self.missing = missing
+
+
+def guess_date_format(raw_dates):
+    """
+    El formato que pandas deduce de la PRIMERA fecha del log. Se guarda en el
+    caché para leer las filas nuevas con el mismo formato que usaría una
+    lectura completa (si no, un trozo suelto podría deducir otro formato).
+    """
+    first = raw_dates.dropna()
+    if first.empty:
+        return None
+    return guess_datetime_format(first.iloc[0])
+
+
+def type_log_frame(df_log, date_format=None):
+    """
+    Convierte las columnas crudas (texto) a sus tipos: fechas, tamaños y
+    categorías. Las filas sin fecha válida se descartan (igual que siempre).
+    """
+    df_log[COLUMNA_FECHA] = pd.to_datetime(df_log[COLUMNA_FECHA], format=date_format, errors='coerce')
+    df_log = df_log.dropna(subset=[COLUMNA_FECHA])
+    tipos = {COLUMNA_TAMANO: pd.to_numeric(df_log[COLUMNA_TAMANO], errors='coerce').fillna(0)}
+    for col in COLUMNAS_CATEGORICAS:
+        if col in df_log.columns:
+            tipos[col] = df_log[col].astype('category')
+    df_log = df_log.assign(**tipos)
+    return df_log.reset_index(drop=True)
+
+
+def concat_log_frames(frames):
+    """ Une pedazos del log; las categorías se unen (pd.concat las volvería texto). """
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+    data = {}
+    for col in frames[0].columns:
+        if col in COLUMNAS_CATEGORICAS:
+            data[col] = union_categoricals([frame[col] for frame in frames])
+        else:
+            data[col] = pd.concat([frame[col] for frame in frames], ignore_index=True)
+    return pd.DataFrame(data, columns=frames[0].columns)
+
+
+def _parse_rows(data, columns):
+    """ Lee filas CSV (sin cabecera) como texto. """
+    if not data.strip():
+        return pd.DataFrame({col: pd.Series(dtype=str) for col in columns})
+    return pd.read_csv(
+        io.BytesIO(data),
+        header=None,
+        names=columns,
+        dtype=str,
+        on_bad_lines='skip', # Ignorar líneas rotas
+        encoding='utf-8'
+    )
+
+
+def _line_checksum(line):
+    return zlib.crc32(line) & 0xFFFFFFFF
+
+
+def _timezone_of(series):
+    tz = getattr(series.dt, 'tz', None)
+    return str(tz) if tz is not None else None
+
+
+# --- Codificación por columnas ---
+
+def _encode_strings(series):
+    """ Diccionario de valores únicos + códigos (NaN = -1). """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    blob = "\x00".join(uniques.astype(str)).encode('utf-8')
+    return codes.astype(np.int32), np.frombuffer(blob, dtype=np.uint8), np.array([len(uniques)], dtype=np.int64)
+
+
+def _decode_strings(codes, blob, count, categorical=False):
+    uniques = bytes(blob).decode('utf-8').split("\x00") if int(count[0]) else []
+    if categorical:
+        return pd.Categorical.from_codes(codes, categories=uniques)
+    # El NaN va al final: el código -1 lo toma directamente
+    values = np.empty(len(uniques) + 1, dtype=object)
+    values[:-1] = uniques
+    values[-1] = np.nan
+    return values.take(codes)
+
+
+def _encode_frame(df_log):
+    arrays = {}
+    for col in df_log.columns:
+        if col == COLUMNA_FECHA:
+            ts = df_log[col]
+            if _timezone_of(ts) is not None:
+                ts = ts.dt.tz_convert(None) # Se guarda en UTC sin zona
+            arrays['ts'] = ts.to_numpy()
+        elif col == COLUMNA_TAMANO:
+            arrays['size'] = df_log[col].to_numpy()
+        else:
+            codes, blob, count = _encode_strings(df_log[col])
+            arrays[f'{col}__codes'] = codes
+            arrays[f'{col}__dict'] = blob
+            arrays[f'{col}__n'] = count
+    return arrays
+
+
+def _decode_frame(arrays, columns, timezone):
+    data = {}
+    for col in columns:
+        if col == COLUMNA_FECHA:
+            ts = pd.Series(arrays['ts'])
+            data[col] = ts.dt.tz_localize('UTC').dt.tz_convert(timezone) if timezone else ts
+        elif col == COLUMNA_TAMANO:
+            data[col] = arrays['size']
+        else:
+            data[col] = _decode_strings(
+                arrays[f'{col}__codes'], arrays[f'{col}__dict'], arrays[f'{col}__n'],
+                categorical=col in COLUMNAS_CATEGORICAS
+            )
+    return pd.DataFrame(data, columns=columns)
+
+
+class LogIngestCache:
+    """ Caché incremental y tipado de un admin_log.csv. """
+
+    def __init__(self, csv_path, cache_dir, required_columns=()):
+        self.csv_path = Path(csv_path)
+        self.cache_dir = Path(cache_dir)
+        self.meta_path = self.cache_dir / "meta.json"
+        self.required_columns = list(required_columns)
+
+    # --- Metadatos ---
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != CACHE_VERSION:
+            return None
+        return meta
+
+    def _write_meta(self, meta):
+        tmp_path = self.meta_path.with_name(f".{self.meta_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path) # Atómico: el meta siempre apunta a segmentos completos
+
+    def _write_segment(self, df_log, number):
+        name = f"segmento_{number:06d}.npz"
+        tmp_path = self.cache_dir / f".{name}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **_encode_frame(df_log))
+        os.replace(tmp_path, self.cache_dir / name)
+        return name
+
+    def _load_segments(self, meta):
+        frames = []
+        for name in meta['segments']:
+            with np.load(self.cache_dir / name, allow_pickle=False) as arrays:
+                frames.append(_decode_frame(arrays, meta['columns'], meta['timezone']))
+        if not frames:
+            return None
+        return concat_log_frames(frames)
+
+    def _clear_segments(self, keep=()):
+        for path in self.cache_dir.glob("segmento_*.npz"):
+            if path.name not in keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    # --- Lectura del CSV ---
+
+    def _read_header(self, f):
+        header = f.readline()
+        columns = next(csv.reader([header.decode('utf-8-sig')]), [])
+        missing = [col for col in self.required_columns if col not in columns]
+        if missing:
+            raise LogColumnsError(missing)
+        return header, columns
+
+    def _read_tail(self, f, offset, size):
+        """ Bytes nuevos hasta la última línea COMPLETA (una línea a medio escribir espera a la próxima). """
+        f.seek(offset)
+        data = f.read(size - offset)
+        end = data.rfind(b"\n") + 1
+        return data[:end]
+
+    def _is_valid(self, meta, f, header, size):
+        if meta is None or meta['header_crc'] != _line_checksum(header):
+            return False
+        offset, last_len = meta['offset'], meta['last_line_len']
+        if size < offset:
+            return False # El CSV se truncó
+        f.seek(offset - last_len)
+        return _line_checksum(f.read(last_len)) == meta['last_line_crc']
+
+    def _persist(self, meta, df_log, fresh):
+        """ Guarda el segmento nuevo (o compacta) y luego el meta. """
+        if len(meta['segments']) >= MAX_SEGMENTOS:
+            # Compactar: un solo segmento con todo
+            meta['segments'] = [self._write_segment(df_log, meta['next_segment'])]
+        elif len(fresh):
+            meta['segments'].append(self._write_segment(fresh, meta['next_segment']))
+        meta['next_segment'] += 1
+        self._write_meta(meta)
+        self._clear_segments(keep=meta['segments'])
+
+    def _try_persist(self, meta, df_log, fresh):
+        """ Si no se puede escribir el caché (carpeta de solo lectura, disco lleno) el análisis sigue igual. """
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._persist(meta, df_log, fresh)
+            return True
+        except OSError:
+            return False
+
+    def load(self, rebuild=False):
+        """
+        Devuelve (df_log, info). info dice cuántas filas venían del caché,
+        cuántas se leyeron nuevas, si hubo que reconstruir y si se pudo guardar.
+        """
+        meta = None if rebuild else self._read_meta()
+        info = {'rows_cached': 0, 'rows_new': 0, 'rows_raw': 0, 'rebuilt': False, 'saved': True}
+
+        with open(self.csv_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            header, columns = self._read_header(f)
+
+            cached = None
+            if self._is_valid(meta, f, header, size) and meta['columns'] == columns:
+                try:
+                    cached = self._load_segments(meta)
+                except (OSError, ValueError, KeyError):
+                    meta = None # Segmento dañado: reconstruir
+            else:
+                meta = None
+
+            if meta is None:
+                info['rebuilt'] = True
+                meta = {
+                    'version': CACHE_VERSION,
+                    'columns': columns,
+                    'header_crc': _line_checksum(header),
+                    'offset': len(header),
+                    'last_line_len': len(header),
+                    'last_line_crc': _line_checksum(header),
+                    'rows_raw': 0,
+                    'timezone': None,
+                    'date_format': None,
+                    'segments': [],
+                    'next_segment': 0,
+                }
+
+            tail = self._read_tail(f, meta['offset'], size)
+
+        info['rows_cached'] = 0 if cached is None else len(cached)
+        if not tail:
+            info['rows_raw'] = meta['rows_raw']
+            if cached is None:
+                cached = type_log_frame(_parse_rows(b"", columns))
+            if info['rebuilt']:
+                info['saved'] = self._try_persist(meta, cached, cached)
+            return cached, info
+
+        raw = _parse_rows(tail, columns)
+        if meta['rows_raw'] == 0:
+            meta['date_format'] = guess_date_format(raw[COLUMNA_FECHA])
+        fresh = type_log_frame(raw, meta['date_format'])
+        timezone = _timezone_of(fresh[COLUMNA_FECHA])
+
+        if cached is not None and len(cached) and len(fresh) and timezone != meta['timezone']:
+            # Las filas nuevas traen otro formato de fecha: leer todo de nuevo
+            # para que el resultado sea el mismo que una lectura completa.
+            return self.load(rebuild=True)
+
+        last_line = tail[tail.rfind(b"\n", 0, len(tail) - 1) + 1:]
+        meta['offset'] += len(tail)
+        meta['last_line_len'] = len(last_line)
+        meta['last_line_crc'] = _line_checksum(last_line)
+        meta['rows_raw'] += len(raw)
+        if len(fresh):
+            meta['timezone'] = timezone if (cached is None or not len(cached)) else meta['timezone']
+
+        df_log = fresh if cached is None or not len(cached) else concat_log_frames([cached, fresh])
+
+        info['saved'] = self._try_persist(meta, df_log, fresh)
+        info['rows_new'] = len(fresh)
+        info['rows_raw'] = meta['rows_raw']
+        return df_log, info
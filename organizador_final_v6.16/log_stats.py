@@ -0,0 +1,304 @@
+# --- log_stats.py (Las "Cuentas" del analizador) ---
+# Los 10 análisis del analizador son conteos y sumas, así que se pueden
+# calcular por partes: cada bloque del CSV produce un resumen parcial
+# (LogAggregates) y los parciales se suman. La memoria depende del tamaño
+# del bloque y de cuántos valores distintos hay (usuarios, materias,
+# extensiones, días), NO de cuántas filas tiene el log.
+#
+# El modo en memoria usa exactamente el mismo resumen (un solo "bloque"
+# con todo el DataFrame), así que los dos modos imprimen lo mismo.
+# Los diccionarios guardan el orden de primera aparición y las series se
+# ordenan con sort estable, igual que value_counts() de pandas.
+
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from log_cache import COLUMNA_FECHA, COLUMNA_TAMANO, LogColumnsError, guess_date_format, type_log_frame
+from normalizer import merge_variants
+
+FILAS_POR_BLOQUE = 200_000
+SIN_EXTENSION = ("Sin Extensión", "N/A (No es path)", "N/A (Error)")
+MATERIAS_IGNORADAS = ('N/A', 'Otros', '')
+
+
+# Extensión = desde el último punto del último componente de la ruta
+# (el punto no puede ser el primer carácter del nombre), igual que Path.suffix.
+if os.name == 'nt':
+    _SEPARADORES = ('\\', '/')
+    _PATRON_EXTENSION = r'^.*[^\\/:](\.[^.\\/]+)$'
+else:
+    _SEPARADORES = ('/',)
+    _PATRON_EXTENSION = r'^.*[^/](\.[^./]+)$'
+
+
+def get_extension(path_str):
+    try:
+        if not isinstance(path_str, str):
+            return "N/A (No es path)"
+        ext = Path(path_str).suffix.lower()
+        return ext if ext else "Sin Extensión"
+    except Exception:
+        return "N/A (Error)"
+
+
+def _add_counts(total, partial):
+    """ Suma conteos respetando el orden de primera aparición. """
+    for key, value in partial.items():
+        total[key] = total.get(key, 0) + value
+
+
+def _code_counts(codes, keys, weights=None, dropna=True):
+    """
+    Conteos (o sumas de 'weights') por código entero, en orden de primera
+    aparición. El código -1 es el valor vacío (None).
+    """
+    if dropna:
+        validos = codes >= 0
+        codes = codes[validos]
+        weights = None if weights is None else weights[validos]
+    shifted = codes.astype(np.int64) + 1
+    totals = np.bincount(shifted, weights=weights, minlength=len(keys) + 1)
+    convert = int if weights is None else (lambda value: value)
+    return {(None if code == 0 else keys[code - 1]): convert(totals[code]) for code in pd.unique(shifted)}
+
+
+def _category_counts(series, weights=None, dropna=True):
+    """ _code_counts para una columna 'category' (o texto, que se factoriza). """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, keys = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, keys = pd.factorize(series, use_na_sentinel=True)
+    return _code_counts(codes, list(keys), weights, dropna)
+
+
+def _extension_counts(paths):
+    """
+    Conteo de get_extension() por ruta, vectorizado: una expresión regular
+    anclada extrae la extensión y el paso a minúsculas se hace una vez por
+    valor distinto. Las rutas raras (terminan en separador o en punto, donde
+    Path normaliza la ruta) se resuelven con get_extension.
+    """
+    texto = paths.astype(object)
+    extensiones = texto.str.extract(_PATRON_EXTENSION, flags=re.S, expand=False).astype(object)
+    sin_extension = extensiones.isna()
+    if sin_extension.any():
+        resto = texto[sin_extension]
+        valores = pd.Series("Sin Extensión", index=resto.index, dtype=object)
+        valores[resto.isna()] = "N/A (No es path)"
+        raras = resto.str.endswith(_SEPARADORES + ('.',), na=False)
+        if raras.any():
+            valores[raras] = resto[raras].map(get_extension)
+        extensiones[sin_extension] = valores
+    codes, uniques = pd.factorize(extensiones)
+    counts = {}
+    for clave, count in _code_counts(codes, list(uniques)).items():
+        _add_counts(counts, {clave.lower() if clave.startswith('.') else clave: count})
+    return counts
+
+
+def _sorted_series(counts, index_name):
+    """ Lo mismo que value_counts(): de mayor a menor, empates en orden de aparición. """
+    series = pd.Series(list(counts.values()), index=pd.Index(list(counts.keys()), name=index_name), name='count', dtype='int64')
+    return series.sort_values(ascending=False, kind='stable')
+
+
+class LogAggregates:
+    """ Resumen sumable de un log (o de un pedazo de log) ya filtrado. """
+
+    def __init__(self):
+        self.rows = 0
+        self.total_bytes = 0
+        self.users = set()
+        self.status_counts = {}
+        self.status_bytes = {}
+        self.subject_counts = {}
+        self.user_counts = {}
+        self.profile_counts = {}  # id_perfil (None = vacío) -> acciones
+        self.hour_counts = {}
+        self.day_counts = {}      # Timestamp del día -> acciones
+        self.extension_counts = {}
+        self.timezone = None
+
+    @classmethod
+    def from_frame(cls, df_log):
+        """ Resumen parcial de un DataFrame tipado (un bloque o el log completo). """
+        agg = cls()
+        if df_log.empty:
+            return agg
+        timestamps = df_log[COLUMNA_FECHA]
+        sizes = df_log[COLUMNA_TAMANO]
+        agg.rows = len(df_log)
+        agg.total_bytes = sizes.sum()
+        agg.status_counts = _category_counts(df_log['status'])
+        agg.status_bytes = _category_counts(df_log['status'], weights=sizes.to_numpy(dtype=np.float64))
+        agg.subject_counts = _category_counts(df_log['subject_assigned'])
+        agg.user_counts = _category_counts(df_log['username'])
+        agg.users = set(agg.user_counts)
+        agg.profile_counts = _category_counts(df_log['id_perfil'], dropna=False)
+
+        # Hora y día salen de la MISMA hora local (un solo cast de numpy)
+        agg.timezone = timestamps.dt.tz
+        local = timestamps.dt.tz_localize(None) if agg.timezone is not None else timestamps
+        local = local.to_numpy()
+        horas = local.astype('datetime64[h]').astype(np.int64) % 24
+        agg.hour_counts = _code_counts(horas, list(range(24)))
+        dias = local.astype('datetime64[D]').astype(np.int64)
+        primer_dia = int(dias.min())
+        dias_vistos = _code_counts(dias - primer_dia, range(int(dias.max()) - primer_dia + 1))
+        agg.day_counts = {
+            pd.Timestamp(primer_dia + offset, unit='D').tz_localize(agg.timezone): count
+            for offset, count in dias_vistos.items()
+        }
+
+        agg.extension_counts = _extension_counts(df_log['file_original_path'])
+        return agg
+
+    def merge(self, other):
+        """ Suma otro resumen parcial a este (other va DESPUÉS en el log). """
+        if not other.rows:
+            return self
+        self.rows += other.rows
+        self.total_bytes += other.total_bytes
+        self.users |= other.users
+        _add_counts(self.status_counts, other.status_counts)
+        _add_counts(self.status_bytes, other.status_bytes)
+        _add_counts(self.subject_counts, other.subject_counts)
+        _add_counts(self.user_counts, other.user_counts)
+        _add_counts(self.profile_counts, other.profile_counts)
+        _add_counts(self.hour_counts, other.hour_counts)
+        _add_counts(self.day_counts, other.day_counts)
+        _add_counts(self.extension_counts, other.extension_counts)
+        self.timezone = other.timezone
+        return self
+
+    # --- Series listas para imprimir/graficar ---
+
+    def status_series(self):
+        return _sorted_series(self.status_counts, 'status')
+
+    def subject_series(self):
+        """ Materias reales (sin 'N/A', 'Otros' ni vacías), con sus variantes juntas ("Cálculo II" = "calculo_ii"). """
+        reales = {k: v for k, v in self.subject_counts.items() if k not in MATERIAS_IGNORADAS}
+        return _sorted_series(merge_variants(reales), 'subject_assigned')
+
+    def user_series(self):
+        return _sorted_series(self.user_counts, 'username')
+
+    def profile_name_series(self, nombres, desconocido):
+        """ Acciones por nombre de perfil; los ids sin nombre se agrupan como 'desconocido'. """
+        por_nombre = {}
+        for profile_id, count in self.profile_counts.items():
+            nombre = nombres.get(profile_id)
+            _add_counts(por_nombre, {desconocido if nombre is None or pd.isna(nombre) else nombre: count})
+        return _sorted_series(por_nombre, 'nombre_visible')
+
+    def hour_series(self):
+        return _sorted_series(self.hour_counts, COLUMNA_FECHA).sort_index()
+
+    def day_series(self):
+        """ Acciones por día, con los días sin actividad en 0 (igual que resample('D').size()). """
+        if not self.day_counts:
+            return pd.Series([], index=pd.DatetimeIndex([], name=COLUMNA_FECHA, tz=self.timezone), dtype='int64')
+        dias = pd.Series(self.day_counts, dtype='int64').sort_index()
+        rango = pd.date_range(dias.index[0], dias.index[-1], freq='D', name=COLUMNA_FECHA)
+        return dias.reindex(rango, fill_value=0)
+
+    def extension_series(self):
+        reales = {k: v for k, v in self.extension_counts.items() if k not in SIN_EXTENSION}
+        return _sorted_series(reales, 'extension')
+
+    def count_status(self, status):
+        return self.status_counts.get(status, 0)
+
+    def bytes_for(self, statuses):
+        return sum(self.status_bytes.get(status, 0) for status in statuses)
+
+
+# --- Lectura por bloques ---
+
+def iter_log_chunks(csv_path, required_columns, chunk_rows=FILAS_POR_BLOQUE, usecols=None):
+    """
+    Lee el CSV por bloques y devuelve cada bloque ya tipado.
+    El formato de fecha se deduce de la primera fecha del archivo, igual
+    que una lectura completa con pd.to_datetime.
+    """
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    missing = [col for col in required_columns if col not in columns]
+    if missing:
+        raise LogColumnsError(missing)
+
+    reader = pd.read_csv(
+        csv_path,
+        header=0,
+        dtype=str,
+        on_bad_lines='skip', # Ignorar líneas rotas
+        chunksize=chunk_rows,
+        usecols=usecols
+    )
+    date_format = None
+    with reader:
+        for chunk in reader:
+            if date_format is None:
+                date_format = guess_date_format(chunk[COLUMNA_FECHA])
+            if COLUMNA_TAMANO not in chunk.columns:
+                chunk[COLUMNA_TAMANO] = None # Lectura parcial (usecols): el tamaño no se usa
+            yield type_log_frame(chunk, date_format)
+
+
+class LogRange:
+    """
+    Lo que necesitan los filtros interactivos sin cargar el log:
+    fechas mínima y máxima, y qué usuarios hay en cada día (en orden de aparición).
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.min_ts = None
+        self.max_ts = None
+        self.first_seen = {} # (fecha, usuario) -> posición de la primera fila
+
+    def add(self, chunk):
+        if chunk.empty:
+            return
+        timestamps = chunk[COLUMNA_FECHA]
+        chunk_min, chunk_max = timestamps.min(), timestamps.max()
+        self.min_ts = chunk_min if self.min_ts is None else min(self.min_ts, chunk_min)
+        self.max_ts = chunk_max if self.max_ts is None else max(self.max_ts, chunk_max)
+        local = timestamps.dt.tz_localize(None) if timestamps.dt.tz is not None else timestamps
+        pares = pd.DataFrame({'dia': local.to_numpy().astype('datetime64[D]'), 'usuario': chunk['username']})
+        pares.index = pd.RangeIndex(self.rows, self.rows + len(chunk))
+        primeros = pares.dropna().drop_duplicates() # Filas sin usuario no se listan
+        # Solo los pares (día, usuario) nuevos pasan a objetos 'date'
+        for posicion, dia, usuario in zip(primeros.index, primeros['dia'], primeros['usuario']):
+            self.first_seen.setdefault((dia.date(), usuario), posicion)
+        self.rows += len(chunk)
+
+    def users_between(self, fecha_inicio, fecha_fin):
+        """ Usuarios con actividad en el rango, en orden de primera aparición. """
+        posiciones = {}
+        for (fecha, usuario), posicion in self.first_seen.items():
+            if fecha_inicio <= fecha <= fecha_fin and posicion < posiciones.get(usuario, float('inf')):
+                posiciones[usuario] = posicion
+        return sorted(posiciones, key=posiciones.get)
+
+
+def scan_log_range(csv_path, required_columns, chunk_rows=FILAS_POR_BLOQUE):
+    """ Primera pasada (solo fecha y usuario) para los filtros interactivos. """
+    log_range = LogRange()
+    for chunk in iter_log_chunks(csv_path, required_columns, chunk_rows, usecols=[COLUMNA_FECHA, 'username']):
+        log_range.add(chunk)
+    return log_range
+
+
+def aggregate_log(csv_path, required_columns, filter_chunk=None, chunk_rows=FILAS_POR_BLOQUE):
+    """ Segunda pasada: aplica el filtro a cada bloque y suma los resúmenes parciales. """
+    total = LogAggregates()
+    for chunk in iter_log_chunks(csv_path, required_columns, chunk_rows):
+        if filter_chunk is not None:
+            chunk = filter_chunk(chunk)
+        total.merge(LogAggregates.from_frame(chunk))
+    return total
@@ -0,0 +1,231 @@
+# --- log_writer.py (El "Escribano" del admin_log.csv) ---
+# El admin_log.csv es compartido: varias ejecuciones (hilos) y varias
+# copias de la app (procesos, otros usuarios de la misma instalación)
+# escriben en él. Para que las filas nunca se mezclen a medias:
+# - Candado de archivo consultivo en "admin_log.csv.lock" (fcntl.flock en
+#   Linux/macOS, msvcrt.locking en Windows). Es un archivo aparte, así que
+#   no bloquea a quien solo lee el log (el analizador).
+# - "Group commit": las filas que llegan mientras se escribe un lote se
+#   juntan y salen en UN append con el candado tomado (un write + un fsync
+#   por lote). Quien llama vuelve cuando sus filas están en disco; espera
+#   como mucho el lote en curso más el suyo (de hasta MAX_FILAS_POR_LOTE).
+# - Antes de cada append, y al arrancar, se repara la cola del archivo: si
+#   termina en una línea a medias (un proceso murió escribiendo), se corta
+#   hasta el último salto de línea. Si lo que sigue al último salto es una
+#   fila completa a la que solo le falta el salto (alguien editó el CSV a
+#   mano), se le agrega el salto y la fila se queda.
+
+import csv
+import io
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+ESPERA_CANDADO = 30.0 # Segundos máximos esperando a que otro proceso suelte el candado
+REINTENTO_CANDADO = 0.01
+MAX_FILAS_POR_LOTE = 20000
+BLOQUE_REPARACION = 4096
+
+
+class FileLock:
+    """ Candado exclusivo entre procesos (y entre hilos, un dueño a la vez). """
+
+    def __init__(self, path, timeout=ESPERA_CANDADO):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._fd = None
+        self._local = threading.Lock()
+
+    def acquire(self):
+        self._local.acquire()
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        except OSError:
+            self._local.release()
+            raise
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1) # El byte 0 del archivo .lock
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    self._local.release()
+                    raise TimeoutError(f"Otro proceso tiene tomado {self.path} hace más de {self.timeout:.0f} s")
+                time.sleep(REINTENTO_CANDADO)
+        self._fd = fd
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+            self._local.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _is_complete_row(data, field_count):
+    """ True si 'data' es UNA fila CSV entera con 'field_count' campos (sin comillas abiertas). """
+    try:
+        text = data.decode('utf-8')
+        rows = list(csv.reader(io.StringIO(text, newline=''), strict=True))
+    except (UnicodeDecodeError, csv.Error):
+        return False
+    return len(rows) == 1 and len(rows[0]) == field_count
+
+
+def repair_torn_tail(f, field_count=None):
+    """
+    Corta lo escrito después del último salto de línea de 'f' (abierto en
+    binario con lectura y escritura). Devuelve cuántos bytes quitó. Con
+    'field_count', una cola que ya es una fila completa no se corta: se le
+    agrega el salto de línea que le falta.
+    """
+    size = f.seek(0, os.SEEK_END)
+    end = size
+    while end > 0:
+        step = min(BLOQUE_REPARACION, end)
+        f.seek(end - step)
+        newline = f.read(step).rfind(b'\n')
+        if newline != -1:
+            end = end - step + newline + 1
+            break
+        end -= step
+    if end != size and field_count is not None:
+        f.seek(end)
+        tail = f.read(size - end)
+        if _is_complete_row(tail, field_count):
+            f.seek(0, os.SEEK_END)
+            f.write(b'\n' if tail.endswith(b'\r') else b'\r\n') # Mismo fin de línea que csv.writer
+            return 0
+    if end != size:
+        f.truncate(end)
+    f.seek(0, os.SEEK_END)
+    return size - end
+
+
+class _Request:
+    """ Las filas de UNA llamada a write() y cómo terminó. """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.done = False
+        self.error = None
+
+
+class AdminLogWriter:
+    """
+    Escribe filas (dicts) en el CSV compartido con candado y group commit.
+    'on_commit(rows, start_offset, end_offset)' se llama tras cada lote
+    (p. ej. LiveStats.record), con el candado todavía tomado.
+    """
+
+    def __init__(self, path, fieldnames, on_commit=None, lock_path=None):
+        self.path = Path(path)
+        self.fieldnames = list(fieldnames)
+        self.on_commit = on_commit
+        self.lock = FileLock(lock_path or self.path.with_name(self.path.name + ".lock"))
+        self._cond = threading.Condition()
+        self._queue = []
+        self._flushing = False
+        self.batches = 0
+        self.rows_written = 0
+        self.repaired_bytes = 0
+
+    def write(self, rows):
+        """ Agrega 'rows' al log; vuelve cuando están en disco (lanza OSError/TimeoutError si no se pudo). """
+        rows = list(rows)
+        if not rows:
+            return
+        request = _Request(rows)
+        with self._cond:
+            self._queue.append(request)
+            while not request.done:
+                if self._flushing:
+                    self._cond.wait() # Otro hilo está escribiendo: quizás se lleve estas filas también
+                    continue
+                self._flushing = True
+                batch = self._take_batch()
+                self._cond.release()
+                try:
+                    self._commit(batch)
+                finally:
+                    self._cond.acquire()
+                    self._flushing = False
+                    self._cond.notify_all()
+        if request.error is not None:
+            raise request.error
+
+    def _take_batch(self):
+        """ Saca de la cola las peticiones más viejas, hasta MAX_FILAS_POR_LOTE filas (al menos una). """
+        batch = []
+        rows = 0
+        while self._queue and (not batch or rows + len(self._queue[0].rows) <= MAX_FILAS_POR_LOTE):
+            request = self._queue.pop(0)
+            batch.append(request)
+            rows += len(request.rows)
+        return batch
+
+    def _encode(self, rows, header):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.fieldnames)
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue().encode('utf-8')
+
+    def _commit(self, batch):
+        rows = [row for request in batch for row in request.rows]
+        error = None
+        try:
+            with self.lock:
+                with open(self.path, 'ab+') as f:
+                    self.repaired_bytes += repair_torn_tail(f, len(self.fieldnames))
+                    if f.tell() == 0:
+                        f.write(self._encode([], header=True)) # Log nuevo (o borrado): cabecera primero
+                    start_offset = f.tell()
+                    f.write(self._encode(rows, header=False))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    end_offset = f.tell()
+                self.batches += 1
+                self.rows_written += len(rows)
+                if self.on_commit is not None:
+                    self.on_commit(rows, start_offset, end_offset)
+        except Exception as e:
+            error = e
+        for request in batch:
+            request.error = error
+            request.done = True
+
+    def repair(self):
+        """ Pasada de recuperación (al arrancar): corta una línea a medias al final. Devuelve los bytes quitados. """
+        if not self.path.exists():
+            return 0
+        with self.lock:
+            with open(self.path, 'rb+') as f:
+                removed = repair_torn_tail(f, len(self.fieldnames))
+        self.repaired_bytes += removed
+        return removed
@@ -0,0 +1,174 @@
+# --- matcher.py (El "Buscador" de materias) ---
+# Autómata Aho-Corasick para encontrar TODAS las palabras clave de un
+# perfil en el nombre de un archivo con una sola pasada, en lugar de
+# probar materia por materia con 'in'.
+
+import re
+from collections import deque
+from functools import lru_cache
+
+# Modos de coincidencia soportados
+MODO_PRIMERA = "primera"      # La primera materia de la lista que aparezca (comportamiento clásico)
+MODO_MAS_LARGA = "mas_larga"  # La palabra clave más larga que aparezca (empate: orden de la lista)
+MODOS_COINCIDENCIA = (MODO_PRIMERA, MODO_MAS_LARGA)
+
+
+class SubjectMatcher:
+    """
+    Autómata construido una sola vez a partir de las materias YA normalizadas.
+    match(texto) devuelve la materia elegida o None.
+    """
+
+    def __init__(self, subjects, modo=MODO_PRIMERA):
+        if modo not in MODOS_COINCIDENCIA:
+            raise ValueError(f"Modo de coincidencia desconocido: {modo}")
+        self.subjects = list(subjects)
+        self.modo = modo
+
+        # Cada nodo: transiciones (dict), enlace de fallo (int) y la MEJOR
+        # salida alcanzable desde ese nodo (índice en self.subjects o None).
+        # Guardar solo la mejor salida (ya combinada con la del enlace de fallo)
+        # evita recorrer listas de salidas en cada carácter.
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]
+
+        for idx, subject in enumerate(self.subjects):
+            node = 0
+            for ch in subject:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                    self._goto[node][ch] = nxt
+                node = nxt
+            self._best[node] = self._better(self._best[node], idx)
+
+        # Construir enlaces de fallo por anchura (BFS)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._best[child] = self._better(self._best[child], self._best[self._fail[child]])
+
+        # Una materia vacía ("" in x siempre es True en el bucle clásico)
+        # queda como salida de la raíz; la propagamos a todos los nodos.
+        raiz = self._best[0]
+        if raiz is not None:
+            self._best = [self._better(b, raiz) for b in self._best]
+
+    def _better(self, a, b):
+        """ Devuelve el índice preferido según el modo (None = sin coincidencia). """
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if self.modo == MODO_MAS_LARGA:
+            la, lb = len(self.subjects[a]), len(self.subjects[b])
+            if la != lb:
+                return a if la > lb else b
+        return a if a < b else b
+
+    def match_index(self, text):
+        goto, fail, best = self._goto, self._fail, self._best
+        node = 0
+        found = best[0]
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            salida = best[node]
+            if salida is not None:
+                found = self._better(found, salida)
+                # En modo 'primera' la materia 0 ya no se puede mejorar
+                if found == 0 and self.modo == MODO_PRIMERA:
+                    break
+        return found
+
+    def match(self, text):
+        idx = self.match_index(text)
+        return None if idx is None else self.subjects[idx]
+
+
+class _ListMatcher:
+    """
+    Versión con el bucle clásico ('in' por materia) para perfiles pequeños:
+    con pocas materias la búsqueda de subcadenas en C gana al autómata.
+    """
+
+    def __init__(self, subjects, modo=MODO_PRIMERA):
+        self.subjects = list(subjects)
+        self.modo = modo
+
+    def match(self, text):
+        if self.modo == MODO_PRIMERA:
+            for subject in self.subjects:
+                if subject in text:
+                    return subject
+            return None
+        found = None
+        for subject in self.subjects:
+            if subject in text and (found is None or len(subject) > len(found)):
+                found = subject
+        return found
+
+
+_PALABRA = re.compile(r'[^\W_]+')
+
+
+def _words(text):
+    """ " calculo ii pdf ": solo las palabras, separadas y rodeadas por UN espacio. """
+    return " " + " ".join(_PALABRA.findall(text)) + " "
+
+
+class _WordMatcher:
+    """
+    Coincidencia por palabras completas: "arte" encuentra "Arte_final.pdf"
+    pero no "cuarteto.pdf". Nombre y materias se reducen a sus palabras
+    rodeadas de espacios y se busca con el matcher normal.
+    """
+
+    def __init__(self, subjects, modo=MODO_PRIMERA):
+        self.subjects = list(subjects)
+        self.modo = modo
+        padded = tuple(_words(subject) for subject in self.subjects)
+        self._original = {}
+        for word_form, subject in zip(padded, self.subjects):
+            self._original.setdefault(word_form, subject)
+        self._inner = _build_matcher(padded, modo)
+
+    def match(self, text):
+        found = self._inner.match(_words(text))
+        return None if found is None else self._original[found]
+
+
+# A partir de cuántas materias conviene el autómata (medido con benchmarks/bench_matcher.py)
+UMBRAL_AUTOMATA = 64
+
+
+@lru_cache(maxsize=32)
+def _build_matcher(subjects, modo, whole_words=False):
+    if modo not in MODOS_COINCIDENCIA:
+        raise ValueError(f"Modo de coincidencia desconocido: {modo}")
+    if whole_words:
+        return _WordMatcher(subjects, modo)
+    if len(subjects) < UMBRAL_AUTOMATA:
+        return _ListMatcher(subjects, modo)
+    return SubjectMatcher(subjects, modo)
+
+
+def get_subject_matcher(subjects_normalized, modo=MODO_PRIMERA, whole_words=False):
+    """
+    Devuelve el autómata para una lista de materias normalizadas.
+    Se guarda en caché por (materias, modo, palabras completas): si el perfil
+    cambia su 'lista_materias_pipe' la llave cambia y se construye uno nuevo.
+    """
+    return _build_matcher(tuple(subjects_normalized), modo or MODO_PRIMERA, bool(whole_words))
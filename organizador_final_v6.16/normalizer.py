@@ -0,0 +1,140 @@
+# --- normalizer.py (El "Normalizador" de nombres) ---
+# Convierte nombres de archivo y materias a una forma comparable. Antes
+# cada nombre pasaba por unicodedata.normalize('NFD') y un filtro carácter
+# por carácter; ahora:
+# - Los nombres solo ASCII (la gran mayoría) se resuelven con lower().
+# - Los acentos latinos se quitan con UNA tabla de str.translate calculada
+#   al importar (mismo resultado que NFD + quitar marcas).
+# - Lo que la tabla no cubre (griego, marcas sueltas...) sigue el camino
+#   clásico, así que el resultado es idéntico al de antes.
+# - Cada normalizador tiene su caché LRU acotada (nombres que se repiten
+#   entre ejecuciones, materias de cada perfil).
+# Qué se "pliega" es configurable por perfil: mayúsculas, acentos,
+# separadores ("Cálculo-II" = "calculo_ii" = "calculo ii") y puntuación.
+# Solo usa la librería estándar: el analizador lo importa sin pandas.
+
+import string
+import unicodedata
+from functools import lru_cache
+
+PLEGAR_MAYUSCULAS = "mayusculas"   # "Calculo" = "calculo"
+PLEGAR_ACENTOS = "acentos"         # "cálculo" = "calculo"
+PLEGAR_SEPARADORES = "separadores" # Espacios, '_', '-' y '.' seguidos = un espacio; sin espacios en los extremos
+PLEGAR_PUNTUACION = "puntuacion"   # Se quitan los demás signos: "(II)" = "II", "C++" = "C"
+OPCIONES_PLEGADO = (PLEGAR_MAYUSCULAS, PLEGAR_ACENTOS, PLEGAR_SEPARADORES, PLEGAR_PUNTUACION)
+
+PLEGADO_CLASICO = (PLEGAR_MAYUSCULAS, PLEGAR_ACENTOS) # Lo que hacía normalize_text (y el valor por defecto)
+PLEGADO_MATERIAS = (PLEGAR_MAYUSCULAS, PLEGAR_ACENTOS, PLEGAR_SEPARADORES) # Para agrupar materias en el analizador
+
+SEPARADORES = "_-."
+PUNTUACION = ''.join(c for c in string.punctuation if c not in SEPARADORES)
+TAMANO_CACHE = 16384 # Nombres por normalizador (~2 MB con nombres largos)
+
+# Letras latinas con acento (Latin-1, Latin Extended-A/B y Latin Extended Additional)
+RANGOS_LATINOS = (range(0x00C0, 0x0250), range(0x1E00, 0x1F00))
+
+
+def _sin_marcas(text):
+    """ El camino clásico: descomponer (NFD) y quitar las marcas (acentos, diéresis...). """
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+
+
+def _tabla_acentos():
+    """ Letra acentuada -> letra ASCII, solo donde NFD + quitar marcas da ASCII. """
+    table = {}
+    for rango in RANGOS_LATINOS:
+        for code in rango:
+            plain = _sin_marcas(chr(code))
+            if plain != chr(code) and plain.isascii():
+                table[code] = plain
+    return table
+
+
+_TABLA_ACENTOS = _tabla_acentos()
+
+
+class TextNormalizer:
+    """
+    Normalizador con un conjunto fijo de opciones de plegado. Se llama
+    como una función: normalizer("Cálculo-II.pdf"). Seguro entre hilos.
+    """
+
+    def __init__(self, folding=PLEGADO_CLASICO, cache_size=TAMANO_CACHE):
+        unknown = set(folding) - set(OPCIONES_PLEGADO)
+        if unknown:
+            raise ValueError(f"Opción de plegado desconocida: {', '.join(sorted(unknown))}")
+        self.folding = tuple(option for option in OPCIONES_PLEGADO if option in folding)
+        self._case = PLEGAR_MAYUSCULAS in folding
+        self._accents = PLEGAR_ACENTOS in folding
+        self._separators = PLEGAR_SEPARADORES in folding
+        self._punctuation = PLEGAR_PUNTUACION in folding
+
+        table = {}
+        if self._accents:
+            table.update(_TABLA_ACENTOS)
+        if self._punctuation:
+            table.update({ord(c): None for c in PUNTUACION})
+        if self._separators:
+            table.update({ord(c): ' ' for c in SEPARADORES})
+        self._table = table
+        # Con solo mayúsculas/acentos, un nombre ASCII no necesita nada más que lower()
+        self._ascii_is_trivial = not (self._separators or self._punctuation)
+        self._cached = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def __call__(self, text):
+        if not text:
+            return ""
+        text = str(text)
+        if self._ascii_is_trivial and text.isascii():
+            return text.lower() if self._case else text
+        return self._cached(text)
+
+    def _normalize(self, text):
+        if self._case:
+            text = text.lower()
+        if self._table:
+            text = text.translate(self._table)
+        if not text.isascii():
+            if self._accents:
+                text = _sin_marcas(text)
+            if self._punctuation:
+                text = ''.join(c for c in text if c.isascii() or unicodedata.category(c)[0] not in 'PS')
+        if self._separators:
+            text = ' '.join(text.split())
+        return text
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+
+@lru_cache(maxsize=16)
+def _get_normalizer(folding):
+    return TextNormalizer(folding)
+
+
+def get_normalizer(folding=PLEGADO_CLASICO):
+    """ Normalizador compartido por conjunto de opciones (cada uno con su caché). """
+    folding = PLEGADO_CLASICO if folding is None else folding
+    return _get_normalizer(tuple(option for option in OPCIONES_PLEGADO if option in folding))
+
+
+def normalize_text(text):
+    """ Minúsculas y sin acentos (el plegado clásico). """
+    return _CLASICO(text)
+
+
+_CLASICO = get_normalizer(PLEGADO_CLASICO)
+
+
+def merge_variants(counts, folding=PLEGADO_MATERIAS):
+    """
+    Junta los conteos de las variantes de un mismo nombre ("Cálculo II",
+    "calculo_ii"...). Cada grupo queda con el nombre que apareció primero.
+    """
+    normalizer = get_normalizer(folding)
+    labels = {}
+    merged = {}
+    for name, count in counts.items():
+        label = labels.setdefault(normalizer(name), name)
+        merged[label] = merged.get(label, 0) + count
+    return merged
@@ -0,0 +1,221 @@
+# --- profiles_store.py (El "Archivero" de perfiles) ---
+# Capa de acceso a los perfiles. Dos implementaciones con la misma interfaz:
+#   - CsvProfileStore: el perfiles.csv de siempre, pero con caché en memoria
+#     (se invalida cuando cambia el mtime/tamaño del archivo) y guardado
+#     atómico (archivo temporal + rename).
+#   - SqliteProfileStore: base SQLite con actualizaciones por fila, así
+#     subir 'contador_archivos_movidos' no reescribe todos los perfiles.
+# Ambas tienen un candado por perfil para los "leer-modificar-guardar".
+
+import copy
+import csv
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class _ProfileLocks:
+    """ Un candado por id de perfil (se crean bajo demanda). """
+
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def hold(self, profile_id):
+        with self._guard:
+            lock = self._locks.setdefault(profile_id, threading.RLock())
+        with lock:
+            yield
+
+
+class CsvProfileStore:
+    """ Perfiles en un CSV (una fila por perfil). """
+
+    backend = "csv"
+
+    def __init__(self, csv_path):
+        self.path = Path(csv_path)
+        self._cache = None
+        self._cache_key = None
+        self._write_lock = threading.RLock() # El CSV se reescribe completo: una escritura a la vez
+        self._locks = _ProfileLocks()
+
+    def _file_key(self):
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        key = self._file_key()
+        if self._cache is not None and key == self._cache_key:
+            return self._cache
+        profiles = {}
+        if key is not None:
+            with open(self.path, mode='r', encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    profiles[row['id_perfil']] = row
+        self._cache, self._cache_key = profiles, key
+        return profiles
+
+    def _write(self, profiles):
+        if not profiles:
+            # Sin perfiles se borra el archivo (igual que antes)
+            if self.path.exists():
+                os.remove(self.path)
+            self._cache, self._cache_key = {}, None
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Obtener todas las llaves de todos los perfiles para estar seguros
+        all_keys = set()
+        for profile in profiles.values():
+            all_keys.update(profile.keys())
+        fieldnames = sorted(all_keys) # Ordenar para consistencia
+
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, mode='w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for profile in profiles.values():
+                writer.writerow(profile)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path) # Atómico: nadie ve un CSV a medio escribir
+        self._cache, self._cache_key = profiles, self._file_key()
+
+    # --- Interfaz pública ---
+
+    def load_all(self):
+        with self._write_lock:
+            return copy.deepcopy(self._read())
+
+    def get(self, profile_id):
+        with self._write_lock:
+            profile = self._read().get(profile_id)
+            return dict(profile) if profile is not None else None
+
+    def save_all(self, profiles):
+        with self._write_lock:
+            self._write(copy.deepcopy(profiles))
+
+    def put(self, profile):
+        with self._locks.hold(profile['id_perfil']), self._write_lock:
+            profiles = dict(self._read())
+            profiles[profile['id_perfil']] = dict(profile)
+            self._write(profiles)
+
+    def delete(self, profile_id):
+        """ Devuelve False si el perfil no existía. """
+        with self._locks.hold(profile_id), self._write_lock:
+            profiles = dict(self._read())
+            if profile_id not in profiles:
+                return False
+            del profiles[profile_id]
+            self._write(profiles)
+            return True
+
+    def update(self, profile_id, changes):
+        """
+        Aplica changes(perfil) -> perfil bajo el candado del perfil.
+        Devuelve el perfil actualizado o None si no existe.
+        """
+        with self._locks.hold(profile_id), self._write_lock:
+            profiles = dict(self._read())
+            if profile_id not in profiles:
+                return None
+            updated = changes(dict(profiles[profile_id]))
+            profiles[profile_id] = updated
+            self._write(profiles)
+            return dict(updated)
+
+
+class SqliteProfileStore:
+    """ Perfiles en SQLite: una fila por perfil, con los campos en JSON. """
+
+    backend = "sqlite"
+
+    def __init__(self, db_path):
+        self.path = Path(db_path)
+        self._locks = _ProfileLocks()
+        self._local = threading.local() # Una conexión por hilo
+        self._ensure_schema()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self):
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS perfiles (id_perfil TEXT PRIMARY KEY, datos TEXT NOT NULL)")
+
+    def is_empty(self):
+        return self._conn().execute("SELECT 1 FROM perfiles LIMIT 1").fetchone() is None
+
+    def load_all(self):
+        rows = self._conn().execute("SELECT id_perfil, datos FROM perfiles ORDER BY rowid").fetchall()
+        return {profile_id: json.loads(datos) for profile_id, datos in rows}
+
+    def get(self, profile_id):
+        row = self._conn().execute("SELECT datos FROM perfiles WHERE id_perfil = ?", (profile_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_all(self, profiles):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM perfiles")
+            conn.executemany(
+                "INSERT INTO perfiles (id_perfil, datos) VALUES (?, ?)",
+                [(pid, json.dumps(p, ensure_ascii=False)) for pid, p in profiles.items()]
+            )
+
+    def put(self, profile):
+        with self._locks.hold(profile['id_perfil']), self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO perfiles (id_perfil, datos) VALUES (?, ?)",
+                (profile['id_perfil'], json.dumps(profile, ensure_ascii=False))
+            )
+
+    def delete(self, profile_id):
+        with self._locks.hold(profile_id), self._conn() as conn:
+            return conn.execute("DELETE FROM perfiles WHERE id_perfil = ?", (profile_id,)).rowcount > 0
+
+    def update(self, profile_id, changes):
+        with self._locks.hold(profile_id):
+            conn = self._conn()
+            with conn:
+                # BEGIN IMMEDIATE: otro proceso no puede colarse entre leer y escribir esta fila
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT datos FROM perfiles WHERE id_perfil = ?", (profile_id,)).fetchone()
+                if row is None:
+                    return None
+                updated = changes(json.loads(row[0]))
+                conn.execute(
+                    "UPDATE perfiles SET datos = ? WHERE id_perfil = ?",
+                    (json.dumps(updated, ensure_ascii=False), profile_id)
+                )
+            return updated
+
+
+def open_profile_store(csv_path, db_path, backend="csv"):
+    """
+    Abre el almacén de perfiles elegido. La primera vez que se usa SQLite
+    se importan los perfiles que ya existieran en el CSV.
+    """
+    csv_store = CsvProfileStore(csv_path)
+    if backend != "sqlite":
+        return csv_store
+    sqlite_store = SqliteProfileStore(db_path)
+    if sqlite_store.is_empty():
+        existing = csv_store.load_all()
+        if existing:
+            sqlite_store.save_all(existing)
+    return sqlite_store
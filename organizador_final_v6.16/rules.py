@@ -0,0 +1,203 @@
+# --- rules.py (Las "Reglas" de cada perfil) ---
+# Además de las palabras clave, un perfil puede tener reglas (columna
+# 'reglas'), una por línea:
+#   Carpeta: condición condición ...
+# Todas las condiciones de una regla deben cumplirse:
+#   ext=pdf,docx            extensión del nombre (sin importar mayúsculas)
+#   regex=PATRON            expresión regular buscada en el nombre (sin importar mayúsculas)
+#   tamano>10MB tamano<=1GB solo archivos; unidades B, KB, MB, GB, TB
+#   edad>30d edad<12h       antigüedad según la fecha de modificación; s, m, h, d, sem
+#   prioridad=5             gana la de mayor prioridad (empate: la que está antes)
+# Los valores con espacios van entre comillas: regex="tarea final".
+# Líneas vacías o que empiezan con # se ignoran.
+# Las reglas se miran ANTES que las palabras clave: si ninguna aplica,
+# sigue la lista de materias de siempre (un perfil sin reglas no cambia).
+#
+# Se compilan una sola vez (caché por texto) en un diccionario
+# extensión -> reglas candidatas, ya ordenadas por prioridad: cada nombre
+# mira solo las reglas de SU extensión (más las que aceptan cualquiera),
+# se detiene en la primera que se cumple, y el stat() solo se hace si
+# alguna candidata mira tamaño o edad. (Juntar todas las regex en una sola
+# alternativa resultó más lento con el módulo re: pierde sus atajos por
+# prefijo literal y no puede parar en la primera regla que gana.)
+
+import math
+import os
+import re
+import shlex
+import stat
+from functools import lru_cache
+
+UNIDADES_TAMANO = {'': 1, 'b': 1, 'kb': 1024, 'mb': 1024 ** 2, 'gb': 1024 ** 3, 'tb': 1024 ** 4}
+UNIDADES_EDAD = {'': 86400, 's': 1, 'm': 60, 'min': 60, 'h': 3600, 'd': 86400, 'sem': 7 * 86400}
+
+_CONDICION = re.compile(r'^(ext|regex|tamano|tamaño|edad|prioridad)(>=|<=|=|>|<)(.*)$', re.IGNORECASE | re.DOTALL)
+_CANTIDAD = re.compile(r'^(\d+(?:[.,]\d+)?)\s*([a-z]*)$', re.IGNORECASE)
+
+
+class RuleError(ValueError):
+    """ Una regla mal escrita (el mensaje dice la línea y el motivo). """
+
+
+class Rule:
+    """ Una regla ya interpretada: carpeta destino + condiciones. """
+
+    def __init__(self, name, order):
+        self.name = name
+        self.order = order
+        self.priority = 0
+        self.extensions = None # frozenset o None (cualquier extensión)
+        self.pattern = None    # re.Pattern o None
+        self.size = [None, None] # Bytes [mínimo, máximo] (inclusive)
+        self.age = [None, None]  # Segundos [mínimo, máximo]
+        self.needs_stat = False
+
+    def accepts_stat(self, st, now):
+        low, high = self.size
+        if low is not None or high is not None:
+            if not stat.S_ISREG(st.st_mode):
+                return False
+            if (low is not None and st.st_size < low) or (high is not None and st.st_size > high):
+                return False
+        low, high = self.age
+        age = now - st.st_mtime
+        return (low is None or age >= low) and (high is None or age <= high)
+
+
+def _amount(text, units, what):
+    found = _CANTIDAD.match(text.strip())
+    if not found or found.group(2).lower() not in units:
+        raise ValueError(f"{what} inválido: '{text}' (unidades: {', '.join(u for u in units if u)})")
+    return float(found.group(1).replace(',', '.')) * units[found.group(2).lower()]
+
+
+def _narrow(bounds, op, value, whole):
+    """
+    Acota [mínimo, máximo] (inclusive) con 'op value'. Con 'whole' (bytes)
+    los límites son enteros: tamano>1.5KB es >= 1537 y tamano<1.5B es <= 1.
+    En segundos '>' y '<' pasan al float vecino, así edad>30d no acepta
+    exactamente 30 días.
+    """
+    if op == '=':
+        raise ValueError("usa >, >=, < o <= para tamaño y edad")
+    low, high = bounds
+    if op in ('>', '>='):
+        if whole:
+            value = math.floor(value) + 1 if op == '>' else math.ceil(value)
+        elif op == '>':
+            value = math.nextafter(value, math.inf)
+        bounds[0] = value if low is None else max(low, value)
+    else:
+        if whole:
+            value = math.ceil(value) - 1 if op == '<' else math.floor(value)
+        elif op == '<':
+            value = math.nextafter(value, -math.inf)
+        bounds[1] = value if high is None else min(high, value)
+
+
+def _parse_line(line, order):
+    name, sep, conditions = line.partition(':')
+    name = name.strip()
+    if not sep or not name:
+        raise ValueError("falta 'Carpeta:' al inicio")
+    if not name.strip('.'):
+        raise ValueError(f"'{name}' no es un nombre de carpeta válido (saldría del destino)")
+    lexer = shlex.shlex(conditions, posix=True)
+    lexer.whitespace_split = True
+    lexer.escape = '' # Las barras invertidas son de la expresión regular
+    tokens = list(lexer)
+    if not tokens:
+        raise ValueError("la regla no tiene condiciones")
+
+    rule = Rule(name, order)
+    for token in tokens:
+        found = _CONDICION.match(token)
+        if not found:
+            raise ValueError(f"condición desconocida: '{token}'")
+        key, op, value = found.group(1).lower(), found.group(2), found.group(3)
+        if key in ('ext', 'regex', 'prioridad') and op != '=':
+            raise ValueError(f"'{key}' solo admite '='")
+        if key == 'ext':
+            extensions = {ext.strip().lstrip('.').lower() for ext in value.split(',') if ext.strip()}
+            if not extensions:
+                raise ValueError("'ext=' está vacío")
+            rule.extensions = extensions if rule.extensions is None else rule.extensions & extensions
+        elif key == 'regex':
+            if rule.pattern is not None:
+                raise ValueError("solo se permite un 'regex=' por regla")
+            try:
+                rule.pattern = re.compile(value, re.IGNORECASE | re.DOTALL)
+            except re.error as e:
+                raise ValueError(f"expresión regular inválida '{value}': {e}") from None
+        elif key == 'prioridad':
+            try:
+                rule.priority = int(value)
+            except ValueError:
+                raise ValueError(f"prioridad inválida: '{value}'") from None
+        elif key in ('tamano', 'tamaño'):
+            _narrow(rule.size, op, _amount(value, UNIDADES_TAMANO, "Tamaño"), whole=True)
+        else:
+            _narrow(rule.age, op, _amount(value, UNIDADES_EDAD, "Edad"), whole=False)
+    if rule.extensions is not None:
+        rule.extensions = frozenset(rule.extensions)
+    rule.needs_stat = rule.size != [None, None] or rule.age != [None, None]
+    return rule
+
+
+def parse_rules(text):
+    """ Texto de la columna 'reglas' -> lista de Rule (en el orden escrito). """
+    rules = []
+    for number, line in enumerate((text or "").splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            rules.append(_parse_line(line, len(rules)))
+        except ValueError as e:
+            raise RuleError(f"Regla de la línea {number}: {e}") from None
+    return rules
+
+
+class RuleSet:
+    """
+    Reglas compiladas. match(ruta, ahora) devuelve la carpeta de la
+    primera regla (por prioridad) que se cumple, o None.
+    """
+
+    def __init__(self, rules):
+        self.rules = sorted(rules, key=lambda rule: (-rule.priority, rule.order))
+        self.names = list(dict.fromkeys(rule.name for rule in self.rules))
+
+        # Extensión -> candidatas (las de esa extensión + las que aceptan cualquiera), en orden
+        self._generic = tuple(rule for rule in self.rules if rule.extensions is None)
+        extensions = set().union(*(rule.extensions for rule in self.rules if rule.extensions is not None))
+        self._by_extension = {
+            ext: tuple(rule for rule in self.rules if rule.extensions is None or ext in rule.extensions)
+            for ext in extensions
+        }
+
+    def match(self, path, now, stat_of=os.stat):
+        """ Carpeta de la primera regla que se cumple, o None. 'stat_of' hace el único stat (si alguna lo pide). """
+        name = path.name
+        candidates = self._by_extension.get(os.path.splitext(name)[1][1:].lower(), self._generic)
+        st = None
+        for rule in candidates:
+            if rule.pattern is not None and not rule.pattern.search(name):
+                continue
+            if rule.needs_stat:
+                if st is None:
+                    try:
+                        st = stat_of(path)
+                    except OSError:
+                        st = False
+                if st is False or not rule.accepts_stat(st, now):
+                    continue
+            return rule.name
+        return None
+
+
+@lru_cache(maxsize=32)
+def compile_rules(text):
+    """ RuleSet del texto de reglas de un perfil (None si no tiene); lanza RuleError. """
+    rules = parse_rules(text)
+    return RuleSet(rules) if rules else None
@@ -0,0 +1,194 @@
+# --- scheduler.py (El "Despachador" de perfiles) ---
+# Ejecuta varios perfiles juntos ("lote"):
+# - Los perfiles con la misma carpeta de origen forman un grupo: el origen
+#   se lee UNA vez y cada perfil se evalúa sobre esa misma lista.
+# - Los grupos que usan discos distintos corren en paralelo; en un mismo
+#   disco se turnan (un grupo a la vez por disco, para no pelear por E/S).
+# - Ningún grupo (ni ejecución suelta) toca carpetas que se solapen con las
+#   de otro al mismo tiempo: PathLocks bloquea cada origen y destino, y una
+#   carpeta se solapa con sus subcarpetas y con sus carpetas padre.
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+MAX_GRUPOS_EN_PARALELO = 4
+GRUPOS_POR_DISCO = 1
+
+
+def path_key(path):
+    """ Forma canónica de una ruta para comparar (absoluta, sin enlaces, sin mayúsculas en Windows). """
+    return os.path.normcase(os.path.realpath(os.path.abspath(path)))
+
+
+def paths_overlap(a, b):
+    """ True si a y b (ya canónicas) son la misma carpeta o una contiene a la otra. """
+    if a == b:
+        return True
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    return longer.startswith(shorter.rstrip(os.sep) + os.sep)
+
+
+def disk_of(path):
+    """ Identificador del disco (st_dev) de una ruta, o la propia ruta si no existe. """
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return path_key(path)
+
+
+def group_by_source(items, source_of, variant_of=None):
+    """
+    Agrupa 'items' por origen (ruta canónica), respetando el orden de llegada.
+    Con 'variant_of' el mismo origen se separa además por esa llave (p. ej.
+    cómo se recorre).
+    """
+    groups = {}
+    for item in items:
+        key = path_key(source_of(item))
+        if variant_of is not None:
+            key = (key, variant_of(item))
+        groups.setdefault(key, []).append(item)
+    return groups
+
+
+class PathLocks:
+    """
+    Candados por carpeta. hold(rutas) espera hasta que ninguna de esas rutas
+    se solape con las de otro dueño y entonces las toma TODAS a la vez (así
+    no hay abrazos mortales entre dos lotes que piden carpetas cruzadas).
+    try_acquire/release son lo mismo sin esperar (para JobManager, que deja
+    en cola las tareas cuyas carpetas están ocupadas en vez de bloquear un
+    hilo); cada release avisa a los 'on_release' registrados.
+    """
+
+    def __init__(self):
+        self._held = [] # Lista de listas de rutas canónicas (una por dueño)
+        self._cond = threading.Condition()
+        self._listeners = []
+
+    def _busy(self, keys):
+        return any(paths_overlap(key, held) for owner in self._held for held in owner for key in keys)
+
+    def add_listener(self, on_release):
+        """ on_release() se llama (sin candados tomados) cada vez que se sueltan carpetas. """
+        self._listeners.append(on_release)
+
+    def try_acquire(self, paths):
+        """ Toma las carpetas si están libres y devuelve la llave para release(); si no, None. """
+        keys = [path_key(path) for path in paths]
+        with self._cond:
+            if self._busy(keys):
+                return None
+            self._held.append(keys)
+        return keys
+
+    def release(self, keys):
+        with self._cond:
+            self._held.remove(keys)
+            self._cond.notify_all()
+        for on_release in self._listeners:
+            on_release()
+
+    @contextmanager
+    def hold(self, paths, on_wait=None):
+        """ 'on_wait' (opcional) se llama una vez si hay que esperar. """
+        keys = [path_key(path) for path in paths]
+        with self._cond:
+            if self._busy(keys) and on_wait is not None:
+                on_wait()
+            while self._busy(keys):
+                self._cond.wait()
+            self._held.append(keys)
+        try:
+            yield
+        finally:
+            self.release(keys)
+
+
+class DiskSlots:
+    """ Cuántos grupos pueden trabajar a la vez sobre un mismo disco. """
+
+    def __init__(self, per_disk=GRUPOS_POR_DISCO):
+        self.per_disk = per_disk
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, disk):
+        with self._lock:
+            if disk not in self._semaphores:
+                self._semaphores[disk] = threading.Semaphore(self.per_disk)
+            return self._semaphores[disk]
+
+    @contextmanager
+    def hold(self, paths):
+        # Siempre en el mismo orden, para que dos grupos no se bloqueen entre sí
+        disks = sorted({disk_of(path) for path in paths}, key=str)
+        taken = []
+        try:
+            for disk in disks:
+                semaphore = self._semaphore(disk)
+                semaphore.acquire()
+                taken.append(semaphore)
+            yield disks
+        finally:
+            for semaphore in reversed(taken):
+                semaphore.release()
+
+
+class BatchProgress:
+    """
+    Progreso compartido por todos los grupos de un lote: 'files_total' se
+    fija una vez para el lote completo (cada plan suma, no reemplaza).
+    """
+
+    def __init__(self, progress):
+        self._progress = progress
+        self._lock = threading.Lock()
+        self._total = 0
+
+    def add_total(self, count):
+        with self._lock:
+            self._total += count
+            total = self._total
+        self._progress.set_progress(files_total=total)
+
+    def set_progress(self, **campos):
+        campos.pop('files_total', None)
+        if campos:
+            self._progress.set_progress(**campos)
+
+    def add_progress(self, **incrementos):
+        self._progress.add_progress(**incrementos)
+
+
+def run_groups(groups, run_group, path_locks, disk_slots, max_workers=MAX_GRUPOS_EN_PARALELO):
+    """
+    Ejecuta run_group(grupo) para cada (rutas, grupo) de 'groups': en
+    paralelo entre discos distintos, con los candados de sus rutas tomados.
+    Devuelve los resultados en el mismo orden (o la excepción de cada grupo).
+    """
+    def run_one(paths, group):
+        with disk_slots.hold(paths):
+            with path_locks.hold(paths):
+                return run_group(group)
+
+    if len(groups) <= 1:
+        results = []
+        for paths, group in groups:
+            try:
+                results.append(run_one(paths, group))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups))), thread_name_prefix="lote") as executor:
+        futures = [executor.submit(run_one, paths, group) for paths, group in groups]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
@@ -0,0 +1,33 @@
+# --- conftest.py ---
+# Las pruebas importan los módulos de la app desde la carpeta padre.
+# Correr desde la carpeta del programa:  python -m pytest -q
+
+import sys
+from pathlib import Path
+
+import pytest
+
+CARPETA_APP = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARPETA_APP))
+
+
+@pytest.fixture
+def app_aislada(tmp_path, monkeypatch):
+    """
+    El módulo app con diarios y admin_log en tmp_path. Las filas que iría
+    escribiendo en el log quedan en app.filas_registradas.
+    """
+    pytest.importorskip("flask")
+    import app
+    from dirsize import DirSizeCache
+    from hashing import HashCache
+    from journal import JournalStore
+
+    monkeypatch.setattr(app, 'run_journals', JournalStore(tmp_path / "diarios"))
+    monkeypatch.setattr(app, 'dir_size_cache', DirSizeCache(tmp_path / "cache_tamanos.json"))
+    monkeypatch.setattr(app, 'hash_cache', HashCache(tmp_path / "cache_hashes.json"))
+    monkeypatch.setattr(app, 'ADMIN_LOG_CSV', tmp_path / "admin_log.csv")
+    filas = []
+    monkeypatch.setattr(app, 'log_to_admin_csv', filas.extend)
+    monkeypatch.setattr(app, 'filas_registradas', filas, raising=False)
+    return app
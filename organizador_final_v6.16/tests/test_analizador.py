@@ -0,0 +1,106 @@
+# --- test_analizador.py ---
+# El modo --resumen (contadores de live_stats.py, sin pandas) debe dar los
+# mismos totales que el análisis completo sobre el log entregado.
+
+import importlib.util
+import shutil
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pandas")
+
+CARPETA_APP = Path(__file__).resolve().parent.parent
+
+
+def _importar_analizador():
+    """ El script (tiene espacios en el nombre), importado de nuevo: lee el entorno al cargarse. """
+    spec = importlib.util.spec_from_file_location("analizador_de_datos", CARPETA_APP / "analizador de datos.py")
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture
+def analizador(tmp_path, monkeypatch):
+    """ El script del analizador, apuntando a una copia del log en tmp_path. """
+    monkeypatch.setenv('APPDATA', str(tmp_path / "appdata"))
+    modulo = _importar_analizador()
+    shutil.copy(CARPETA_APP / "admin_log.csv", tmp_path / "admin_log.csv")
+    monkeypatch.setattr(modulo, 'ADMIN_LOG_PATH', tmp_path / "admin_log.csv")
+    monkeypatch.setattr(modulo, 'LOG_CACHE_DIR', tmp_path / ".cache_admin_log")
+    monkeypatch.setattr(modulo, 'STATS_SNAPSHOT_PATH', tmp_path / ".stats_admin_log.json")
+    monkeypatch.setattr(modulo, 'APP_DATA_ROOT', tmp_path / "appdata")
+    return modulo
+
+
+def test_resumen_coincide_con_el_modo_completo(analizador, capsys):
+    from live_stats import LiveStats
+    from normalizer import merge_variants
+
+    analizador.importar_analisis_completo()
+    df_log = analizador.cargar_admin_log()
+    completo = analizador.LogAggregates.from_frame(df_log)
+    assert completo.rows == 38
+
+    assert analizador.resumen_rapido()
+    salida = capsys.readouterr().out
+    assert f"Total de acciones registradas: {completo.rows}" in salida
+
+    stats = LiveStats(analizador.ADMIN_LOG_PATH, analizador.STATS_SNAPSHOT_PATH).snapshot()
+    assert stats['total'] == completo.rows
+    assert stats['bytes'] == completo.total_bytes
+    assert stats['by_status'] == completo.status_counts
+    # pandas lee 'N/A' como vacío; las dos versiones la dejan fuera de las materias
+    materias = {m: n for m, n in stats['by_subject'].items() if m not in ('N/A', 'Otros', '')}
+    assert merge_variants(materias) == completo.subject_series().to_dict()
+    assert stats['by_user'] == completo.user_counts
+    assert {int(hora): n for hora, n in stats['by_hour'].items()} == completo.hour_counts
+    assert stats['by_day'] == {dia.date().isoformat(): n for dia, n in completo.day_counts.items()}
+
+
+def test_fila_con_fecha_ilegible_no_cuenta_en_ningun_modo(analizador, capsys):
+    import csv
+    from live_stats import LiveStats
+
+    with open(analizador.ADMIN_LOG_PATH, newline='', encoding='utf-8') as f:
+        campos = next(csv.reader(f))
+    with open(analizador.ADMIN_LOG_PATH, 'a', newline='', encoding='utf-8') as f:
+        fila = dict.fromkeys(campos, '')
+        fila.update(log_timestamp='sin fecha', status='MOVIDO', file_size_bytes='999', username='nadie')
+        csv.DictWriter(f, fieldnames=campos).writerow(fila)
+
+    analizador.importar_analisis_completo()
+    completo = analizador.LogAggregates.from_frame(analizador.cargar_admin_log())
+    assert analizador.resumen_rapido()
+    assert "1 filas con fecha ilegible no se cuentan" in capsys.readouterr().out
+
+    stats = LiveStats(analizador.ADMIN_LOG_PATH, analizador.STATS_SNAPSHOT_PATH).snapshot()
+    assert stats['total'] == completo.rows == 38
+    assert stats['bytes'] == completo.total_bytes
+    assert stats['by_status'] == completo.status_counts
+    assert stats['by_user'] == completo.user_counts
+
+
+def _guardar_perfiles(carpeta, nombre_csv, nombre_db):
+    """ Un perfil distinto en perfiles.csv y en perfiles.db (como tras volver al CSV). """
+    from profiles_store import CsvProfileStore, SqliteProfileStore
+
+    carpeta.mkdir(parents=True)
+    CsvProfileStore(carpeta / "perfiles.csv").put({'id_perfil': 'p1', 'nombre_visible': nombre_csv})
+    SqliteProfileStore(carpeta / "perfiles.db").put({'id_perfil': 'p1', 'nombre_visible': nombre_db})
+
+
+@pytest.mark.parametrize("backend, esperado", [(None, "Desde CSV"), ("csv", "Desde CSV"), ("sqlite", "Desde SQLite")])
+def test_perfiles_del_mismo_almacen_que_la_app(tmp_path, monkeypatch, backend, esperado):
+    _guardar_perfiles(tmp_path / "appdata" / "OrganizadorMaterias", "Desde CSV", "Desde SQLite")
+    if backend is None:
+        monkeypatch.delenv('ORGANIZADOR_PERFILES', raising=False)
+    else:
+        monkeypatch.setenv('ORGANIZADOR_PERFILES', backend)
+    monkeypatch.setenv('APPDATA', str(tmp_path / "appdata"))
+    modulo = _importar_analizador()
+    modulo.importar_analisis_completo()
+
+    perfiles = modulo.cargar_perfiles_locales()
+    assert list(perfiles['nombre_visible']) == [esperado]
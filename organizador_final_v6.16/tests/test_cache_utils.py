@@ -0,0 +1,30 @@
+# --- test_cache_utils.py ---
+
+import json
+import threading
+
+from cache_utils import PersistentJsonCache
+
+
+def test_guardados_simultaneos_no_se_pisan_el_temporal(tmp_path):
+    ruta = tmp_path / "cache.json"
+    cachés = [PersistentJsonCache(ruta) for _ in range(8)]
+    nombres_temporales = set()
+
+    def guardar(cache, n):
+        for i in range(50):
+            cache.put(f"{n}-{i}", "x" * 2000)
+            cache.save()
+
+    hilos = [threading.Thread(target=guardar, args=(cache, n)) for n, cache in enumerate(cachés)]
+    for hilo in hilos:
+        hilo.start()
+    while any(hilo.is_alive() for hilo in hilos):
+        nombres_temporales.update(p.name for p in tmp_path.glob("*.tmp"))
+    for hilo in hilos:
+        hilo.join()
+
+    guardado = json.loads(ruta.read_text(encoding='utf-8')) # Siempre un JSON completo
+    assert len(guardado) >= 50 and set(guardado.values()) == {"x" * 2000}
+    assert list(tmp_path.glob("*.tmp")) == []
+    assert all(nombre.startswith(".cache.json.") for nombre in nombres_temporales)
@@ -0,0 +1,43 @@
+# --- test_copier.py ---
+
+import os
+
+import pytest
+
+import copier
+from copier import CopyVerificationError, copy_file
+from destinations import place_file
+
+
+def test_copia_verificada_conserva_contenido_y_fechas(tmp_path):
+    origen = tmp_path / "origen.bin"
+    origen.write_bytes(os.urandom(300 * 1024))
+    os.utime(origen, ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+    destino = tmp_path / "destino.bin"
+
+    copy_file(origen, destino)
+
+    assert destino.read_bytes() == origen.read_bytes()
+    assert os.stat(destino).st_mtime_ns == os.stat(origen).st_mtime_ns
+
+
+def test_origen_que_crece_durante_la_copia_no_se_borra(tmp_path, monkeypatch):
+    origen = tmp_path / "creciendo.log"
+    origen.write_bytes(b"a" * 300_000)
+    destino = tmp_path / "otro_disco" / "creciendo.log"
+    destino.parent.mkdir()
+    destino.touch() # El marcador que deja claim()
+
+    copiar = copier._copy_range
+    def copiar_y_seguir_escribiendo(fd_in, fd_out, offset, length, sequential):
+        copiar(fd_in, fd_out, offset, length, sequential)
+        with open(origen, 'ab') as f: # Otro programa agrega al final mientras se copia
+            f.write(b"b" * 10)
+    monkeypatch.setattr(copier, '_copy_range', copiar_y_seguir_escribiendo)
+    monkeypatch.setattr('destinations.same_device', lambda a, b: False)
+
+    with pytest.raises(CopyVerificationError):
+        place_file(origen, destino)
+
+    assert origen.read_bytes() == b"a" * 300_000 + b"b" * 10
+    assert destino.stat().st_size == 0 # Marcador vacío: discard_placeholder lo borra
@@ -0,0 +1,86 @@
+# --- test_dedupe.py ---
+
+import os
+from pathlib import Path
+
+import pytest
+
+import dedupe
+from dedupe import (find_identical, files_identical, resolve_duplicate, BLOQUE_MUESTRA,
+                    DUPLICADOS_OMITIR, DUPLICADOS_BORRAR, DUPLICADOS_ENLAZAR, DUPLICADOS_RENOMBRAR)
+from destinations import DestinationIndex
+
+
+def _archivo(path, contenido):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(contenido)
+    return path
+
+
+def test_niveles_de_comparacion(tmp_path, monkeypatch):
+    grande = os.urandom(3 * BLOQUE_MUESTRA)
+    original = _archivo(tmp_path / "a.bin", grande)
+    copia = _archivo(tmp_path / "b.bin", grande)
+    medio = bytearray(grande)
+    medio[len(grande) // 2] ^= 0xFF # Solo cambia un byte del medio: pasa el nivel 2
+    distinto = _archivo(tmp_path / "c.bin", bytes(medio))
+
+    assert not files_identical(original, _archivo(tmp_path / "corto.bin", grande[:-1])) # Nivel 1
+    assert files_identical(original, copia)
+    assert not files_identical(original, distinto) # Nivel 3
+    os.link(original, tmp_path / "enlace.bin")
+    leidos = []
+    monkeypatch.setattr(dedupe, '_edge_hash', lambda *args: leidos.append(args))
+    assert files_identical(original, tmp_path / "enlace.bin") # Mismo inodo: sin leer nada
+    assert leidos == []
+
+
+def test_busca_entre_las_variantes_del_indice(tmp_path, monkeypatch):
+    destino = tmp_path / "destino"
+    origen = _archivo(tmp_path / "origen" / "tarea.pdf", b"tarea")
+    _archivo(destino / "tarea.pdf", b"otra cosa")
+    _archivo(destino / "tarea (1).pdf", b"tarea")
+    indice = DestinationIndex()
+    indice.contains(destino, "tarea.pdf") # La carpeta se lee aquí, una sola vez
+
+    probados = []
+    original = Path.exists
+    monkeypatch.setattr(Path, 'exists', lambda path: probados.append(path) or original(path))
+    assert find_identical(origen, destino, dest_index=indice) == destino / "tarea (1).pdf"
+    assert probados == []
+    assert find_identical(_archivo(tmp_path / "origen" / "nuevo.pdf", b"x"), destino, dest_index=indice) is None
+
+
+@pytest.mark.parametrize("modo, status", [
+    (DUPLICADOS_OMITIR, "DUPLICADO_OMITIDO"),
+    (DUPLICADOS_BORRAR, "DUPLICADO_BORRADO"),
+    (DUPLICADOS_ENLAZAR, "DUPLICADO_ENLAZADO"),
+])
+def test_modos_con_un_duplicado(tmp_path, modo, status):
+    origen = _archivo(tmp_path / "origen" / "tarea.pdf", b"tarea")
+    existente = _archivo(tmp_path / "destino" / "tarea.pdf", b"tarea")
+
+    assert resolve_duplicate(origen, existente, modo) == status
+    assert existente.read_bytes() == b"tarea"
+    if modo == DUPLICADOS_BORRAR:
+        assert not origen.exists()
+    else:
+        assert origen.read_bytes() == b"tarea"
+    if modo == DUPLICADOS_ENLAZAR:
+        assert os.path.samefile(origen, existente)
+    elif modo == DUPLICADOS_OMITIR:
+        assert not os.path.samefile(origen, existente)
+
+
+def test_mover_un_duplicado_segun_el_modo(app_aislada, tmp_path):
+    destino = tmp_path / "destino"
+    existente = _archivo(destino / "tarea.pdf", b"tarea")
+    origen = _archivo(tmp_path / "origen" / "tarea.pdf", b"tarea")
+
+    status, final, _ = app_aislada.move_entry(origen, destino, duplicates=DUPLICADOS_OMITIR)
+    assert (status, final) == ("DUPLICADO_OMITIDO", str(existente))
+    assert origen.exists()
+
+    status, final, _ = app_aislada.move_entry(origen, destino, duplicates=DUPLICADOS_RENOMBRAR)
+    assert (status, final) == ("RENOMBRADO", str(destino / "tarea (1).pdf"))
+    assert not origen.exists()
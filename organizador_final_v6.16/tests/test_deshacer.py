@@ -0,0 +1,43 @@
+# --- test_deshacer.py ---
+# "Deshacer" con los diarios de journal.py.
+
+import time
+
+import pytest
+
+
+def _ejecucion_terminada(store, origen, destino, movimientos):
+    """ Diario de una ejecución ya terminada: [(src, final)] movidos. """
+    header = {'profile_id': 'p1', 'source_dir': str(origen), 'dest_dir': str(destino)}
+    journal = store.start(header, [(str(src), str(final), 'materia') for src, final in movimientos])
+    for index, (_, final) in enumerate(movimientos):
+        journal.record_done(index, "MOVIDO", str(final), 1, "2025-11-01T10:00:00")
+    journal.mark_logged()
+    journal.close()
+    time.sleep(0.01) # created_at distinto para cada ejecución
+    return journal.run_id
+
+
+def test_deshace_de_la_mas_nueva_a_la_mas_vieja(app_aislada, tmp_path):
+    """ B movió lo que dejó A: aunque lleguen como [B, A], primero se deshace B. """
+    origen, medio, destino = tmp_path / "origen", tmp_path / "medio", tmp_path / "destino"
+    for carpeta in (origen, medio, destino):
+        carpeta.mkdir()
+    run_a = _ejecucion_terminada(app_aislada.run_journals, origen, medio, [(origen / "a.txt", medio / "a.txt")])
+    run_b = _ejecucion_terminada(app_aislada.run_journals, medio, destino, [(medio / "a.txt", destino / "a.txt")])
+    (destino / "a.txt").write_text("contenido")
+
+    report = app_aislada.undo_runs([run_b, run_a])
+
+    assert report['restored'] == 2 and report['conflicts'] == 0
+    assert (origen / "a.txt").read_text() == "contenido"
+    assert not (medio / "a.txt").exists() and not (destino / "a.txt").exists()
+    assert [fila['file_new_path'] for fila in app_aislada.filas_registradas] == [str(medio / "a.txt"), str(origen / "a.txt")]
+
+
+def test_rechaza_ids_repetidos(app_aislada, tmp_path):
+    run_id = _ejecucion_terminada(app_aislada.run_journals, tmp_path, tmp_path, [(tmp_path / "x", tmp_path / "y")])
+    (tmp_path / "y").write_text("y")
+    with pytest.raises(ValueError):
+        app_aislada.undo_runs([run_id, run_id])
+    assert (tmp_path / "y").exists() and app_aislada.filas_registradas == []
@@ -0,0 +1,93 @@
+# --- test_destinations.py ---
+
+import pytest
+
+from destinations import DestinationIndex, place_dir, place_file, discard_placeholder
+
+
+def _carpeta_con_archivo(path):
+    path.mkdir(parents=True)
+    (path / "apunte.txt").write_text("apunte")
+    return path
+
+
+def test_claim_reparte_sufijos_desde_memoria(tmp_path):
+    (tmp_path / "tarea.pdf").write_text("ya estaba")
+    indice = DestinationIndex()
+    assert indice.claim(tmp_path, "tarea.pdf") == tmp_path / "tarea (1).pdf"
+    assert indice.claim(tmp_path, "tarea.pdf") == tmp_path / "tarea (2).pdf"
+    assert (tmp_path / "tarea (2).pdf").read_bytes() == b"" # Marcador O_EXCL
+    assert indice.variants(tmp_path, "tarea.pdf") == [tmp_path / n for n in ("tarea.pdf", "tarea (1).pdf", "tarea (2).pdf")]
+
+
+@pytest.mark.parametrize("directory", [False, True])
+def test_claim_salta_lo_que_otro_creo_despues_del_escaneo(tmp_path, directory):
+    indice = DestinationIndex()
+    indice.contains(tmp_path, "tema") # Escaneo de la carpeta (vacía)
+    (tmp_path / "tema").mkdir() # Otro programa, a mitad de la ejecución
+    destino = indice.claim(tmp_path, "tema", directory=directory)
+    assert destino == tmp_path / "tema (1)"
+    assert destino.is_dir() == directory and destino.exists()
+
+
+def test_place_dir_no_pisa_una_carpeta_vacia(tmp_path):
+    origen = _carpeta_con_archivo(tmp_path / "origen" / "tema")
+    ajena = tmp_path / "destino" / "tema"
+    ajena.mkdir(parents=True)
+    with pytest.raises(FileExistsError):
+        place_dir(origen, ajena)
+    assert (origen / "apunte.txt").exists()
+    assert list(ajena.iterdir()) == []
+
+
+def test_place_dir_sobre_su_reserva(tmp_path):
+    origen = _carpeta_con_archivo(tmp_path / "origen" / "tema")
+    (tmp_path / "destino").mkdir()
+    destino = DestinationIndex().claim(tmp_path / "destino", "tema", directory=True)
+    assert destino.is_dir()
+    place_dir(origen, destino, claimed=True)
+    assert (destino / "apunte.txt").read_text() == "apunte"
+    assert not origen.exists()
+
+
+def test_place_dir_no_pisa_lo_escrito_en_la_reserva(tmp_path):
+    origen = _carpeta_con_archivo(tmp_path / "origen" / "tema")
+    (tmp_path / "destino").mkdir()
+    destino = DestinationIndex().claim(tmp_path / "destino", "tema", directory=True)
+    (destino / "ajeno.txt").write_text("de otro programa")
+    with pytest.raises(OSError):
+        place_dir(origen, destino, claimed=True)
+    discard_placeholder(destino)
+    assert (destino / "ajeno.txt").exists()
+    assert (origen / "apunte.txt").exists()
+
+
+def test_place_file_y_marcador_descartado(tmp_path):
+    indice = DestinationIndex()
+    origen = tmp_path / "tarea.pdf"
+    origen.write_text("tarea")
+    (tmp_path / "destino").mkdir()
+    destino = indice.claim(tmp_path / "destino", "tarea.pdf")
+    place_file(origen, destino)
+    assert destino.read_text() == "tarea" and not origen.exists()
+
+    sobrante = indice.claim(tmp_path / "destino", "otra.pdf")
+    carpeta = indice.claim(tmp_path / "destino", "tema", directory=True)
+    discard_placeholder(sobrante)
+    discard_placeholder(carpeta)
+    discard_placeholder(destino) # Ya tiene contenido: no es un marcador
+    assert not sobrante.exists() and not carpeta.exists() and destino.exists()
+
+
+def test_mover_carpeta_que_falla_no_deja_la_reserva(app_aislada, tmp_path, monkeypatch):
+    origen = _carpeta_con_archivo(tmp_path / "origen" / "tema")
+    destino = tmp_path / "destino"
+    destino.mkdir()
+
+    def falla(*args, **kwargs):
+        raise OSError("disco lleno")
+    monkeypatch.setattr(app_aislada, 'place_dir', falla)
+    with pytest.raises(OSError):
+        app_aislada.move_entry(origen, destino)
+    assert list(destino.iterdir()) == []
+    assert (origen / "apunte.txt").exists()
@@ -0,0 +1,56 @@
+# --- test_hashing.py ---
+
+import hashlib
+import os
+
+import pytest
+
+import hashing
+from hashing import HashCache, hash_file, hash_files
+
+
+def _sha256(datos):
+    return hashlib.sha256(datos).hexdigest()
+
+
+@pytest.mark.parametrize("tamano", [0, 1, 4095, 4096, 4097, 3 * 4096])
+def test_hash_file_en_bloques(tmp_path, tamano):
+    datos = os.urandom(tamano)
+    ruta = tmp_path / "archivo.bin"
+    ruta.write_bytes(datos)
+    assert hash_file(ruta, chunk_size=4096) == _sha256(datos)
+    assert hash_file(ruta, algorithm="md5") == hashlib.md5(datos).hexdigest()
+
+
+def test_hash_files_con_cache(tmp_path):
+    rutas = []
+    for i in range(5):
+        ruta = tmp_path / f"f{i}.txt"
+        ruta.write_text(f"contenido {i}")
+        rutas.append(str(ruta))
+    (tmp_path / "carpeta").mkdir()
+    cache = HashCache(tmp_path / "hashes.json")
+    todas = rutas + [str(tmp_path / "carpeta"), str(tmp_path / "no_existe.txt")]
+
+    hashes, stats = hash_files(todas, cache)
+    assert hashes == {ruta: _sha256(f"contenido {i}".encode()) for i, ruta in enumerate(rutas)}
+    assert (stats['hashed_files'], stats['hash_cache_hits']) == (5, 0)
+    assert stats['hashed_bytes'] == sum(os.path.getsize(ruta) for ruta in rutas)
+
+    cache.save()
+    os.utime(rutas[0], ns=(0, os.stat(rutas[0]).st_mtime_ns + 1_000_000_000)) # Cambió el mtime
+    with open(rutas[1], 'w') as f:
+        f.write("otro contenido, más largo") # Cambió el tamaño
+    hashes, stats = hash_files(todas, HashCache(tmp_path / "hashes.json")) # Caché releído del disco
+    assert (stats['hashed_files'], stats['hash_cache_hits']) == (2, 3)
+    assert hashes[rutas[1]] == _sha256("otro contenido, más largo".encode())
+
+
+def test_archivos_grandes_en_procesos(tmp_path, monkeypatch):
+    monkeypatch.setattr(hashing, 'UMBRAL_PROCESOS', 1000)
+    grande, chico = tmp_path / "grande.bin", tmp_path / "chico.bin"
+    grande.write_bytes(b"g" * 5000)
+    chico.write_bytes(b"c" * 10)
+    hashes, stats = hash_files([str(grande), str(chico)])
+    assert hashes == {str(grande): _sha256(b"g" * 5000), str(chico): _sha256(b"c" * 10)}
+    assert stats['hashed_files'] == 2
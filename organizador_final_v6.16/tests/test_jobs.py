@@ -0,0 +1,48 @@
+# --- test_jobs.py ---
+
+import threading
+
+from jobs import ESTADO_COMPLETADO, ESTADO_EN_COLA, MENSAJE_ESPERA, JobManager
+from scheduler import PathLocks
+
+
+def _esperar(job, timeout=5):
+    snapshot = job.snapshot()
+    while not job.finished:
+        snapshot = job.wait_for_change(snapshot['version'], timeout)
+    return job.snapshot()
+
+
+def test_tarea_que_espera_carpetas_no_ocupa_hilo(tmp_path):
+    manager = JobManager(max_workers=2, path_locks=PathLocks())
+    soltar = threading.Event()
+    orden = []
+
+    def tarea(nombre, esperar=False):
+        def func(job):
+            if esperar:
+                soltar.wait(5)
+            orden.append(nombre)
+            return nombre
+        return func
+
+    a = manager.submit("a", tarea("a", esperar=True), paths=[tmp_path / "compartida"])
+    b = manager.submit("b", tarea("b"), paths=[tmp_path / "compartida"])
+    d = manager.submit("d", tarea("d"), paths=[tmp_path / "compartida" / "sub"])
+    # Con 2 hilos: A usa uno y B y D esperan en cola, así C (otra carpeta) corre ya
+    c = manager.submit("c", tarea("c"), paths=[tmp_path / "otra"])
+    assert _esperar(c)['state'] == ESTADO_COMPLETADO
+    assert b.snapshot()['state'] == ESTADO_EN_COLA
+    assert b.snapshot()['progress']['current_file'] == MENSAJE_ESPERA
+
+    soltar.set()
+    for job in (a, b, d):
+        assert _esperar(job)['state'] == ESTADO_COMPLETADO
+    assert orden == ["c", "a", "b", "d"] # B y D (solapadas) en orden de llegada
+
+
+def test_sin_rutas_corre_como_siempre():
+    manager = JobManager(max_workers=1, path_locks=PathLocks())
+    job = manager.submit("x", lambda job: 42)
+    assert _esperar(job)['report'] == 42
+    assert manager.submit("y", lambda job: 1, paths=[]) is not None
@@ -0,0 +1,245 @@
+# --- test_journal.py ---
+
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from conftest import CARPETA_APP
+import journal as journal_mod
+from journal import JournalBusyError, JournalRun, JournalStore
+
+
+def _diario_cortado(store, tmp_path, movimientos=3, hechos=1):
+    """ Diario de una ejecución que se cortó tras 'hechos' movimientos (sin 'registrado'). """
+    entries = [(str(tmp_path / f"src_{i}.txt"), str(tmp_path / "dst" / f"src_{i}.txt"), 'materia') for i in range(movimientos)]
+    header = {'profile_id': 'p1', 'source_dir': str(tmp_path), 'dest_dir': str(tmp_path / "dst")}
+    journal = store.start(header, entries)
+    for index in range(hechos):
+        journal.record_done(index, "MOVIDO", entries[index][1], 1, "2025-11-01T10:00:00")
+    journal.close()
+    return journal.run_id
+
+
+def _abrir_en_otro_proceso(store, run_id):
+    """ Otro proceso reabre el diario y lo tiene abierto hasta que se le cierra stdin. """
+    codigo = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {str(CARPETA_APP)!r})
+        from journal import JournalStore
+        journal = JournalStore({str(store.folder)!r}).reopen({run_id!r})
+        print("abierto", flush=True)
+        sys.stdin.read()
+        journal.close()
+    """)
+    otro = subprocess.Popen([sys.executable, "-c", codigo], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    assert otro.stdout.readline().strip() == "abierto"
+    return otro
+
+
+def test_diario_abierto_en_otro_proceso_esta_en_uso(tmp_path):
+    store = JournalStore(tmp_path / "diarios")
+    run_id = _diario_cortado(store, tmp_path)
+    assert not store.in_use(run_id)
+
+    otro = _abrir_en_otro_proceso(store, run_id)
+    try:
+        assert store.in_use(run_id)
+        with pytest.raises(JournalBusyError):
+            store.reopen(run_id)
+    finally:
+        otro.stdin.close()
+        otro.wait(timeout=10)
+
+    assert not store.in_use(run_id)
+    store.reopen(run_id).close()
+
+
+def test_proceso_muerto_suelta_el_diario(tmp_path):
+    store = JournalStore(tmp_path / "diarios")
+    run_id = _diario_cortado(store, tmp_path)
+    otro = _abrir_en_otro_proceso(store, run_id)
+    otro.kill()
+    otro.wait(timeout=10)
+    assert not store.in_use(run_id)
+    assert [run.run_id for run in store.interrupted()] == [run_id]
+
+
+def test_reanudar_releyendo_una_ejecucion_que_otro_termino(app_aislada, tmp_path):
+    store = app_aislada.run_journals
+    run_id = _diario_cortado(store, tmp_path)
+    visto_al_arrancar = store.load(run_id)
+
+    otra_copia = store.reopen(run_id) # Otra copia de la app la termina primero
+    otra_copia.mark_logged()
+    otra_copia.close()
+
+    assert app_aislada.resume_run(visto_al_arrancar) == {'run_id': run_id, 'resumed': False}
+    assert app_aislada.filas_registradas == []
+    assert not store.in_use(run_id)
+
+
+def test_reabrir_corta_la_linea_a_medias(tmp_path):
+    store = JournalStore(tmp_path / "diarios")
+    run_id = _diario_cortado(store, tmp_path, movimientos=3, hechos=2)
+    path = store.path_for(run_id)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type":"hecho","index":2,"sta') # El proceso murió escribiendo
+
+    run = store.load(run_id)
+    assert sorted(run.done) == [0, 1] and not run.logged # Lo anterior a la línea cortada sí vale
+
+    journal = store.reopen(run_id)
+    journal.record_done(2, "MOVIDO", "x", 1, "2025-11-01T10:00:00")
+    journal.mark_logged()
+    journal.close()
+    assert path.read_bytes().endswith(b"\n")
+    run = store.load(run_id)
+    assert sorted(run.done) == [0, 1, 2] and run.logged
+    assert store.interrupted() == []
+
+
+def test_reanudar_y_deshacer_una_ejecucion_cortada(app_aislada, tmp_path):
+    """
+    Corte tras 3 movimientos planeados: el 0 quedó anotado, el 1 se movió
+    pero no alcanzó a anotarse y el 2 no se movió (solo está su marcador).
+    """
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    (destino / "calculo").mkdir(parents=True)
+    origen.mkdir()
+    nombres = ["calculo_0.pdf", "calculo_1.pdf", "calculo_2.pdf"]
+    for nombre in nombres:
+        (origen / nombre).write_text(nombre)
+    header = {'profile_id': 'p1', 'source_dir': str(origen), 'dest_dir': str(destino),
+              'manejo_otros': 'Ignorar', 'subjects': ['calculo'], 'duplicates': None}
+    store = app_aislada.run_journals
+    journal = store.start(header, [(str(origen / n), str(destino / "calculo" / n), 'calculo') for n in nombres])
+    (origen / nombres[0]).rename(destino / "calculo" / nombres[0])
+    journal.record_done(0, "MOVIDO", str(destino / "calculo" / nombres[0]), 13, "2025-11-01T10:00:00")
+    journal.close()
+    (origen / nombres[1]).rename(destino / "calculo" / nombres[1])
+    (destino / "calculo" / nombres[2]).touch() # Marcador de claim()
+
+    run = store.interrupted()[0]
+    report = app_aislada.resume_run(run)
+
+    assert report['moved'] == 3 and report['errors'] == 0
+    assert sorted(p.name for p in (destino / "calculo").iterdir()) == nombres
+    assert [p.name for p in origen.iterdir()] == []
+    assert all((destino / "calculo" / n).read_text() == n for n in nombres)
+    assert store.interrupted() == [] and not store.in_use(run.run_id)
+    assert [fila['status'] for fila in app_aislada.filas_registradas] == ["MOVIDO"] * 3
+
+    deshecho = app_aislada.undo_runs([run.run_id])
+    assert deshecho['restored'] == 3 and deshecho['conflicts'] == 0
+    assert sorted(p.name for p in origen.iterdir()) == nombres
+    assert list((destino / "calculo").iterdir()) == []
+    assert len(store.load(run.run_id).undone) == 3
+
+
+def _ejecucion_cortada(app_aislada, tmp_path, nombres):
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    (destino / "calculo").mkdir(parents=True)
+    origen.mkdir()
+    for nombre in nombres:
+        (origen / nombre).write_text(nombre)
+    header = {'profile_id': 'p1', 'source_dir': str(origen), 'dest_dir': str(destino),
+              'manejo_otros': 'Ignorar', 'subjects': ['calculo'], 'duplicates': None}
+    entries = [(str(origen / n), str(destino / "calculo" / n), 'calculo') for n in nombres]
+    return origen, destino / "calculo", header, entries
+
+
+def test_reanudar_usa_el_nombre_que_aparto_claim(app_aislada, tmp_path):
+    """ claim() apartó "(1)" porque el nombre planeado ya lo ocupaba un archivo vacío ajeno. """
+    origen, calculo, header, entries = _ejecucion_cortada(app_aislada, tmp_path, ["calculo_0.pdf", "calculo_1.pdf"])
+    store = app_aislada.run_journals
+    journal = store.start(header, entries)
+    (calculo / "calculo_0.pdf").touch() # Archivo vacío de otro programa, creado a mitad de la ejecución
+    (calculo / "calculo_0 (1).pdf").touch()
+    journal.record_claimed(0, str(calculo / "calculo_0 (1).pdf"))
+    (calculo / "calculo_1.pdf").touch()
+    journal.record_claimed(1, str(calculo / "calculo_1 (1).pdf"))
+    (origen / "calculo_1.pdf").rename(calculo / "calculo_1 (1).pdf")
+    journal.close()
+
+    report = app_aislada.resume_run(store.interrupted()[0])
+
+    assert report['renamed'] == 2 and report['errors'] == 0
+    assert (calculo / "calculo_0.pdf").read_bytes() == b"" # El archivo ajeno sigue ahí
+    assert (calculo / "calculo_1.pdf").read_bytes() == b""
+    assert (calculo / "calculo_0 (1).pdf").read_text() == "calculo_0.pdf"
+    assert (calculo / "calculo_1 (1).pdf").read_text() == "calculo_1.pdf"
+    assert [fila['status'] for fila in app_aislada.filas_registradas] == ["RENOMBRADO"] * 2
+
+
+def test_reanudar_sin_reserva_no_toca_archivos_anteriores(app_aislada, tmp_path):
+    """
+    Sin registro "reservado" (no alcanzó a sincronizarse) lo que ya estaba
+    en el destino antes de la ejecución no se borra ni se da por movido.
+    """
+    origen, calculo, header, entries = _ejecucion_cortada(app_aislada, tmp_path, ["calculo_0.pdf", "calculo_1.pdf"])
+    (calculo / "calculo_0.pdf").touch()
+    (calculo / "calculo_1.pdf").write_text("otro")
+    time.sleep(2 * app_aislada.HOLGURA_RELOJ_SEGUNDOS)
+    store = app_aislada.run_journals
+    store.start(header, entries).close()
+    (origen / "calculo_1.pdf").unlink() # El usuario lo borró
+
+    report = app_aislada.resume_run(store.interrupted()[0])
+
+    assert report['renamed'] == 1 and report['errors'] == 1
+    assert (calculo / "calculo_0.pdf").read_bytes() == b""
+    assert (calculo / "calculo_0 (1).pdf").read_text() == "calculo_0.pdf"
+    assert (calculo / "calculo_1.pdf").read_text() == "otro"
+    assert [fila['status'] for fila in app_aislada.filas_registradas] == ["RENOMBRADO", "ERROR"]
+
+
+def test_recientes_e_interrumpidas_sin_leer_todos_los_diarios(tmp_path, monkeypatch):
+    store = JournalStore(tmp_path / "diarios")
+    terminados = []
+    for _ in range(5):
+        journal = store.start({'profile_id': 'p1'}, [("a", "b", "m")] * 300)
+        for index in range(300):
+            journal.record_done(index, "MOVIDO", "b", 1, "2025-11-01T10:00:00")
+        journal.mark_logged()
+        for index in range(300): # Los "deshecho" van después del "registrado"
+            journal.record_undone(index, "MOVIDO")
+        journal.close()
+        terminados.append(journal.run_id)
+    cortado = _diario_cortado(store, tmp_path)
+
+    leidos = []
+    monkeypatch.setattr(journal_mod, 'JournalRun', lambda path: leidos.append(path.stem) or JournalRun(path))
+    assert [run.run_id for run in store.interrupted()] == [cortado]
+    assert leidos == [cortado]
+    leidos.clear()
+    assert [s['run_id'] for s in store.recent(2)] == [cortado, terminados[-1]]
+    assert leidos == [cortado, terminados[-1]]
+
+
+def test_podar_borra_ejecuciones_enteras_no_bloques(app_aislada, tmp_path, monkeypatch):
+    """ Un recorrido recursivo escribe un diario por bloque: se guardan o se borran todos juntos. """
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    (origen / "sub").mkdir(parents=True)
+    for nombre in ("calculo_0.pdf", "calculo_1.pdf", "sub/calculo_2.pdf"):
+        (origen / nombre).write_text(nombre)
+    monkeypatch.setattr(app_aislada, 'ENTRADAS_POR_BLOQUE', 1)
+    from traversal import SourceWalker
+    report = app_aislada.organize_by_subject(str(origen), str(destino), "calculo", "Ignorar", "p1",
+                                             walker=SourceWalker(origen, max_depth=None))
+    bloques = report['run_ids']
+    assert len(bloques) >= 3
+    store = app_aislada.run_journals
+    sueltas = [_diario_cortado(store, tmp_path, hechos=3) for _ in range(2)]
+    for run_id in sueltas:
+        journal = store.reopen(run_id)
+        journal.mark_logged()
+        journal.close()
+
+    store.prune(keep=3)
+    assert all(store.load(run_id) for run_id in bloques + sueltas)
+    store.prune(keep=2)
+    assert [store.load(run_id) for run_id in bloques] == [None] * len(bloques)
+    assert all(store.load(run_id) for run_id in sueltas)
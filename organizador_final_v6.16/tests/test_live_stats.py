@@ -0,0 +1,100 @@
+# --- test_live_stats.py ---
+
+import csv
+import shutil
+from pathlib import Path
+
+from live_stats import LiveStats, parse_timestamp
+
+LOG_ENTREGADO = Path(__file__).resolve().parent.parent / "admin_log.csv"
+
+
+def _filas_del_log(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_parse_timestamp_acepta_z_y_fracciones_cortas():
+    moment = parse_timestamp("2025-11-01T10:15:01.123Z")
+    assert moment is not None
+    assert (moment.hour, moment.microsecond, moment.utcoffset().total_seconds()) == (10, 123000, 0)
+    assert parse_timestamp("2025-11-01 10:15:01.1234567+0530").microsecond == 123456
+    assert parse_timestamp("2025-11-01T10:15:01").tzinfo is None
+
+
+def test_parse_timestamp_rechaza_lo_ilegible():
+    for text in ("", "ayer", "2025-13-01T10:00:00", "2025-11-01T25:00:00Z"):
+        assert parse_timestamp(text) is None
+
+
+def test_log_entregado_cuenta_todas_las_filas(tmp_path):
+    log = tmp_path / "admin_log.csv"
+    shutil.copy(LOG_ENTREGADO, log)
+    filas = _filas_del_log(log)
+    assert len(filas) == 38
+
+    stats = LiveStats(log, tmp_path / "stats.json")
+    stats.load()
+    c = stats.snapshot()
+    assert c['total'] == 38
+    assert sum(c['by_hour'].values()) == 38
+    assert sum(c['by_day'].values()) == 38
+    assert c['bytes'] == sum(int(float(f['file_size_bytes'] or 0)) for f in filas)
+
+    # La foto en disco da lo mismo al volver a cargar
+    otra = LiveStats(log, tmp_path / "stats.json")
+    assert otra.load()['from_snapshot']
+    assert otra.snapshot()['total'] == 38
+
+
+def test_fecha_ilegible_no_cuenta(tmp_path):
+    log = tmp_path / "admin_log.csv"
+    campos = ['log_timestamp', 'username', 'status', 'subject_assigned', 'file_size_bytes']
+    with open(log, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=campos)
+        writer.writeheader()
+        writer.writerow({'log_timestamp': '2025-11-01T10:15:01.5Z', 'username': 'ana',
+                         'status': 'MOVIDO', 'subject_assigned': 'Fisica', 'file_size_bytes': '100'})
+        writer.writerow({'log_timestamp': 'sin fecha', 'username': 'beto',
+                         'status': 'ERROR', 'subject_assigned': 'Quimica', 'file_size_bytes': '50'})
+
+    stats = LiveStats(log, tmp_path / "stats.json")
+    stats.load()
+    c = stats.snapshot()
+    assert c['total'] == 1 and c['bad_timestamp'] == 1
+    assert c['bytes'] == 100
+    assert c['by_status'] == {'MOVIDO': 1}
+    assert c['by_subject'] == {'Fisica': 1}
+    assert c['by_user'] == {'ana': 1}
+    assert c['by_hour'] == {'10': 1}
+    assert c['by_day'] == {'2025-11-01': 1}
+    assert c['first_timestamp'] == c['last_timestamp'] == '2025-11-01T10:15:01.5Z'
+
+
+def test_la_foto_se_guarda_de_a_ratos(tmp_path, monkeypatch):
+    import live_stats
+    monkeypatch.setattr(live_stats, 'GUARDAR_CADA_SEGUNDOS', 3600)
+    monkeypatch.setattr(live_stats, 'GUARDAR_CADA_FILAS', 3)
+    log, foto = tmp_path / "admin_log.csv", tmp_path / "stats.json"
+    log.write_text("log_timestamp,status\n", encoding='utf-8')
+    stats = LiveStats(log, foto)
+    stats.load()
+    guardada = foto.read_bytes()
+
+    def escribir(n):
+        start = log.stat().st_size
+        with open(log, 'a', encoding='utf-8', newline='') as f:
+            f.write("2025-11-01T10:00:00,MOVIDO\n" * n)
+        stats.record([{'log_timestamp': '2025-11-01T10:00:00', 'status': 'MOVIDO'}] * n, start, log.stat().st_size)
+
+    escribir(2)
+    assert foto.read_bytes() == guardada # Aún no toca guardar
+    escribir(1) # Tercera fila sin guardar: ahora sí
+    assert foto.read_bytes() != guardada
+    guardada = foto.read_bytes()
+    escribir(1)
+    stats.flush()
+    assert foto.read_bytes() != guardada
+    otra = LiveStats(log, foto)
+    assert otra.load() == {'from_snapshot': True, 'rows_new': 0, 'rebuilt': False}
+    assert otra.snapshot()['total'] == 4
@@ -0,0 +1,72 @@
+# --- test_log_cache.py ---
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from log_cache import LogIngestCache, LogColumnsError  # noqa: E402
+
+CABECERA = "log_timestamp,username,id_perfil,file_size_bytes,subject_assigned,status\n"
+
+
+def _fila(i, usuario="ana"):
+    return f"2025-11-01T10:{i // 60 % 60:02d}:{i % 60:02d},{usuario},p1,{i * 10},Fisica,MOVIDO\n"
+
+
+def _log(ruta, filas, cabecera=CABECERA):
+    ruta.write_text(cabecera + ''.join(filas), encoding='utf-8')
+    return ruta
+
+
+def _completo(ruta, tmp_path):
+    """ Lectura desde cero (otra carpeta de caché) para comparar. """
+    df, _ = LogIngestCache(ruta, tmp_path / "cache_completo").load(rebuild=True)
+    return df
+
+
+def _iguales(a, b):
+    pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True))
+
+
+def test_agregar_filas_solo_lee_lo_nuevo(tmp_path):
+    log = _log(tmp_path / "admin_log.csv", [_fila(i) for i in range(10)])
+    cache = LogIngestCache(log, tmp_path / "cache")
+    _, info = cache.load()
+    assert info['rebuilt'] and info['rows_new'] == 10
+
+    with open(log, 'a', encoding='utf-8') as f:
+        f.write(''.join(_fila(i, "beto") for i in range(10, 15)))
+        f.write(_fila(15)[:12]) # Línea a medio escribir: espera a la próxima lectura
+    df, info = cache.load()
+    assert not info['rebuilt'] and (info['rows_cached'], info['rows_new']) == (10, 5)
+    _iguales(df, _completo(log, tmp_path).iloc[:15])
+
+    _, info = LogIngestCache(log, tmp_path / "cache").load()
+    assert not info['rebuilt'] and info['rows_new'] == 0
+
+
+@pytest.mark.parametrize("cambio", ["truncado", "reescrito_mas_largo", "reescrito_mismo_tamano", "otra_cabecera"])
+def test_el_cache_se_reconstruye_si_el_log_cambio(tmp_path, cambio):
+    log = _log(tmp_path / "admin_log.csv", [_fila(i) for i in range(10)])
+    cache = LogIngestCache(log, tmp_path / "cache")
+    cache.load()
+
+    if cambio == "truncado":
+        _log(log, [_fila(i) for i in range(4)])
+    elif cambio == "reescrito_mas_largo":
+        _log(log, [_fila(i, "carla") for i in range(12)])
+    elif cambio == "reescrito_mismo_tamano":
+        _log(log, [_fila(i, "ema") for i in range(10)])
+    else:
+        _log(log, [_fila(i) for i in range(10)], CABECERA.replace("status", "estado"))
+
+    df, info = cache.load()
+    assert info['rebuilt']
+    _iguales(df, _completo(log, tmp_path))
+
+
+def test_faltan_columnas(tmp_path):
+    log = _log(tmp_path / "admin_log.csv", [_fila(0)])
+    with pytest.raises(LogColumnsError) as error:
+        LogIngestCache(log, tmp_path / "cache", ['log_timestamp', 'file_hash']).load()
+    assert error.value.missing == ['file_hash']
@@ -0,0 +1,65 @@
+# --- test_log_writer.py ---
+
+import csv
+import threading
+
+from log_writer import AdminLogWriter
+
+CAMPOS = ['log_timestamp', 'username', 'status', 'file_size_bytes']
+CABECERA = b"log_timestamp,username,status,file_size_bytes\r\n"
+FILA = b"2025-11-01T10:00:00,ana,MOVIDO,10"
+
+
+def _filas(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _nueva():
+    return {'log_timestamp': '2025-11-02T09:00:00', 'username': 'beto', 'status': 'ERROR', 'file_size_bytes': 0}
+
+
+def test_corta_la_fila_a_medias(tmp_path):
+    log = tmp_path / "admin_log.csv"
+    log.write_bytes(CABECERA + FILA + b"\r\n" + b"2025-11-01T10:00:01,an")
+    writer = AdminLogWriter(log, CAMPOS)
+
+    assert writer.repair() == len(b"2025-11-01T10:00:01,an")
+    writer.write([_nueva()])
+    assert [fila['username'] for fila in _filas(log)] == ['ana', 'beto']
+
+
+def test_fila_completa_sin_salto_de_linea_se_queda(tmp_path):
+    log = tmp_path / "admin_log.csv"
+    log.write_bytes(CABECERA + FILA) # Editado a mano: la última fila sin "\r\n"
+    writer = AdminLogWriter(log, CAMPOS)
+
+    assert writer.repair() == 0
+    assert log.read_bytes() == CABECERA + FILA + b"\r\n"
+    writer.write([_nueva()])
+    assert [fila['username'] for fila in _filas(log)] == ['ana', 'beto']
+
+
+def test_comillas_abiertas_no_son_fila_completa(tmp_path):
+    log = tmp_path / "admin_log.csv"
+    log.write_bytes(CABECERA + b'2025-11-01T10:00:00,"ana, la,MOVIDO,10')
+    assert AdminLogWriter(log, CAMPOS).repair() > 0
+    assert log.read_bytes() == CABECERA
+
+
+def test_escrituras_concurrentes_no_se_mezclan(tmp_path):
+    log = tmp_path / "admin_log.csv"
+    writer = AdminLogWriter(log, CAMPOS)
+
+    def escribir(hilo):
+        for i in range(50):
+            writer.write([{'log_timestamp': f'{hilo}-{i}', 'username': f'u{hilo}', 'status': 'MOVIDO', 'file_size_bytes': i}])
+    hilos = [threading.Thread(target=escribir, args=(n,)) for n in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    filas = _filas(log)
+    assert len(filas) == 200
+    assert sorted(fila['log_timestamp'] for fila in filas) == sorted(f'{h}-{i}' for h in range(4) for i in range(50))
@@ -0,0 +1,60 @@
+# --- test_matcher.py ---
+# El autómata (SubjectMatcher) y el bucle clásico (_ListMatcher) deben
+# elegir SIEMPRE la misma materia: cuál se usa depende solo del tamaño
+# del perfil (UMBRAL_AUTOMATA).
+
+import random
+
+import pytest
+
+import matcher
+from matcher import MODOS_COINCIDENCIA, SubjectMatcher, _ListMatcher, get_subject_matcher
+
+LETRAS = "abcde " # Alfabeto chico: muchos prefijos y sufijos compartidos
+
+
+def _texto(rnd, largo):
+    return ''.join(rnd.choice(LETRAS) for _ in range(largo))
+
+
+@pytest.mark.parametrize("modo", MODOS_COINCIDENCIA)
+@pytest.mark.parametrize("semilla", range(5))
+def test_automata_igual_que_lista(modo, semilla):
+    rnd = random.Random(semilla)
+    for _ in range(40):
+        materias = [_texto(rnd, rnd.randint(1, 5)) for _ in range(rnd.randint(1, 80))]
+        materias += rnd.sample(materias, min(3, len(materias))) # Repetidas: gana la primera
+        automata, lista = SubjectMatcher(materias, modo), _ListMatcher(materias, modo)
+        for _ in range(50):
+            texto = _texto(rnd, rnd.randint(0, 30))
+            assert automata.match(texto) == lista.match(texto), (materias, texto)
+
+
+@pytest.mark.parametrize("modo", MODOS_COINCIDENCIA)
+def test_casos_borde(modo):
+    casos = [
+        (["he", "she", "his", "hers"], ["ushers", "ahishers", "h", ""]),
+        (["abc", "bc", "c"], ["xabcx", "bcc", "ab"]),
+        (["", "ab"], ["ab", "zz", ""]),                 # "" siempre aparece
+        (["calculo ii", "calculo"], ["calculo ii.pdf", "calculo i.pdf"]),
+    ]
+    for materias, textos in casos:
+        automata, lista = SubjectMatcher(materias, modo), _ListMatcher(materias, modo)
+        for texto in textos:
+            assert automata.match(texto) == lista.match(texto), (materias, texto)
+
+
+@pytest.mark.parametrize("modo", MODOS_COINCIDENCIA)
+def test_palabras_completas_igual_con_y_sin_automata(modo, monkeypatch):
+    rnd = random.Random(7)
+    materias = tuple(' '.join(_texto(rnd, 3).split()) or "a" for _ in range(30))
+    textos = [_texto(rnd, 25) for _ in range(300)]
+
+    con_lista = [get_subject_matcher(materias, modo, whole_words=True).match(t) for t in textos]
+    matcher._build_matcher.cache_clear()
+    monkeypatch.setattr(matcher, 'UMBRAL_AUTOMATA', 1)
+    con_automata = [get_subject_matcher(materias, modo, whole_words=True).match(t) for t in textos]
+    matcher._build_matcher.cache_clear()
+
+    assert con_automata == con_lista
+    assert any(con_lista)
@@ -0,0 +1,53 @@
+# --- test_normalizer.py ---
+
+import random
+import unicodedata
+
+import pytest
+
+from normalizer import (get_normalizer, merge_variants, normalize_text, TextNormalizer, RANGOS_LATINOS,
+                        PLEGADO_CLASICO, PLEGADO_MATERIAS, PLEGAR_ACENTOS, PLEGAR_PUNTUACION, PLEGAR_SEPARADORES)
+
+
+def _nfd_clasico(text):
+    """ El normalize_text original: minúsculas, NFD y sin marcas, carácter por carácter. """
+    return ''.join(c for c in unicodedata.normalize('NFD', text.lower()) if unicodedata.category(c) != 'Mn')
+
+
+def _caracteres():
+    """ Todo el rango latino de la tabla más griego, cirílico y marcas sueltas. """
+    codigos = [code for rango in RANGOS_LATINOS for code in rango]
+    codigos += list(range(0x0300, 0x0370)) + list(range(0x0370, 0x0530)) + [0x00DF, 0x0130, 0x212A, 0xFB01]
+    return [chr(code) for code in codigos]
+
+
+def test_la_tabla_da_lo_mismo_que_nfd_caracter_por_caracter():
+    distintos = [c for c in _caracteres() if normalize_text(c) != _nfd_clasico(c)]
+    assert distintos == []
+
+
+def test_la_tabla_da_lo_mismo_que_nfd_en_nombres_mezclados():
+    azar = random.Random(7)
+    alfabeto = _caracteres() + list("abcXYZ 019_-.()")
+    for _ in range(2000):
+        nombre = ''.join(azar.choice(alfabeto) for _ in range(azar.randint(1, 12)))
+        assert normalize_text(nombre) == _nfd_clasico(nombre), repr(nombre)
+    # Marcas combinadas después de una letra precompuesta (el orden canónico las reordena)
+    assert normalize_text("Ạ́ ạ́") == _nfd_clasico("Ạ́ ạ́") == "a a"
+
+
+def test_opciones_de_plegado():
+    materias = get_normalizer(PLEGADO_MATERIAS)
+    assert materias("Cálculo-II") == materias("calculo_ii") == materias("  calculo   ii ") == "calculo ii"
+    puntuacion = get_normalizer((PLEGAR_PUNTUACION,))
+    assert puntuacion("(II)") == "II" and puntuacion("C++") == "C" and puntuacion("Ñu«»") == "Ñu"
+    assert get_normalizer((PLEGAR_ACENTOS,))("Cálculo") == "Calculo"
+    assert get_normalizer((PLEGAR_SEPARADORES,))("a_b") == "a b"
+    assert get_normalizer(None) is get_normalizer(PLEGADO_CLASICO)
+    assert get_normalizer(())("Cálculo_II") == "Cálculo_II"
+    with pytest.raises(ValueError):
+        TextNormalizer(("mayusculas", "inventada"))
+
+
+def test_merge_variants_junta_con_el_primer_nombre():
+    assert merge_variants({"Cálculo II": 2, "calculo_ii": 3, "Física": 1}) == {"Cálculo II": 5, "Física": 1}
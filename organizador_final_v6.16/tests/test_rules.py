@@ -0,0 +1,95 @@
+# --- test_rules.py ---
+
+import os
+
+import pytest
+
+from rules import RuleError, RuleSet, parse_rules
+
+AHORA = 2_000_000_000.0 # Fijo y entero: las edades se comparan exactas
+DIA = 86400
+
+
+def _regla(texto):
+    return RuleSet(parse_rules(texto))
+
+
+def _archivo(tmp_path, nombre, tamano=0, edad=0):
+    ruta = tmp_path / nombre
+    ruta.write_bytes(b"x" * tamano)
+    os.utime(ruta, (AHORA - edad, AHORA - edad))
+    return ruta
+
+
+@pytest.mark.parametrize("condicion, aceptados, rechazados", [
+    ("tamano>1KB", [1025], [1024, 0]),
+    ("tamano>=1KB", [1024, 1025], [1023]),
+    ("tamano<1KB", [1023, 0], [1024]),
+    ("tamano<=1KB", [1024], [1025]),
+    ("tamano>1.5KB", [1537], [1536]),
+    ("tamano<1.5B", [0, 1], [2]),
+    ("tamano>=1KB tamano<2KB", [1024, 2047], [1023, 2048]),
+])
+def test_bordes_de_tamano(tmp_path, condicion, aceptados, rechazados):
+    reglas = _regla(f"Destino: {condicion}")
+    for tamano in aceptados:
+        assert reglas.match(_archivo(tmp_path, f"a{tamano}.bin", tamano=tamano), AHORA) == "Destino", tamano
+    for tamano in rechazados:
+        assert reglas.match(_archivo(tmp_path, f"r{tamano}.bin", tamano=tamano), AHORA) is None, tamano
+
+
+@pytest.mark.parametrize("condicion, aceptadas, rechazadas", [
+    ("edad>30d", [30 * DIA + 1], [30 * DIA, 0]),
+    ("edad>=30d", [30 * DIA, 30 * DIA + 1], [30 * DIA - 1]),
+    ("edad<12h", [12 * 3600 - 1, 0], [12 * 3600]),
+    ("edad<=12h", [12 * 3600], [12 * 3600 + 1]),
+])
+def test_bordes_de_edad(tmp_path, condicion, aceptadas, rechazadas):
+    reglas = _regla(f"Destino: {condicion}")
+    for edad in aceptadas:
+        assert reglas.match(_archivo(tmp_path, f"a{edad}.txt", edad=edad), AHORA) == "Destino", edad
+    for edad in rechazadas:
+        assert reglas.match(_archivo(tmp_path, f"r{edad}.txt", edad=edad), AHORA) is None, edad
+
+
+def test_tamano_solo_para_archivos(tmp_path):
+    (tmp_path / "carpeta").mkdir()
+    assert _regla("Grandes: tamano>=0B").match(tmp_path / "carpeta", AHORA) is None
+
+
+def test_prioridad_y_empates(tmp_path):
+    ruta = _archivo(tmp_path, "tarea_final.pdf")
+    # Empate de prioridad: gana la que está antes, aunque una mire la extensión y la otra no
+    assert _regla("Generica: regex=tarea\nPdf: ext=pdf").match(ruta, AHORA) == "Generica"
+    assert _regla("Pdf: ext=pdf\nGenerica: regex=tarea").match(ruta, AHORA) == "Pdf"
+    assert _regla("Generica: regex=tarea prioridad=1\nPdf: ext=pdf prioridad=1").match(ruta, AHORA) == "Generica"
+    # Mayor prioridad gana aunque esté después (también entre las candidatas por extensión)
+    assert _regla("Generica: regex=tarea\nPdf: ext=pdf prioridad=2").match(ruta, AHORA) == "Pdf"
+    assert _regla("Pdf: ext=pdf prioridad=-1\nGenerica: regex=final").match(ruta, AHORA) == "Generica"
+
+
+@pytest.mark.parametrize("texto", ["Sin dos puntos", "X: tamano=10MB", "X: ext>pdf", "X: edad>3 años", "X: regex=(",
+                                   "..: ext=pdf", ".: ext=pdf", " ... : regex=x"])
+def test_reglas_mal_escritas(texto):
+    with pytest.raises(RuleError):
+        parse_rules(texto)
+
+
+@pytest.mark.parametrize("nombre", ["..", ".", "...", " .. ", ""])
+def test_carpeta_de_puntos_no_sale_del_destino(nombre):
+    app = pytest.importorskip("app")
+    assert app.sanitize_folder_name(nombre) == "Sin_Nombre"
+    assert app.sanitize_folder_name("..materia") == "..materia"
+
+
+def test_el_contador_de_stat_cuenta_las_llamadas(app_aislada, tmp_path):
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    origen.mkdir()
+    for nombre in ("a.pdf", "b.pdf", "c.txt"):
+        (origen / nombre).write_text(nombre)
+    # Solo los .pdf llegan a la regla que mira el tamaño: 3 lstat + 2 stat
+    plan = app_aislada.plan_organization(str(origen), str(destino), "", "Mover", "p1",
+                                         rules=_regla("Grandes: ext=pdf tamano>=1B"))
+    assert plan['metrics'].report()['counters']['stat'] == 5
+    reporte = app_aislada.execute_plan(plan)
+    assert reporte['metrics']['counters']['stat'] == 5 + 3 # Uno por movimiento
@@ -0,0 +1,70 @@
+# --- test_traversal.py ---
+
+import os
+
+import pytest
+
+from traversal import SourceWalker, parse_patterns
+
+
+def _arbol(raiz):
+    """ raiz/{a.txt, venv/x.py, tema/{b.txt, sub/c.txt}} """
+    for relativa in ("a.txt", "venv/x.py", "tema/b.txt", "tema/sub/c.txt"):
+        ruta = raiz / relativa
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(relativa)
+    return raiz
+
+
+def _relativas(walker):
+    return sorted(os.path.relpath(ruta, walker.root).replace(os.sep, "/") for ruta in walker)
+
+
+def _enlace(ruta, destino):
+    try:
+        os.symlink(destino, ruta, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("El sistema no permite crear enlaces simbólicos")
+
+
+def test_profundidad_y_exclusiones(tmp_path):
+    raiz = _arbol(tmp_path / "origen")
+    assert _relativas(SourceWalker(raiz)) == ["a.txt", "tema"]
+    assert _relativas(SourceWalker(raiz, max_depth=1)) == ["a.txt", "tema/b.txt", "tema/sub"]
+    walker = SourceWalker(raiz, max_depth=None, prune=parse_patterns("venv, *.TXT"))
+    assert _relativas(walker) == []
+    assert walker.pruned == 4 and walker.dirs_visited == 3
+
+
+def test_enlace_hacia_arriba_no_crea_un_ciclo(tmp_path):
+    raiz = _arbol(tmp_path / "origen")
+    _enlace(raiz / "tema" / "sub" / "arriba", raiz / "tema")
+    walker = SourceWalker(raiz, max_depth=None, follow_symlinks=True)
+    assert _relativas(walker) == ["a.txt", "tema/b.txt", "tema/sub/c.txt"]
+    assert walker.loops == 1
+
+
+def test_enlace_a_una_carpeta_de_afuera_no_se_recorre(tmp_path):
+    raiz = _arbol(tmp_path / "origen")
+    afuera = _arbol(tmp_path / "afuera")
+    _enlace(raiz / "atajo", afuera)
+    _enlace(raiz / "tema" / "atajo_interno", raiz / "venv")
+
+    walker = SourceWalker(raiz, max_depth=None, prune=(), follow_symlinks=True)
+    rutas = _relativas(walker)
+    assert "atajo" in rutas and not any(ruta.startswith("atajo/") for ruta in rutas)
+    assert "tema/atajo_interno/x.py" in rutas # Dentro del origen sí se sigue
+    assert _relativas(SourceWalker(raiz, max_depth=None, prune=())).count("tema/atajo_interno") == 1
+
+
+def test_organizar_no_saca_archivos_por_un_enlace_de_afuera(app_aislada, tmp_path):
+    raiz = _arbol(tmp_path / "origen")
+    afuera = _arbol(tmp_path / "afuera")
+    _enlace(raiz / "atajo", afuera)
+    destino = tmp_path / "destino"
+    app_aislada.organize_by_subject(str(raiz), str(destino), "", "Mover", "p1",
+                                   walker=SourceWalker(raiz, max_depth=None, follow_symlinks=True,
+                                                       exclude=[destino]))
+    assert sorted(p.name for p in (destino / "Otros").iterdir()) == ["a.txt", "b.txt", "c.txt"]
+    assert (afuera / "a.txt").exists() and (afuera / "tema" / "sub" / "c.txt").exists()
+    assert (raiz / "atajo").is_symlink()
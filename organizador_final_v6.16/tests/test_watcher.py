@@ -0,0 +1,69 @@
+# --- test_watcher.py ---
+
+import sys
+import threading
+
+import pytest
+
+import watcher
+from watcher import FolderWatch, PollingWatcher, StabilityTracker, BACKEND_INOTIFY, BACKEND_SONDEO
+
+
+def test_sondeo_encuentra_lo_nuevo_y_lo_modificado(tmp_path):
+    (tmp_path / "viejo.txt").write_text("a")
+    sondeo = PollingWatcher(tmp_path, interval=0.05)
+    assert sondeo.wait(0.01) == set() # Todavía no toca revisar
+    (tmp_path / "nuevo.pdf").write_text("b")
+    (tmp_path / "viejo.txt").write_text("más largo")
+    cambios = set()
+    for _ in range(10):
+        cambios |= sondeo.wait(0.05)
+    assert cambios == {"nuevo.pdf", "viejo.txt"}
+    assert sondeo.wait(0.1) == set() # Sin cambios desde la última foto
+
+
+def test_solo_sale_lo_que_dejo_de_cambiar(tmp_path):
+    pendientes = StabilityTracker(tmp_path, debounce=1.0)
+    archivo = tmp_path / "descarga.zip"
+    archivo.write_bytes(b"x")
+    pendientes.touch("descarga.zip", now=0.0)
+    pendientes.touch("borrado.txt", now=0.0)
+    assert pendientes.pop_ready(now=0.5) == [] # Eventos recientes
+    assert pendientes.pop_ready(now=1.0) == [] # Primera firma: falta confirmarla
+    assert len(pendientes) == 1 # El borrado ya no está pendiente
+    archivo.write_bytes(b"xx") # Sigue creciendo
+    assert pendientes.pop_ready(now=2.0) == []
+    assert pendientes.pop_ready(now=3.0) == [archivo]
+    assert len(pendientes) == 0
+
+
+def _backends():
+    backends = [BACKEND_SONDEO]
+    if sys.platform.startswith('linux'):
+        backends.append(BACKEND_INOTIFY)
+    return backends
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_vigilancia_entrega_un_archivo_nuevo(tmp_path, monkeypatch, backend):
+    if backend == BACKEND_SONDEO:
+        monkeypatch.setattr(watcher, 'open_watcher', lambda path, interval: PollingWatcher(path, interval))
+    monkeypatch.setattr(watcher, 'TICK_SEGUNDOS', 0.05)
+    (tmp_path / "ya_estaba.txt").write_text("a")
+    recibidas = []
+    listo = threading.Event()
+
+    def al_estar_listas(rutas):
+        recibidas.extend(rutas)
+        listo.set()
+
+    vigia = FolderWatch(tmp_path, al_estar_listas, debounce=0.1, poll_interval=0.05)
+    vigia.start()
+    try:
+        assert vigia.backend == backend
+        (tmp_path / "nuevo.pdf").write_text("b")
+        assert listo.wait(10), vigia.status()
+    finally:
+        vigia.stop()
+    assert recibidas == [tmp_path / "nuevo.pdf"]
+    assert vigia.status()['entries_sent'] == 1 and vigia.status()['error'] is None
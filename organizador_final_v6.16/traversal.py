@@ -0,0 +1,124 @@
+# --- traversal.py (El "Explorador" del origen) ---
+# Recorre la carpeta de origen con os.scandir como un generador: cada
+# entrada sale apenas se lee, sin armar antes la lista completa. La memoria
+# depende de la profundidad (un iterador abierto por nivel), no de cuántos
+# archivos hay.
+#
+# - max_depth=0 es el comportamiento de siempre: solo el primer nivel y las
+#   carpetas se mueven completas. Con max_depth=N se baja N niveles y se
+#   entregan los ARCHIVOS de cada nivel; las carpetas del último nivel se
+#   entregan completas. max_depth=None baja sin límite.
+# - 'prune' son patrones tipo "venv", "*.tmp" o "node_modules" (sin
+#   distinguir mayúsculas): lo que coincide ni se entrega ni se recorre.
+# - Con follow_symlinks=True se entra en los enlaces a carpetas DENTRO del
+#   origen; una carpeta que ya está en el camino actual (mismo dispositivo e
+#   inodo) no se vuelve a abrir, así un enlace que apunta "hacia arriba" no
+#   crea un ciclo. Un enlace a una carpeta de afuera no se recorre (se
+#   entrega el enlace y el plan lo omite): nunca se sacan archivos de ahí.
+
+import fnmatch
+import os
+from pathlib import Path
+
+PATRONES_EXCLUIR_POR_DEFECTO = ('venv',) # Lo que antes estaba fijo en el código
+
+
+def parse_patterns(text):
+    """ "venv, *.tmp ,node_modules" -> ('venv', '*.tmp', 'node_modules') """
+    if not text:
+        return ()
+    return tuple(pattern.strip() for pattern in str(text).split(',') if pattern.strip())
+
+
+def matches_patterns(name, patterns):
+    """ True si 'name' coincide con algún patrón (sin distinguir mayúsculas). """
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern.lower()) for pattern in patterns)
+
+
+class SourceWalker:
+    """
+    Iterable de rutas (Path) a organizar dentro de 'root'. Cuenta lo que
+    se excluyó (pruned) y los ciclos de enlaces evitados (loops).
+    """
+
+    def __init__(self, root, max_depth=0, prune=PATRONES_EXCLUIR_POR_DEFECTO, exclude=(), follow_symlinks=False):
+        self.root = Path(root)
+        self._real_root = os.path.normcase(os.path.realpath(self.root))
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self.prune = tuple(prune)
+        self._exclude = {os.path.normcase(os.path.abspath(path)) for path in exclude}
+        self.pruned = 0
+        self.loops = 0
+        self.dirs_visited = 0
+
+    def _is_pruned(self, entry):
+        if matches_patterns(entry.name, self.prune):
+            return True
+        return bool(self._exclude) and os.path.normcase(os.path.abspath(entry.path)) in self._exclude
+
+    def _inside_root(self, path):
+        """ True si el destino real de 'path' está dentro del origen. """
+        real = os.path.normcase(os.path.realpath(path))
+        try:
+            return os.path.commonpath([real, self._real_root]) == self._real_root
+        except ValueError:
+            return False # Otra unidad (Windows)
+
+    def _dir_id(self, path):
+        st = os.stat(path)
+        return (st.st_dev, st.st_ino)
+
+    def __iter__(self):
+        root_id = self._dir_id(self.root)
+        # Pila de (iterador de scandir, profundidad, id de la carpeta): solo el camino actual
+        stack = [(os.scandir(self.root), 0, root_id)]
+        ancestors = {root_id}
+        self.dirs_visited = 1
+        try:
+            while stack:
+                iterator, depth, dir_id = stack[-1]
+                entry = next(iterator, None)
+                if entry is None:
+                    iterator.close()
+                    stack.pop()
+                    ancestors.discard(dir_id)
+                    continue
+                if self._is_pruned(entry):
+                    self.pruned += 1
+                    continue
+                if not self._should_descend(entry, depth):
+                    yield Path(entry.path)
+                    continue
+                try:
+                    child_id = self._dir_id(entry.path)
+                except OSError:
+                    yield Path(entry.path) # Enlace roto o sin permiso: que el plan decida
+                    continue
+                if child_id in ancestors:
+                    self.loops += 1 # Enlace a una carpeta del camino actual
+                    continue
+                try:
+                    child_iterator = os.scandir(entry.path)
+                except OSError:
+                    yield Path(entry.path) # Sin permiso para listarla: se trata como unidad
+                    continue
+                stack.append((child_iterator, depth + 1, child_id))
+                ancestors.add(child_id)
+                self.dirs_visited += 1
+        finally:
+            for iterator, _, _ in stack:
+                iterator.close()
+
+    def _should_descend(self, entry, depth):
+        if self.max_depth is not None and depth >= self.max_depth:
+            return False
+        try:
+            if not entry.is_dir(follow_symlinks=self.follow_symlinks):
+                return False
+        except OSError:
+            return False
+        if not entry.is_symlink():
+            return True
+        return self.follow_symlinks and self._inside_root(entry.path)
@@ -0,0 +1,326 @@
+# --- watcher.py (El "Vigía" de carpetas) ---
+# Modo vigilancia: en vez de recorrer todo el origen en cada ejecución, se
+# escuchan los cambios de la carpeta y solo se organizan las entradas
+# nuevas o modificadas.
+#
+# - En Linux se usa inotify (por ctypes, sin dependencias): cada evento trae
+#   el nombre del archivo, así que procesarlo cuesta O(1).
+# - En los demás sistemas (o si inotify falla) se compara una "foto" de la
+#   carpeta (nombre -> tamaño, mtime) cada pocos segundos. La foto sí cuesta
+#   O(tamaño de la carpeta) por sondeo, pero cada cambio encontrado se
+#   procesa igual que un evento.
+#
+# Un archivo que se sigue escribiendo (una descarga, una copia) no se toca:
+# solo sale cuando pasó 'debounce' segundos sin eventos y su tamaño y mtime
+# no cambiaron entre dos revisiones.
+# Limitación conocida: de una carpeta nueva solo se vigila su propio mtime,
+# no lo que se sigue copiando dentro de sus subcarpetas.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+DEBOUNCE_SEGUNDOS = 2.0
+SONDEO_SEGUNDOS = 2.0
+TICK_SEGUNDOS = 0.5
+
+BACKEND_INOTIFY = "inotify"
+BACKEND_SONDEO = "sondeo"
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+MASCARA_VIGILANCIA = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENTO = struct.Struct('iIII') # wd, mask, cookie, len (+ nombre)
+
+
+def _signature(path):
+    """ (es_carpeta, tamaño, mtime) de una entrada, o None si ya no existe. """
+    try:
+        st = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return None
+    is_dir = os.path.isdir(path) and not os.path.islink(path)
+    return (is_dir, 0 if is_dir else st.st_size, st.st_mtime_ns)
+
+
+class InotifyWatcher:
+    """ Eventos de una carpeta (sin subcarpetas) con inotify. """
+
+    backend = BACKEND_INOTIFY
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(str(path)), MASCARA_VIGILANCIA | IN_ONLYDIR)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch falló para {path}")
+
+    def wait(self, timeout):
+        """
+        Espera hasta 'timeout' segundos. Devuelve el conjunto de nombres que
+        cambiaron, o None si se perdieron eventos (hay que revisar todo).
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset + _EVENTO.size <= len(data):
+            _, mask, _, length = _EVENTO.unpack_from(data, offset)
+            offset += _EVENTO.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                raise FileNotFoundError("La carpeta vigilada ya no existe.")
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """ Cambios de una carpeta comparando fotos (nombre -> firma) cada 'interval' segundos. """
+
+    backend = BACKEND_SONDEO
+
+    def __init__(self, path, interval=SONDEO_SEGUNDOS):
+        self.path = Path(path)
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + interval
+
+    def _take_snapshot(self):
+        snapshot = {}
+        with os.scandir(self.path) as it:
+            for entry in it:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout):
+        remaining = self._next_poll - time.monotonic()
+        if remaining > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, remaining))
+        self._next_poll = time.monotonic() + self.interval
+        snapshot = self._take_snapshot()
+        old = self._snapshot
+        self._snapshot = snapshot
+        return {name for name, signature in snapshot.items() if old.get(name) != signature}
+
+    def close(self):
+        pass
+
+
+def open_watcher(path, poll_interval=SONDEO_SEGUNDOS):
+    """ inotify si se puede (Linux); si no, el sondeo por fotos. """
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            pass # Límite de inotify alcanzado, libc sin inotify, etc.
+    return PollingWatcher(path, poll_interval)
+
+
+class StabilityTracker:
+    """
+    Entradas pendientes: cada evento solo actualiza su hora (O(1)). Una
+    entrada está lista cuando pasó 'debounce' segundos sin eventos y su
+    firma (tamaño, mtime) es la misma que en la revisión anterior.
+    """
+
+    def __init__(self, folder, debounce=DEBOUNCE_SEGUNDOS):
+        self.folder = Path(folder)
+        self.debounce = debounce
+        self._pending = {} # nombre -> [última firma, hora del último cambio]
+
+    def __len__(self):
+        return len(self._pending)
+
+    def touch(self, name, now=None):
+        now = time.monotonic() if now is None else now
+        pending = self._pending.get(name)
+        if pending is None:
+            self._pending[name] = [None, now]
+        else:
+            pending[1] = now
+
+    def pop_ready(self, now=None):
+        """ Devuelve las rutas estables y las saca de la lista de pendientes. """
+        now = time.monotonic() if now is None else now
+        ready = []
+        for name, pending in list(self._pending.items()):
+            if now - pending[1] < self.debounce:
+                continue
+            signature = _signature(self.folder / name)
+            if signature is None:
+                del self._pending[name] # Se borró o se movió antes de estabilizarse
+            elif signature == pending[0]:
+                del self._pending[name]
+                ready.append(self.folder / name)
+            else:
+                pending[0] = signature # Cambió: esperar otra ronda completa
+                pending[1] = now
+        return ready
+
+
+class FolderWatch:
+    """
+    Vigila una carpeta en un hilo propio y llama a on_ready(rutas) con las
+    entradas nuevas ya estables. Si on_ready devuelve False (p. ej. el
+    perfil está ocupado) esas rutas se vuelven a intentar más tarde.
+    """
+
+    def __init__(self, path, on_ready, debounce=DEBOUNCE_SEGUNDOS, poll_interval=SONDEO_SEGUNDOS):
+        self.path = Path(path)
+        self.on_ready = on_ready
+        self.poll_interval = poll_interval
+        self._tracker = StabilityTracker(self.path, debounce)
+        self._stop = threading.Event()
+        self._thread = None
+        self.backend = None
+        self.started_at = None
+        self.error = None
+        self.events = 0
+        self.batches = 0
+        self.entries_sent = 0
+        self.last_batch_at = None
+
+    def start(self):
+        self._watcher = open_watcher(self.path, self.poll_interval) # Falla aquí si la carpeta no existe
+        self.backend = self._watcher.backend
+        self.started_at = datetime.now().isoformat()
+        self._thread = threading.Thread(target=self._run, name=f"vigia-{self.path.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        self._stop.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                names = self._watcher.wait(TICK_SEGUNDOS)
+                if names is None:
+                    names = os.listdir(self.path) # Se perdieron eventos: revisar todo una vez
+                now = time.monotonic()
+                for name in names:
+                    self._tracker.touch(name, now)
+                self.events += len(names)
+                ready = self._tracker.pop_ready(now)
+                if ready and not self._stop.is_set():
+                    self._dispatch(ready, now)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._watcher.close()
+
+    def _dispatch(self, ready, now):
+        try:
+            accepted = self.on_ready(ready)
+        except Exception as e:
+            self.error = str(e)
+            accepted = True # No reintentar lo que falló
+        if accepted is False:
+            for path in ready:
+                self._tracker.touch(path.name, now)
+            return
+        self.batches += 1
+        self.entries_sent += len(ready)
+        self.last_batch_at = datetime.now().isoformat()
+
+    def status(self):
+        return {
+            'path': str(self.path),
+            'backend': self.backend,
+            'running': self.running,
+            'started_at': self.started_at,
+            'pending': len(self._tracker),
+            'events': self.events,
+            'batches': self.batches,
+            'entries_sent': self.entries_sent,
+            'last_batch_at': self.last_batch_at,
+            'error': self.error,
+        }
+
+
+class WatchManager:
+    """ Una vigilancia (FolderWatch) por perfil. """
+
+    def __init__(self, debounce=DEBOUNCE_SEGUNDOS, poll_interval=SONDEO_SEGUNDOS):
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._watches = {}
+        self._lock = threading.Lock()
+
+    def start(self, profile_id, path, on_ready):
+        """ Empieza (o reinicia) la vigilancia de un perfil. Propaga OSError si no se puede. """
+        watch = FolderWatch(path, on_ready, self.debounce, self.poll_interval)
+        watch.start()
+        with self._lock:
+            old = self._watches.pop(profile_id, None)
+            self._watches[profile_id] = watch
+        if old is not None:
+            old.stop()
+        return watch
+
+    def stop(self, profile_id):
+        """ Detiene la vigilancia de un perfil. Devuelve False si no estaba activa. """
+        with self._lock:
+            watch = self._watches.pop(profile_id, None)
+        if watch is None:
+            return False
+        watch.stop()
+        return True
+
+    def stop_all(self):
+        with self._lock:
+            watches = list(self._watches.values())
+            self._watches.clear()
+        for watch in watches:
+            watch.stop()
+
+    def status(self, profile_id=None):
+        with self._lock:
+            watches = dict(self._watches)
+        if profile_id is not None:
+            watch = watches.get(profile_id)
+            return watch.status() if watch is not None else None
+        return {pid: watch.status() for pid, watch in watches.items()}